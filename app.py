@@ -1,15 +1,95 @@
 from __future__ import annotations
 
+import time
+
+# Referencia del reporte de arranque: lo primero que se ejecuta de la app.
+_IMPORT_START = time.perf_counter()
+
+import json
+import os
+import sys
 import threading
 from dataclasses import dataclass
 from pathlib import Path
-from tkinter import Tk, filedialog
+from tkinter import Tk, filedialog, ttk
 import tkinter as tk
 import tempfile
-import numpy as np
+from typing import TYPE_CHECKING
 
-from asr_model import AsrTranscriber, load_transcriber
 from audio_player import AudioPlayer
+from inference_checkpoint import default_checkpoint
+from jobs import Cancelled, Job, JobExecutor, check_cancelled
+from waveform import WaveformView
+
+# numpy, torch y librosa se importan recién al usarlos, para que la ventana
+# aparezca antes de cargarlos (ver App._start_model_load).
+if TYPE_CHECKING:
+    from asr_model import AsrTranscriber
+    from audio_io import DecodedAudio
+    from peaks import PeakPyramid
+    from recorder import Recorder
+    from result_cache import CachedTranscriber
+    from server import ServerTranscriber
+    from streaming import StreamingTranscriber
+    from timings import Timings
+    from transcription import Transcription
+
+# Cada cuánto se actualiza el texto parcial en modo en vivo (segundos).
+LIVE_UPDATE_INTERVAL = 0.3
+
+# Con ASR_STARTUP_REPORT=1 se imprime el reporte de arranque en stderr; si el
+# valor termina en .json, además se agrega como una línea JSON a ese archivo.
+STARTUP_REPORT_ENV = "ASR_STARTUP_REPORT"
+
+# Con ASR_SERVER_URL (p. ej. http://127.0.0.1:8765) la app no carga el modelo:
+# transcribe a través de un asr-server que ya está corriendo en la máquina.
+SERVER_URL_ENV = "ASR_SERVER_URL"
+
+# Con ASR_PROFILE=<directorio>, la primera transcripción deja ahí una traza de
+# torch.profiler y un resumen de memoria (ver timings.profile_trace).
+PROFILE_ENV = "ASR_PROFILE"
+
+# Con "Archivos largos por ventanas" (marcado por defecto), los audios más
+# largos que esto se transcriben por ventanas de CHUNK_SECONDS: Cancelar actúa
+# entre tandas de ventanas (~0.4 s en un núcleo) y no espera al archivo entero.
+# Cada ventana se normaliza por separado, así que el texto puede diferir un poco
+# del de una sola pasada; desmarcado, Cancelar espera a que termine el modelo.
+LONG_AUDIO_SECONDS = 60.0
+CHUNK_SECONDS = 15.0
+
+# Cada cuánto se consulta el reproductor (ms): más seguido mientras suena, para
+# que el cursor de la forma de onda avance sin saltos.
+PLAYER_POLL_MS = 200
+PLAYER_POLL_PLAYING_MS = 50
+
+
+class StartupTimer:
+    """Tiempos de cada etapa del arranque, desde que se importa app.py."""
+
+    def __init__(self, start: float = _IMPORT_START) -> None:
+        self.start = start
+        self.marks: list[tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> None:
+        with self._lock:
+            self.marks.append((name, time.perf_counter() - self.start))
+
+    def report(self) -> str:
+        lines = ["Arranque (segundos desde import app):"]
+        for name, seconds in self.marks:
+            lines.append(f"  {name:<28}{seconds:>7.2f}")
+        return "\n".join(lines)
+
+    def emit(self) -> None:
+        target = os.environ.get(STARTUP_REPORT_ENV)
+        if not target:
+            return
+        print(self.report(), file=sys.stderr)
+        if target.endswith(".json"):
+            record = {"time": time.time(), "marks": dict(self.marks)}
+            with open(target, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
 
 
 @dataclass(frozen=True)
@@ -155,24 +235,54 @@ class Win95Button(tk.Frame):
 
 
 class App:
-    def __init__(self, root: Tk, checkpoint_path: Path):
+    def __init__(
+        self,
+        root: Tk,
+        checkpoint_path: Path,
+        timer: StartupTimer | None = None,
+        server_url: str | None = None,
+    ):
         self.root = root
         self.theme = Theme()
         self.checkpoint_path = checkpoint_path
+        self.timer = timer or StartupTimer()
+        self.server_url = server_url
 
+        # Modelo local (lo necesita el modo en vivo); None si se usa un servidor.
         self.transcriber: AsrTranscriber | None = None
+        # Lo que transcribe archivos: el modelo local con caché o el servidor.
+        self.file_transcriber: CachedTranscriber | ServerTranscriber | None = None
         self.selected_audio_path: Path | None = None
+        # El audio elegido ya decodificado (None mientras se lee): lo comparten
+        # el reproductor, la forma de onda y la transcripción.
+        self.selected_audio: DecodedAudio | None = None
+        # Cola de archivos: fila del Treeview -> ruta, y -> (texto, confianza).
+        self.queue_paths: dict[str, Path] = {}
+        self.queue_results: dict[str, tuple[str, float]] = {}
 
         self.player = AudioPlayer()
 
+        # Todo el trabajo en segundo plano (carga, transcripción, grabación en
+        # vivo y su cierre) corre en este pool; a lo sumo van tres a la vez.
+        self.jobs = JobExecutor(max_workers=3, name="asr-app")
+        self.transcribe_job: Job | None = None
+
         # Variables para grabación
         self.is_recording: bool = False
-        self.recorded_audio: list = []
+        self.recorder: Recorder | None = None
         self.sample_rate: int = 16000
+        self.live_stream: StreamingTranscriber | None = None
+        self._live_job: Job | None = None
+        # Informe del VAD sobre la última grabación (None para archivos).
+        # Tiempos por etapa de la última transcripción local (metrics_hook).
+        self.last_timings: Timings | None = None
 
         self._build_ui()
-        self._start_model_load()
         self._start_player_poll()
+        # Los callbacks idle corren en orden: este va después del primer
+        # dibujado de la ventana.
+        self.root.after_idle(self._on_window_shown)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _build_ui(self) -> None:
         self.root.title("ASR (ES)")
@@ -263,6 +373,15 @@ class App:
         self.btn_transcribe.configure(state=tk.DISABLED)
         self.btn_transcribe.pack(side=tk.LEFT, padx=(10, 0))
 
+        self.btn_cancel = Win95Button(
+            actions,
+            self.theme,
+            text="Cancelar",
+            command=self._on_cancel,
+        )
+        self.btn_cancel.configure(state=tk.DISABLED)
+        self.btn_cancel.pack(side=tk.LEFT, padx=(10, 0))
+
         self.btn_copy = Win95Button(
             actions,
             self.theme,
@@ -290,6 +409,77 @@ class App:
         self.btn_reset_audio.configure(state=tk.DISABLED)
         self.btn_reset_audio.pack(side=tk.LEFT, padx=(10, 0))
 
+        self.live_var = tk.BooleanVar(value=False)
+        live_check = tk.Checkbutton(
+            container,
+            text="Transcribir en vivo al grabar",
+            variable=self.live_var,
+            bg=self.theme.bg,
+            fg=self.theme.fg,
+            activebackground=self.theme.bg,
+            selectcolor=self.theme.input_bg,
+            font=("Arial", 9),
+        )
+        live_check.pack(pady=(10, 0))
+
+        self.vad_var = tk.BooleanVar(value=False)
+        vad_check = tk.Checkbutton(
+            container,
+            text="Omitir silencios (VAD)",
+            variable=self.vad_var,
+            bg=self.theme.bg,
+            fg=self.theme.fg,
+            activebackground=self.theme.bg,
+            selectcolor=self.theme.input_bg,
+            font=("Arial", 9),
+        )
+        vad_check.pack()
+
+        self.chunk_var = tk.BooleanVar(value=True)
+        chunk_check = tk.Checkbutton(
+            container,
+            text=(
+                f"Archivos largos por ventanas de {CHUNK_SECONDS:.0f} s "
+                "(Cancelar responde antes)"
+            ),
+            variable=self.chunk_var,
+            bg=self.theme.bg,
+            fg=self.theme.fg,
+            activebackground=self.theme.bg,
+            selectcolor=self.theme.input_bg,
+            font=("Arial", 9),
+        )
+        chunk_check.pack()
+
+        queue_actions = tk.Frame(container, bg=self.theme.bg)
+        queue_actions.pack(pady=(10, 0))
+
+        self.btn_queue_add = Win95Button(
+            queue_actions,
+            self.theme,
+            text="Agregar a la cola",
+            command=self._on_queue_add,
+        )
+        self.btn_queue_add.pack(side=tk.LEFT)
+
+        self.btn_queue_run = Win95Button(
+            queue_actions,
+            self.theme,
+            text="Transcribir cola",
+            command=self._on_queue_run,
+        )
+        self.btn_queue_run.configure(state=tk.DISABLED)
+        self.btn_queue_run.pack(side=tk.LEFT, padx=(10, 0))
+
+        self.btn_queue_clear = Win95Button(
+            queue_actions,
+            self.theme,
+            text="Vaciar cola",
+            command=self._on_queue_clear,
+        )
+        self.btn_queue_clear.configure(state=tk.DISABLED)
+        self.btn_queue_clear.pack(side=tk.LEFT, padx=(10, 0))
+
         self.file_label = tk.Label(
             container,
             text="Archivo: (ninguno)",
@@ -300,7 +490,21 @@ class App:
         )
         self.file_label.pack(fill=tk.X, pady=(14, 6))
 
-        self.status_var = tk.StringVar(value="Cargando modelo...")
+        # Forma de onda con borde sunken; se calcula al elegir cada audio.
+        waveform_outer = tk.Frame(container, bg=self.theme.dark_shadow)
+        waveform_outer.pack(fill=tk.X, pady=(0, 6))
+        waveform_inner = tk.Frame(waveform_outer, bg=self.theme.highlight)
+        waveform_inner.pack(fill=tk.X, padx=(0, 2), pady=(0, 2))
+        self.waveform = WaveformView(
+            waveform_inner,
+            bg=self.theme.input_bg,
+            fg=self.theme.title_bg,
+            playhead="#ff0000",
+            on_seek=self._on_waveform_seek,
+        )
+        self.waveform.pack(fill=tk.X, padx=(2, 0), pady=(2, 0))
+
+        self.status_var = tk.StringVar(value="Iniciando...")
         status = tk.Label(
             container,
             textvariable=self.status_var,
@@ -311,9 +515,39 @@ class App:
         )
         status.pack(fill=tk.X)
 
+        # Lista de la cola; se muestra al agregar el primer archivo.
+        self.queue_frame = tk.Frame(container, bg=self.theme.dark_shadow)
+        style = ttk.Style(self.root)
+        style.configure(
+            "Queue.Treeview",
+            background=self.theme.input_bg,
+            fieldbackground=self.theme.input_bg,
+            foreground=self.theme.input_fg,
+            font=("Arial", 9),
+        )
+        self.queue_tree = ttk.Treeview(
+            self.queue_frame,
+            columns=("estado", "texto"),
+            height=6,
+            selectmode="browse",
+            style="Queue.Treeview",
+        )
+        self.queue_tree.heading("#0", text="Archivo")
+        self.queue_tree.heading("estado", text="Estado")
+        self.queue_tree.heading("texto", text="Transcripción")
+        self.queue_tree.column("#0", width=180, stretch=False)
+        self.queue_tree.column("estado", width=90, stretch=False)
+        self.queue_tree.column("texto", width=400)
+        queue_scroll = tk.Scrollbar(self.queue_frame, command=self.queue_tree.yview)
+        self.queue_tree.configure(yscrollcommand=queue_scroll.set)
+        queue_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.queue_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.queue_tree.bind("<<TreeviewSelect>>", self._on_queue_select)
+
         # Text area con efecto sunken Windows 95
         text_outer = tk.Frame(container, bg=self.theme.dark_shadow)
         text_outer.pack(fill=tk.BOTH, expand=True, pady=(14, 0))
+        self.text_box = text_outer
 
         text_inner = tk.Frame(text_outer, bg=self.theme.highlight)
         text_inner.pack(fill=tk.BOTH, expand=True, padx=(0, 2), pady=(0, 2))
@@ -341,34 +575,103 @@ class App:
         self.text.insert(tk.END, value)
         self.text.configure(state=tk.DISABLED)
 
+    def _on_window_shown(self) -> None:
+        self.timer.mark("ventana visible")
+        self._start_model_load()
+
     def _start_model_load(self) -> None:
-        self.btn_select.configure(state=tk.DISABLED)
-        self.btn_record.configure(state=tk.DISABLED)
-        self.btn_stop_record.configure(state=tk.DISABLED)
+        # Elegir, reproducir y grabar audio no necesitan el modelo y quedan
+        # habilitados mientras carga; transcribir espera a _on_model_loaded.
         self.btn_transcribe.configure(state=tk.DISABLED)
-        self.btn_copy.configure(state=tk.DISABLED)
-        self.btn_play_pause.configure(state=tk.DISABLED)
-        self.btn_reset_audio.configure(state=tk.DISABLED)
 
-        def load_worker():
+        def progress(message: str) -> None:
+            self.root.after(0, lambda: self.status_var.set(message))
+
+        def connect_worker():
+            from server import ServerTranscriber
+
             try:
-                transcriber = load_transcriber(self.checkpoint_path)
-                self.root.after(0, lambda: self._on_model_loaded(transcriber))
+                progress(f"Conectando a {self.server_url}...")
+                client = ServerTranscriber(self.server_url)
+                info = client.health()
+                self.root.after(0, lambda: self._on_server_connected(client, info))
             except Exception as exc:
-                self.root.after(0, lambda: self._on_model_failed(str(exc)))
+                message = f"servidor {self.server_url} no disponible ({exc})"
+                self.root.after(0, lambda: self._on_model_failed(message))
 
-        threading.Thread(target=load_worker, daemon=True).start()
+        def load_worker():
+            try:
+                progress("Cargando PyTorch...")
+                from asr_model import load_transcriber
+                from feature_cache import default_cache_dir
+                from result_cache import CachedTranscriber, ResultCache
+
+                self.timer.mark("import torch + asr_model")
 
-    def _on_model_loaded(self, transcriber: AsrTranscriber) -> None:
+                progress("Cargando modelo...")
+                transcriber = load_transcriber(
+                    self.checkpoint_path, metrics_hook=self._on_metrics
+                )
+                self.timer.mark("modelo cargado")
+
+                progress("Preparando lectura de audio...")
+                transcriber.warmup_audio_io()
+                self.timer.mark("lectura de audio lista")
+                profile_dir = os.environ.get(PROFILE_ENV)
+                if profile_dir:
+                    transcriber.profile_next(profile_dir)
+
+                try:
+                    cache = ResultCache(
+                        sqlite_path=default_cache_dir() / "results.sqlite"
+                    )
+                except Exception:
+                    # Sin disco escribible se usa solo el nivel en memoria.
+                    cache = ResultCache()
+                cached = CachedTranscriber(transcriber, cache)
+                self.root.after(0, lambda: self._on_model_loaded(transcriber, cached))
+            except Exception as exc:
+                message = str(exc)
+                self.root.after(0, lambda: self._on_model_failed(message))
+
+        worker = connect_worker if self.server_url else load_worker
+        self.jobs.submit(worker, name="cargar modelo")
+
+    def _on_server_connected(
+        self, client: ServerTranscriber, info: dict[str, str]
+    ) -> None:
+        self.file_transcriber = client
+        self.status_var.set(
+            f"Listo. Usando asr-server ({info.get('device', '?').upper()})."
+        )
+        if self.selected_audio_path is not None and not self.is_recording:
+            self.btn_transcribe.configure(state=tk.NORMAL)
+        self._update_queue_buttons()
+        self.timer.mark("servidor conectado")
+        self.timer.emit()
+
+    def _on_model_loaded(
+        self, transcriber: AsrTranscriber, file_transcriber: CachedTranscriber
+    ) -> None:
         self.transcriber = transcriber
+        self.file_transcriber = file_transcriber
         self.status_var.set(f"Listo. Modelo en {transcriber.device.type.upper()}.")
-        self.btn_select.configure(state=tk.NORMAL)
-        self.btn_record.configure(state=tk.NORMAL)
+        if self.selected_audio_path is not None and not self.is_recording:
+            self.btn_transcribe.configure(state=tk.NORMAL)
+        self._update_queue_buttons()
+        self.timer.mark("listo")
+        self.timer.emit()
+
+    def _on_metrics(self, event: str, timings: Timings) -> None:
+        # Corre en el thread que transcribe, antes de que termine la llamada:
+        # _on_transcribe_done ya la encuentra asignada.
+        if event == "transcribe":
+            self.last_timings = timings
 
     def _on_model_failed(self, message: str) -> None:
         self.status_var.set(f"Error cargando modelo: {message}")
-        self.btn_select.configure(state=tk.NORMAL)
-        self.btn_record.configure(state=tk.NORMAL)
+        self.timer.mark("error cargando modelo")
+        self.timer.emit()
 
     def _on_select_audio(self) -> None:
         filename = filedialog.askopenfilename(
@@ -382,26 +685,153 @@ class App:
         if path.suffix.lower() != ".wav":
             self.status_var.set("Formato no soportado. Solo .wav.")
             return
+        self._select_audio(path)
+
+    def _select_audio(self, path: Path) -> None:
         self.selected_audio_path = path
         self.file_label.configure(text=f"Archivo: {path.name}")
         self._set_text("")
         self.status_var.set("Listo para transcribir.")
+        self._load_audio(path)
 
-        try:
-            self.player.load(path)
-            self._update_player_buttons()
-            self.btn_play_pause.configure(state=tk.NORMAL)
-            self.btn_reset_audio.configure(state=tk.NORMAL)
-        except Exception as exc:
-            self.status_var.set(f"Error reproduciendo audio: {exc}")
-            self.btn_play_pause.configure(state=tk.DISABLED)
-            self.btn_reset_audio.configure(state=tk.DISABLED)
-
-        if self.transcriber is not None:
+        if self.file_transcriber is not None and self.transcribe_job is None:
             self.btn_transcribe.configure(state=tk.NORMAL)
 
+    def _on_queue_add(self) -> None:
+        filenames = filedialog.askopenfilenames(
+            title="Agrega archivos WAV a la cola",
+            filetypes=[("Audio WAV", "*.wav"), ("Todos los archivos", "*")],
+        )
+        paths = [Path(f) for f in filenames if Path(f).suffix.lower() == ".wav"]
+        if not paths:
+            if filenames:
+                self.status_var.set("Formato no soportado. Solo .wav.")
+            return
+
+        if not self.queue_paths:
+            self.queue_frame.pack(fill=tk.X, pady=(14, 0), before=self.text_box)
+        for path in paths:
+            row = self.queue_tree.insert(
+                "", tk.END, text=path.name, values=("Pendiente", "")
+            )
+            self.queue_paths[row] = path
+
+        status = f"{len(self.queue_paths)} archivos en la cola."
+        skipped = len(filenames) - len(paths)
+        if skipped:
+            status += f" Se omitieron {skipped} que no son .wav."
+        self.status_var.set(status)
+        self._update_queue_buttons()
+
+    def _update_queue_buttons(self) -> None:
+        idle = self.transcribe_job is None
+        pending = any(row not in self.queue_results for row in self.queue_paths)
+        can_run = idle and pending and self.file_transcriber is not None
+        self.btn_queue_run.configure(state=tk.NORMAL if can_run else tk.DISABLED)
+        can_clear = idle and bool(self.queue_paths)
+        self.btn_queue_clear.configure(state=tk.NORMAL if can_clear else tk.DISABLED)
+
+    def _on_queue_clear(self) -> None:
+        self.queue_tree.delete(*self.queue_tree.get_children())
+        self.queue_paths.clear()
+        self.queue_results.clear()
+        self.queue_frame.pack_forget()
+        self.status_var.set("Cola vacía.")
+        self._update_queue_buttons()
+
+    def _on_queue_select(self, _event) -> None:
+        selection = self.queue_tree.selection()
+        if not selection or self.is_recording:
+            return
+        row = selection[0]
+        self._select_audio(self.queue_paths[row])
+        result = self.queue_results.get(row)
+        if result is not None:
+            self._set_text(result[0])
+            self.status_var.set(f"Confianza: {result[1]:.2%}.")
+            self.btn_copy.configure(state=tk.NORMAL)
+
+    def _on_queue_run(self) -> None:
+        transcriber = self.file_transcriber
+        if transcriber is None:
+            self.status_var.set("El modelo todavía no está listo.")
+            return
+
+        # Las filas con error se reintentan; las ya transcritas no.
+        rows = [row for row in self.queue_paths if row not in self.queue_results]
+        if not rows:
+            return
+        paths = [self.queue_paths[row] for row in rows]
+        for row in rows:
+            self.queue_tree.set(row, "estado", "En cola")
+            self.queue_tree.set(row, "texto", "")
+        self.btn_transcribe.configure(state=tk.DISABLED)
+        self.status_var.set(f"Transcribiendo cola: 0/{len(rows)}…")
+        start = time.perf_counter()
+
+        def worker():
+            done = 0
+            try:
+                # Mientras el modelo procesa un archivo, un pool de threads ya
+                # lee y calcula el mel de los siguientes (o, con asr-server,
+                # varias peticiones van a la vez y el servidor las agrupa).
+                for index, result in transcriber.transcribe_wavs(paths):
+                    check_cancelled()
+                    done += 1
+                    self.root.after(
+                        0,
+                        lambda row=rows[index], result=result, done=done: (
+                            self._on_queue_result(row, result, done, len(rows))
+                        ),
+                    )
+            except Cancelled:
+                self.root.after(0, self._on_queue_cancelled)
+            except Exception as exc:
+                message = str(exc)
+                self.root.after(0, lambda: self._on_transcribe_error(message))
+            else:
+                elapsed = time.perf_counter() - start
+                self.root.after(0, lambda: self._on_queue_done(len(rows), elapsed))
+
+        self.transcribe_job = self.jobs.submit(worker, name="cola")
+        self.btn_cancel.configure(state=tk.NORMAL)
+        self._update_queue_buttons()
+
+    def _on_queue_result(
+        self, row: str, result: tuple[str, float] | Exception, done: int, total: int
+    ) -> None:
+        if not self.queue_tree.exists(row):
+            return
+        if isinstance(result, Exception):
+            self.queue_tree.set(row, "estado", "Error")
+            self.queue_tree.set(row, "texto", str(result))
+        else:
+            self.queue_results[row] = result
+            self.queue_tree.set(row, "estado", f"Listo ({result[1]:.0%})")
+            self.queue_tree.set(row, "texto", result[0])
+        self.status_var.set(f"Transcribiendo cola: {done}/{total}…")
+
+    def _on_queue_done(self, total: int, elapsed: float) -> None:
+        failed = sum(
+            1
+            for row in self.queue_paths
+            if self.queue_tree.set(row, "estado") == "Error"
+        )
+        status = f"Cola transcrita: {total} archivos en {elapsed:.1f} s"
+        if failed:
+            status += f" ({failed} con error)"
+        self.status_var.set(status + ".")
+        self._end_transcribe_job()
+
+    def _on_queue_cancelled(self) -> None:
+        for row in self.queue_paths:
+            if self.queue_tree.set(row, "estado") == "En cola":
+                self.queue_tree.set(row, "estado", "Pendiente")
+        self.status_var.set("Cola cancelada.")
+        self._end_transcribe_job()
+
     def _on_transcribe(self) -> None:
-        if self.transcriber is None:
+        if self.file_transcriber is None:
             self.status_var.set("El modelo todavía no está listo.")
             return
 
@@ -415,32 +845,175 @@ class App:
         self.btn_copy.configure(state=tk.DISABLED)
         self.status_var.set("Transcribiendo…")
 
-        transcriber = self.transcriber
-        if transcriber is None:
-            self.status_var.set("El modelo todavía no está listo.")
-            self.btn_select.configure(state=tk.NORMAL)
-            return
+        transcriber = self.file_transcriber
+        use_vad = self.vad_var.get()
+        use_chunks = self.chunk_var.get()
+        self.last_timings = None
+        # Si ya se decodificó, se transcribe ese mismo buffer sin releer el
+        # archivo; si todavía se está leyendo, desde el archivo.
+        audio = self.selected_audio
 
         def worker():
             try:
-                text, confidence = transcriber.transcribe_wav(audio_path)
-                self.root.after(0, lambda: self._on_transcribe_done(text, confidence))
+                import soundfile as sf
+
+                vad = None
+                if use_vad:
+                    from vad import VadConfig
+
+                    vad = VadConfig()
+                if audio is not None:
+                    seconds = audio.seconds
+                else:
+                    seconds = sf.info(str(audio_path)).duration
+                chunk_seconds = None
+                if use_chunks and seconds > LONG_AUDIO_SECONDS:
+                    chunk_seconds = CHUNK_SECONDS
+                result = transcriber.transcribe(
+                    audio if audio is not None else audio_path,
+                    chunk_seconds=chunk_seconds,
+                    vad=vad,
+                )
+                # El servidor no se entera de la cancelación: se descarta aquí.
+                check_cancelled()
+                self.root.after(0, lambda: self._on_transcribe_done(result))
+            except Cancelled:
+                self.root.after(0, self._on_transcribe_cancelled)
             except Exception as exc:
-                self.root.after(0, lambda: self._on_transcribe_error(str(exc)))
+                message = str(exc)
+                self.root.after(0, lambda: self._on_transcribe_error(message))
 
-        threading.Thread(target=worker, daemon=True).start()
+        self.transcribe_job = self.jobs.submit(worker, name="transcribir")
+        self.btn_cancel.configure(state=tk.NORMAL)
 
-    def _on_transcribe_done(self, text: str, confidence: float) -> None:
-        self._set_text(text if text.strip() else "(transcripción vacía)")
-        self.status_var.set("Transcripción completada.")
+    def _on_cancel(self) -> None:
+        if self.transcribe_job is not None:
+            self.transcribe_job.cancel()
+            self.status_var.set("Cancelando…")
+        self.btn_cancel.configure(state=tk.DISABLED)
+
+    def _end_transcribe_job(self) -> None:
+        self.transcribe_job = None
+        self.btn_cancel.configure(state=tk.DISABLED)
         self.btn_select.configure(state=tk.NORMAL)
-        self.btn_transcribe.configure(state=tk.NORMAL)
+        if self.selected_audio_path is not None and not self.is_recording:
+            self.btn_transcribe.configure(state=tk.NORMAL)
+        self._update_queue_buttons()
+
+    def _on_transcribe_cancelled(self) -> None:
+        self.status_var.set("Transcripción cancelada.")
+        self._end_transcribe_job()
+
+    def _on_transcribe_done(self, result: Transcription) -> None:
+        text = result.text
+        self._set_text(text if text.strip() else "(transcripción vacía)")
+        status = "Transcripción completada"
+        if self.last_timings is not None:
+            status += f" en {self.last_timings.summary()}"
+        elif self.transcriber is not None:
+            # Modelo local pero sin llamada al modelo: salió de la caché.
+            status += " (desde caché)"
+        # El informe sale de la misma pasada de VAD que la transcripción; un
+        # resultado de la caché no lo trae.
+        report = result.vad
+        if report is not None and report.segments == 0:
+            status += "; el VAD no detectó voz"
+        elif report is not None:
+            status += (
+                f"; el VAD pasó al modelo {report.speech_seconds:.1f} s de "
+                f"{report.audio_seconds:.1f} s "
+                f"({report.saved_fraction:.0%} menos cómputo)"
+            )
+        self.status_var.set(status + ".")
         self.btn_copy.configure(state=tk.NORMAL)
+        self._end_transcribe_job()
 
     def _on_transcribe_error(self, message: str) -> None:
         self.status_var.set(f"Error transcribiendo: {message}")
-        self.btn_select.configure(state=tk.NORMAL)
-        self.btn_transcribe.configure(state=tk.NORMAL)
+        self._end_transcribe_job()
+
+    def _load_audio(self, path: Path, cache_peaks: bool = True) -> None:
+        """Decodifica el audio una sola vez, en segundo plano.
+
+        El mismo buffer pasa al reproductor y a la transcripción, y de él sale
+        la forma de onda (o de la caché de picos, si está al día). Un audio
+        que decodificado pasaría de ``DECODE_MAX_BYTES`` no se carga: el
+        reproductor y la forma de onda lo leen del disco por partes y se
+        transcribe desde el archivo.
+        """
+        self.selected_audio = None
+        self.player.cleanup()
+        self.btn_play_pause.configure(state=tk.DISABLED)
+        self.btn_reset_audio.configure(state=tk.DISABLED)
+        self._update_player_buttons()
+        self.waveform.set_peaks(None, "Leyendo audio...")
+
+        def worker() -> None:
+            from audio_io import DECODE_MAX_BYTES, DecodedAudio, decoded_bytes
+            from peaks import load_peaks
+
+            audio: DecodedAudio | None = None
+            try:
+                size = decoded_bytes(path)
+                if size is None or size <= DECODE_MAX_BYTES:
+                    audio = DecodedAudio.from_file(path)
+            except Exception as exc:
+                message = str(exc)
+                self.root.after(0, lambda: self._on_audio_failed(path, message))
+                return
+            self.root.after(0, lambda: self._on_audio_decoded(path, audio))
+
+            check_cancelled()
+            try:
+                pyramid = load_peaks(
+                    audio if audio is not None else path, cache=cache_peaks
+                )
+            except Exception as exc:
+                message = str(exc)
+                self.root.after(0, lambda: self._on_waveform_failed(path, message))
+                return
+            self.root.after(0, lambda: self._on_waveform_loaded(path, pyramid))
+
+        self.jobs.submit(worker, name="leer audio")
+
+    def _on_audio_decoded(self, path: Path, audio: DecodedAudio | None) -> None:
+        # Si mientras tanto se eligió otro audio, este ya no sirve.
+        if path != self.selected_audio_path:
+            return
+        self.selected_audio = audio
+        self.waveform.set_peaks(None, "Calculando forma de onda...")
+        try:
+            # Sin buffer (audio largo), el reproductor lee del archivo.
+            self.player.load(audio if audio is not None else path)
+            self._update_player_buttons()
+            self.btn_play_pause.configure(state=tk.NORMAL)
+            self.btn_reset_audio.configure(state=tk.NORMAL)
+        except Exception as exc:
+            self.status_var.set(f"Error reproduciendo audio: {exc}")
+
+    def _on_audio_failed(self, path: Path, message: str) -> None:
+        if path != self.selected_audio_path:
+            return
+        self.status_var.set(f"Error leyendo audio: {message}")
+        self.waveform.set_peaks(None, "Sin forma de onda.")
+
+    def _on_waveform_loaded(self, path: Path, pyramid: PeakPyramid) -> None:
+        if path != self.selected_audio_path:
+            return
+        self.waveform.set_peaks(pyramid)
+        self.waveform.set_position(self.player.position)
+
+    def _on_waveform_failed(self, path: Path, message: str) -> None:
+        if path != self.selected_audio_path:
+            return
+        self.waveform.set_peaks(None, f"Sin forma de onda: {message}")
+
+    def _on_waveform_seek(self, seconds: float) -> None:
+        try:
+            self.player.seek(seconds)
+            self._update_player_buttons()
+        except Exception as exc:
+            self.status_var.set(f"No se pudo mover la reproducción: {exc}")
 
     def _start_player_poll(self) -> None:
         def poll():
@@ -453,9 +1026,17 @@ class App:
             if finished:
                 self._update_player_buttons()
 
-            self.root.after(200, poll)
+            playing = self.player.state == "playing"
+            if self.player.has_audio:
+                try:
+                    self.waveform.set_position(self.player.position, follow=playing)
+                except Exception:
+                    pass
+
+            delay = PLAYER_POLL_PLAYING_MS if playing else PLAYER_POLL_MS
+            self.root.after(delay, poll)
 
-        self.root.after(200, poll)
+        self.root.after(PLAYER_POLL_MS, poll)
 
     def _update_player_buttons(self) -> None:
         state = self.player.state
@@ -494,112 +1075,149 @@ class App:
 
     def _on_start_recording(self) -> None:
         """Inicia la grabación de audio desde el micrófono."""
-        import sounddevice as sd
+        from recorder import Recorder
+
+        live: StreamingTranscriber | None = None
+        if self.live_var.get() and self.transcriber is not None:
+            from streaming import StreamingTranscriber
+
+            live = StreamingTranscriber(
+                self.transcriber, input_sample_rate=self.sample_rate
+            )
+
+        # El audio se escribe al WAV mientras se graba; Detener solo cierra.
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        wav_path = Path(tempfile.gettempdir()) / f"recording_{timestamp}.wav"
+        recorder = Recorder(
+            wav_path,
+            self.sample_rate,
+            on_audio=live.accept if live is not None else None,
+        )
+        try:
+            recorder.start()
+        except Exception as exc:
+            self.status_var.set(f"Error grabando: {exc}")
+            return
 
+        if live is not None:
+            self._set_text("")
         self.is_recording = True
-        self.recorded_audio = []
+        self.recorder = recorder
+        self.live_stream = live
 
         self.btn_record.configure(state=tk.DISABLED)
         self.btn_stop_record.configure(state=tk.NORMAL)
         self.btn_select.configure(state=tk.DISABLED)
         self.btn_transcribe.configure(state=tk.DISABLED)
-        self.status_var.set("🔴 Grabando audio...")
+        self.btn_copy.configure(state=tk.DISABLED)
+        self.status_var.set(
+            "🔴 Grabando y transcribiendo en vivo..."
+            if live is not None
+            else "🔴 Grabando audio..."
+        )
 
-        def record_worker():
-            """Worker thread para grabar audio sin bloquear la UI."""
+        def live_worker():
+            """Worker thread que actualiza la transcripción parcial."""
             try:
-                with sd.InputStream(
-                    samplerate=self.sample_rate, channels=1, dtype="float32"
-                ) as stream:
-                    while self.is_recording:
-                        audio_chunk, _ = stream.read(1024)
-                        self.recorded_audio.append(audio_chunk)
+                while self.is_recording:
+                    time.sleep(LIVE_UPDATE_INTERVAL)
+                    text = live.step().text
+                    self.root.after(0, lambda text=text: self._set_text(text))
+            except Cancelled:
+                pass
             except Exception as exc:
-                self.root.after(
-                    0, lambda: self.status_var.set(f"Error grabando: {exc}")
-                )
-                self.root.after(0, self._reset_recording_state)
+                message = f"Error en vivo: {exc}"
+                self.root.after(0, lambda: self.status_var.set(message))
 
-        threading.Thread(target=record_worker, daemon=True).start()
+        if live is not None:
+            self._live_job = self.jobs.submit(live_worker, name="en vivo")
 
     def _on_stop_recording(self) -> None:
-        """Detiene la grabación y guarda el audio como archivo WAV."""
+        """Detiene la grabación; el WAV ya está escrito salvo el último bloque."""
         self.is_recording = False
         self.btn_stop_record.configure(state=tk.DISABLED)
         self.status_var.set("Procesando grabación...")
+        recorder = self.recorder
 
         def process_worker():
-            """Worker thread para procesar y guardar el audio grabado."""
+            """Worker thread que cierra el WAV y la transcripción en vivo."""
             try:
-                if not self.recorded_audio:
+                wav_path = recorder.stop()
+                if recorder.frames == 0:
                     self.root.after(
                         0, lambda: self.status_var.set("No se grabó audio.")
                     )
                     self.root.after(0, self._reset_recording_state)
                     return
 
-                # Concatenar todos los chunks de audio
-                audio_data = np.concatenate(self.recorded_audio, axis=0)
-
-                # Guardar como archivo WAV temporal
-                from scipy.io import wavfile
-
-                temp_dir = Path(tempfile.gettempdir())
-                timestamp = threading.current_thread().name.split("-")[-1]
-                wav_path = temp_dir / f"recording_{timestamp}.wav"
-
-                # Convertir de float32 a int16 para WAV
-                audio_int16 = (audio_data * 32767).astype(np.int16)
-                wavfile.write(str(wav_path), self.sample_rate, audio_int16)
+                # Cerrar la transcripción en vivo con todo el audio grabado
+                live_text: str | None = None
+                if self.live_stream is not None:
+                    if self._live_job is not None:
+                        self._live_job.result()
+                    live_text = self.live_stream.finish().text
 
                 # Cargar el archivo grabado automáticamente
-                self.root.after(0, lambda: self._load_recorded_audio(wav_path))
-
-            except Exception as exc:
                 self.root.after(
-                    0, lambda: self.status_var.set(f"Error procesando grabación: {exc}")
+                    0, lambda: self._load_recorded_audio(wav_path, live_text)
                 )
+
+            except Exception as exc:
+                message = f"Error procesando grabación: {exc}"
+                self.root.after(0, lambda: self.status_var.set(message))
                 self.root.after(0, self._reset_recording_state)
 
-        threading.Thread(target=process_worker, daemon=True).start()
+        self.jobs.submit(process_worker, name="procesar grabación")
 
-    def _load_recorded_audio(self, path: Path) -> None:
+    def _load_recorded_audio(self, path: Path, live_text: str | None = None) -> None:
         """Carga el audio grabado en la interfaz."""
         self.selected_audio_path = path
         self.file_label.configure(text=f"Archivo: {path.name} (grabación)")
-        self._set_text("")
-        self.status_var.set("Grabación lista para transcribir.")
+        if live_text is None:
+            self._set_text("")
+            self.status_var.set("Grabación lista para transcribir.")
+        else:
+            self._set_text(live_text if live_text.strip() else "(transcripción vacía)")
+            self.status_var.set("Transcripción en vivo completada.")
+            self.btn_copy.configure(state=tk.NORMAL)
 
-        try:
-            self.player.load(path)
-            self._update_player_buttons()
-            self.btn_play_pause.configure(state=tk.NORMAL)
-            self.btn_reset_audio.configure(state=tk.NORMAL)
-        except Exception as exc:
-            self.status_var.set(f"Error cargando grabación: {exc}")
-            self.btn_play_pause.configure(state=tk.DISABLED)
-            self.btn_reset_audio.configure(state=tk.DISABLED)
+        # La grabación es temporal: no vale la pena guardarle los picos.
+        self._load_audio(path, cache_peaks=False)
 
-        if self.transcriber is not None:
+        if self.file_transcriber is not None and self.transcribe_job is None:
             self.btn_transcribe.configure(state=tk.NORMAL)
 
         self._reset_recording_state()
 
+    def _on_close(self) -> None:
+        # Los jobs en curso se cancelan en su próxima etapa; no se los espera.
+        self.is_recording = False
+        self.jobs.shutdown()
+        if self.recorder is not None:
+            try:
+                self.recorder.stop()
+            except Exception:
+                pass
+            self.recorder = None
+        self.root.destroy()
+
     def _reset_recording_state(self) -> None:
         """Restaura el estado de los botones después de grabar."""
+        self.is_recording = False
+        self.recorder = None
+        self.live_stream = None
+        self._live_job = None
         self.btn_record.configure(state=tk.NORMAL)
         self.btn_stop_record.configure(state=tk.DISABLED)
         self.btn_select.configure(state=tk.NORMAL)
 
 
 def main() -> None:
+    timer = StartupTimer()
     root = Tk()
+    timer.mark("Tk inicializado")
 
-    checkpoint_path = Path(__file__).resolve().parent / "best_model.pth"
-    if not checkpoint_path.exists():
-        checkpoint_path = Path(__file__).resolve().parent / "checkpoint_epoch_40.pth"
-
-    App(root, checkpoint_path)
+    App(root, default_checkpoint(), timer, server_url=os.environ.get(SERVER_URL_ENV))
     root.mainloop()
 
 
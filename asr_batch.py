@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg")
+
+# Transcriptor propio de cada proceso worker (se carga una sola vez en _init_worker).
+_worker_transcriber: Any = None
+
+
+def _iter_manifest(manifest: Path) -> Iterator[Path]:
+    base = manifest.parent
+    with manifest.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if manifest.suffix.lower() == ".jsonl":
+                line = str(json.loads(line)["path"])
+            path = Path(line)
+            yield path if path.is_absolute() else base / path
+
+
+def collect_inputs(source: Path) -> list[Path]:
+    """Lista los audios de un directorio (recursivo) o de un manifiesto.
+
+    El manifiesto es un archivo de texto con una ruta por línea, o un ``.jsonl``
+    con un campo ``path`` por línea. Las rutas relativas se resuelven respecto
+    a la carpeta del manifiesto.
+    """
+    if source.is_dir():
+        paths: Iterable[Path] = (
+            p
+            for p in source.rglob("*")
+            if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS
+        )
+    else:
+        paths = _iter_manifest(source)
+    return sorted({p.resolve() for p in paths})
+
+
+def read_completed(output: Path) -> set[str]:
+    """Rutas ya transcritas sin error en un JSONL de salida previo."""
+    done: set[str] = set()
+    if not output.exists():
+        return done
+
+    with output.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Línea truncada por una ejecución interrumpida.
+                continue
+            if "error" not in record and "path" in record:
+                done.add(str(record["path"]))
+    return done
+
+
+def _init_worker(
+    checkpoint_path: str,
+    device: str | None,
+    num_threads: int,
+    decoder: str = "greedy",
+    beam_width: int = 16,
+    lm_path: str | None = None,
+    feature_cache_dir: str | None = None,
+    result_cache_path: str | None = None,
+    quantize: str | None = None,
+    backend: str = "eager",
+    profile_dir: str | None = None,
+) -> None:
+    global _worker_transcriber
+
+    import torch
+
+    from asr_model import load_transcriber
+    from ctc_beam import BeamSearchConfig, CharNgramLM
+    from feature_cache import FeatureCache
+    from result_cache import CachedTranscriber, ResultCache
+
+    torch.set_num_threads(num_threads)
+    beam_config = BeamSearchConfig(
+        beam_width=beam_width, lm=CharNgramLM.load(lm_path) if lm_path else None
+    )
+    transcriber = load_transcriber(
+        checkpoint_path,
+        device=torch.device(device) if device else None,
+        decoder=decoder,
+        beam_config=beam_config,
+        feature_cache=FeatureCache(feature_cache_dir) if feature_cache_dir else None,
+        quantize=quantize,
+        backend=backend,
+    )
+    if profile_dir:
+        # Sin el import de librosa dentro de la traza.
+        transcriber.warmup_audio_io()
+        transcriber.profile_next(profile_dir)
+    if result_cache_path:
+        _worker_transcriber = CachedTranscriber(
+            transcriber, ResultCache(sqlite_path=result_cache_path)
+        )
+    else:
+        _worker_transcriber = transcriber
+
+
+def _transcribe_one(
+    path: str, chunk_seconds: float | None = None, vad: bool = False
+) -> dict[str, Any]:
+    start = time.perf_counter()
+    record: dict[str, Any] = {"path": path}
+    try:
+        from vad import VadConfig
+
+        result = _worker_transcriber.transcribe(
+            path, chunk_seconds=chunk_seconds, vad=VadConfig() if vad else None
+        )
+        record["text"] = result.text
+        record["confidence"] = result.confidence
+        if result.vad is not None:
+            record["vad"] = result.vad.as_dict()
+        if result.timings is not None:
+            record["timings_ms"] = result.timings.as_dict()
+    except Exception as exc:
+        record["error"] = str(exc)
+    record["seconds"] = round(time.perf_counter() - start, 4)
+    record["worker"] = os.getpid()
+    return record
+
+
+def run(
+    inputs: list[Path],
+    output: Path,
+    checkpoint_path: Path,
+    workers: int = 1,
+    threads_per_worker: int | None = None,
+    device: str | None = None,
+    decoder: str = "greedy",
+    beam_width: int = 16,
+    lm_path: Path | None = None,
+    chunk_seconds: float | None = None,
+    feature_cache_dir: Path | None = None,
+    result_cache_path: Path | None = None,
+    quantize: str | None = None,
+    backend: str = "eager",
+    vad: bool = False,
+    profile_dir: Path | None = None,
+) -> int:
+    """Transcribe ``inputs`` y agrega un registro JSONL por archivo a ``output``.
+
+    Los archivos que ya figuran sin error en ``output`` se saltan, así que volver
+    a lanzar el mismo comando continúa donde se quedó. Devuelve la cantidad de
+    archivos que fallaron.
+    """
+    completed = read_completed(output)
+    pending = [str(p) for p in inputs if str(p) not in completed]
+
+    print(
+        f"{len(inputs)} archivos, {len(inputs) - len(pending)} ya transcritos, "
+        f"{len(pending)} pendientes.",
+        file=sys.stderr,
+    )
+    if not pending:
+        return 0
+
+    workers = max(1, min(workers, len(pending)))
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    init_args = (
+        str(checkpoint_path),
+        device,
+        threads,
+        decoder,
+        beam_width,
+        str(lm_path) if lm_path else None,
+        str(feature_cache_dir) if feature_cache_dir else None,
+        str(result_cache_path) if result_cache_path else None,
+        quantize,
+        backend,
+        str(profile_dir) if profile_dir else None,
+    )
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    failures = 0
+    with output.open("a", encoding="utf-8") as out:
+
+        def write(record: dict[str, Any], n: int) -> None:
+            nonlocal failures
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            status = record.get("error") or f"{record['seconds']:.2f} s"
+            if "error" in record:
+                failures += 1
+            print(f"[{n}/{len(pending)}] {record['path']} ({status})", file=sys.stderr)
+
+        transcribe_one = partial(_transcribe_one, chunk_seconds=chunk_seconds, vad=vad)
+        if workers == 1:
+            _init_worker(*init_args)
+            for n, path in enumerate(pending, start=1):
+                write(transcribe_one(path), n)
+        else:
+            # spawn: cada worker inicializa torch desde cero en vez de heredar
+            # los threads de OpenMP de un fork.
+            ctx = mp.get_context("spawn")
+            with ctx.Pool(
+                workers, initializer=_init_worker, initargs=init_args
+            ) as pool:
+                results = pool.imap_unordered(transcribe_one, pending, chunksize=1)
+                for n, record in enumerate(results, start=1):
+                    write(record, n)
+
+    return failures
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="asr-batch",
+        description="Transcribe un directorio o manifiesto de audios sin interfaz gráfica.",
+    )
+    parser.add_argument(
+        "source", type=Path, help="Directorio con audios o manifiesto (.txt/.jsonl)."
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, required=True, help="Archivo JSONL de salida."
+    )
+    parser.add_argument(
+        "-c", "--checkpoint", type=Path, default=None, help="Checkpoint del modelo."
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=1, help="Número de procesos worker."
+    )
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="Threads de torch por worker (por defecto: núcleos / workers).",
+    )
+    parser.add_argument(
+        "--device", default=None, help="Dispositivo torch (cpu, cuda, ...)."
+    )
+    parser.add_argument(
+        "--decoder",
+        choices=("greedy", "beam"),
+        default="greedy",
+        help="Decodificador CTC.",
+    )
+    parser.add_argument(
+        "--beam-width", type=int, default=16, help="Ancho del haz (--decoder beam)."
+    )
+    parser.add_argument(
+        "--lm", type=Path, default=None, help="LM de caracteres (.arpa o .json.gz)."
+    )
+    parser.add_argument(
+        "--chunk-seconds",
+        type=float,
+        default=None,
+        help="Procesa cada archivo en ventanas de N segundos (audios largos).",
+    )
+    parser.add_argument(
+        "--feature-cache",
+        type=Path,
+        default=None,
+        help="Directorio de caché de log-mels (reusa features entre ejecuciones).",
+    )
+    parser.add_argument(
+        "--result-cache",
+        type=Path,
+        default=None,
+        help="SQLite con resultados previos (audio + checkpoint + decodificador).",
+    )
+    parser.add_argument(
+        "--quantize",
+        choices=("int8",),
+        default=None,
+        help="Cuantiza la BiLSTM y la capa final a int8 (solo CPU).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("eager", "torchscript", "onnx"),
+        default="eager",
+        help="Cómo se ejecuta el modelo; torchscript/onnx requieren asr-export.",
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Transcribe solo los tramos con voz; el JSONL informa el ahorro.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        help="Deja una traza de torch.profiler del primer archivo de cada worker.",
+    )
+    args = parser.parse_args(argv)
+
+    from inference_checkpoint import default_checkpoint
+
+    inputs = collect_inputs(args.source)
+    failures = run(
+        inputs,
+        args.output,
+        args.checkpoint or default_checkpoint(),
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        device=args.device,
+        decoder=args.decoder,
+        beam_width=args.beam_width,
+        lm_path=args.lm,
+        chunk_seconds=args.chunk_seconds,
+        feature_cache_dir=args.feature_cache,
+        result_cache_path=args.result_cache,
+        quantize=args.quantize,
+        backend=args.backend,
+        vad=args.vad,
+        profile_dir=args.profile,
+    )
+    if failures:
+        print(f"{failures} archivos fallaron.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,43 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+import warnings
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, fields, replace
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator, Sequence
 
 import numpy as np
 import torch
 import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
+
+from audio_io import AudioSource, DecodedAudio, downmix, load_audio, resample
+from backends import (
+    BACKENDS,
+    EagerBackend,
+    InferenceBackend,
+    default_export_path,
+    load_backend,
+)
+from ctc_beam import BeamSearchConfig, ctc_prefix_beam_search
+from feature_cache import FeatureCache
+from features import MelFeatureExtractor
+from fingerprints import hash_audio, hash_file
+from inference_checkpoint import is_inference_checkpoint, load_inference_checkpoint
+from jobs import Cancelled, check_cancelled
+from timings import MetricsHook, Timings, profile_trace, span
+from transcription import Transcription
+from vad import VadConfig, detect_speech, vad_report
+
+DECODERS = ("greedy", "beam")
+QUANTIZATIONS = (None, "int8")
+
+# Los segmentos de voz tienen duraciones muy distintas; igual que en el
+# servidor, solo se agrupan los parecidos porque el relleno cuesta en CPU.
+VAD_LENGTH_RATIO = 1.5
 
 
 @dataclass(frozen=True)
@@ -22,6 +53,17 @@ class ModelConfig:
     win_length: int
 
 
+def _mask_time_padding(x: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+    # conv2 debe ver ceros más allá del final de cada fila, igual que el
+    # zero-padding de un batch de uno; así un batch con relleno da el mismo
+    # resultado por fila que procesar cada clip por separado.
+    time = x.size(3)
+    if bool((lengths >= time).all()):
+        return x
+    mask = torch.arange(time, device=x.device)[None, :] < lengths[:, None]
+    return x * mask[:, None, None, :].to(x.dtype)
+
+
 class ASRCNN_BiLSTM(nn.Module):
     def __init__(
         self,
@@ -61,6 +103,10 @@ class ASRCNN_BiLSTM(nn.Module):
         self.fc = nn.Linear(hidden_size * 2, vocab_size)
         self.log_softmax = nn.LogSoftmax(dim=2)
 
+    @staticmethod
+    def _mask_padding(x: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+        return _mask_time_padding(x, lengths)
+
     def forward(
         self, x: torch.Tensor, input_lengths: torch.Tensor
     ) -> tuple[torch.Tensor, torch.Tensor]:
@@ -68,6 +114,7 @@ class ASRCNN_BiLSTM(nn.Module):
 
         x = self.relu(self.bn1(self.conv1(x)))
         x = nn.functional.max_pool2d(x, kernel_size=2, stride=2)
+        x = self._mask_padding(x, input_lengths // 2)
         x = self.dropout_cnn(x)
 
         x = self.relu(self.bn2(self.conv2(x)))
@@ -96,74 +143,672 @@ class ASRCNN_BiLSTM(nn.Module):
         return log_probs, output_lengths
 
 
+class InferenceASRCNN_BiLSTM(nn.Module):
+    """Versión solo-inferencia de ``ASRCNN_BiLSTM`` con los mismos resultados.
+
+    La BatchNorm queda fusionada en los pesos de ``conv1``/``conv2``, el
+    dropout no se aplica y la LSTM corre sin empaquetar cuando todas las
+    filas tienen la longitud completa (siempre, con batch de uno).
+    """
+
+    def __init__(self, model: ASRCNN_BiLSTM) -> None:
+        super().__init__()
+        if model.training:
+            raise ValueError("La fusión Conv-BN requiere el modelo en modo eval()")
+
+        self.n_mels = model.n_mels
+        self.hidden_size = model.hidden_size
+        self.vocab_size = model.vocab_size
+        self.num_lstm_layers = model.num_lstm_layers
+
+        self.conv1 = fuse_conv_bn_eval(model.conv1, model.bn1)
+        self.conv2 = fuse_conv_bn_eval(model.conv2, model.bn2)
+        # Se reutiliza la LSTM del modelo original, sin copiar los pesos ni
+        # tocarla: su dropout entre capas no hace nada en eval.
+        self.lstm = model.lstm
+        self.fc = model.fc
+
+    def _cnn(self, x: torch.Tensor, mask_lengths: torch.Tensor | None) -> torch.Tensor:
+        x = x.unsqueeze(1)
+
+        x = torch.relu(self.conv1(x))
+        x = nn.functional.max_pool2d(x, kernel_size=2, stride=2)
+        if mask_lengths is not None:
+            x = _mask_time_padding(x, mask_lengths)
+
+        x = torch.relu(self.conv2(x))
+        x = nn.functional.max_pool2d(x, kernel_size=2, stride=2)
+
+        batch, channels, freq, time = x.size()
+        x = x.permute(0, 3, 1, 2)
+        return x.reshape(batch, time, channels * freq)
+
+    def forward_dense(self, x: torch.Tensor) -> torch.Tensor:
+        """Log-probs de un batch sin relleno (todas las filas completas).
+
+        No tiene máscara ni empaquetado, así que es el grafo que se exporta a
+        TorchScript/ONNX con los ejes de batch y tiempo dinámicos.
+        """
+        x, _ = self.lstm(self._cnn(x, None))
+        return torch.log_softmax(self.fc(x), dim=2)
+
+    def forward(
+        self, x: torch.Tensor, input_lengths: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        output_lengths = input_lengths // 4
+        if bool((input_lengths == x.size(2)).all()):
+            # Sin relleno, enmascarar y empaquetar no cambian el resultado.
+            return self.forward_dense(x), output_lengths
+
+        x = self._cnn(x, input_lengths // 2)
+        packed = nn.utils.rnn.pack_padded_sequence(
+            x,
+            output_lengths.cpu(),
+            batch_first=True,
+            enforce_sorted=False,
+        )
+        packed_out, _ = self.lstm(packed)
+        x, _ = nn.utils.rnn.pad_packed_sequence(packed_out, batch_first=True)
+
+        log_probs = torch.log_softmax(self.fc(x), dim=2)
+        return log_probs, output_lengths
+
+
 class AsrTranscriber:
     def __init__(
         self,
-        model: ASRCNN_BiLSTM,
+        model: nn.Module,
         idx_to_char: dict[int, str],
         config: ModelConfig,
         device: torch.device,
+        decoder: str = "greedy",
+        beam_config: BeamSearchConfig | None = None,
+        feature_cache: FeatureCache | None = None,
+        checkpoint_fingerprint: str = "",
+        quantize: str | None = None,
+        backend: InferenceBackend | None = None,
+        metrics_hook: MetricsHook | None = None,
     ) -> None:
+        if decoder not in DECODERS:
+            raise ValueError(f"Decoder desconocido: {decoder!r} (opciones: {DECODERS})")
+
         self.model = model
         self.idx_to_char = idx_to_char
         self.config = config
         self.device = device
+        self.decoder = decoder
+        self.beam_config = beam_config or BeamSearchConfig()
+        self.features = MelFeatureExtractor.from_config(config, device=device)
+        self.feature_cache = feature_cache
+        # Hash del checkpoint cargado; distingue resultados de modelos distintos.
+        self.checkpoint_fingerprint = checkpoint_fingerprint
+        self.quantize = quantize
+        self.backend = backend or EagerBackend(model)
+        # Se llama con ("transcribe", Timings) al terminar cada transcripción.
+        self.metrics_hook = metrics_hook
+        # Tiempos de load_transcriber, si el transcriptor se creó así.
+        self.load_timings: Timings | None = None
+        self._profile_dir: Path | None = None
+
+    def decoder_settings(self) -> dict[str, Any]:
+        """Parámetros que afectan el texto producido por ``_decode``."""
+        if self.decoder != "beam":
+            return {"decoder": self.decoder}
+
+        # Sin dataclasses.asdict: haría deepcopy del LM.
+        settings = {
+            f.name: getattr(self.beam_config, f.name) for f in fields(self.beam_config)
+        }
+        lm = self.beam_config.lm
+        settings["lm"] = lm.fingerprint if lm is not None else None
+        return {"decoder": self.decoder, **settings}
+
+    @property
+    def frame_seconds(self) -> float:
+        # Las dos capas de max-pool reducen el tiempo x4 respecto al mel.
+        return self.config.hop_length * 4 / self.config.sample_rate
 
     @staticmethod
     def _decode_greedy(
         log_probs: torch.Tensor, idx_to_char: dict[int, str], blank_idx: int = 0
-    ) -> tuple[str, float]:
-        probs = torch.exp(log_probs)
-        max_probs, indices = torch.max(probs, dim=1)
-
-        decoded_chars: list[str] = []
-        confidences: list[float] = []
-        prev_idx: int | None = None
-
-        for idx, conf in zip(indices.cpu().numpy(), max_probs.cpu().numpy()):
-            idx_int = int(idx)
-            if idx_int != prev_idx and idx_int != blank_idx:
-                decoded_chars.append(idx_to_char.get(idx_int, ""))
-                confidences.append(float(conf))
-            prev_idx = idx_int
-
-        text = "".join(decoded_chars)
-        confidence = float(sum(confidences) / len(confidences)) if confidences else 0.0
-        return text, confidence
-
-    def transcribe_wav(self, audio_path: str | Path) -> tuple[str, float]:
-        import librosa
-
-        audio_path = Path(audio_path)
-        audio, _ = librosa.load(str(audio_path), sr=self.config.sample_rate, mono=True)
-
-        mel = librosa.feature.melspectrogram(
-            y=audio,
-            sr=self.config.sample_rate,
-            n_mels=self.config.n_mels,
-            n_fft=self.config.n_fft,
-            hop_length=self.config.hop_length,
-            win_length=self.config.win_length,
-            window="hamming",
-            center=True,
-            pad_mode="reflect",
+    ) -> Transcription:
+        max_log_probs, indices = torch.max(log_probs, dim=1)
+
+        # Colapso CTC: cada corrida de índices iguales es un símbolo; se
+        # descartan los blanks. La confianza de un carácter es la probabilidad
+        # del primer frame de su corrida.
+        symbols, counts = torch.unique_consecutive(indices, return_counts=True)
+        ends = torch.cumsum(counts, dim=0)
+        starts = ends - counts
+
+        keep = symbols != blank_idx
+        symbols, starts, ends = symbols[keep], starts[keep], ends[keep]
+
+        text = "".join(idx_to_char.get(i, "") for i in symbols.tolist())
+        if symbols.numel():
+            confidence = float(torch.exp(max_log_probs[starts]).mean())
+        else:
+            confidence = 0.0
+        char_frames = tuple(zip(starts.tolist(), ends.tolist()))
+        return Transcription(text=text, confidence=confidence, char_frames=char_frames)
+
+    def _decode_beam(self, log_probs: torch.Tensor) -> Transcription:
+        result = ctc_prefix_beam_search(
+            log_probs.cpu().numpy(), self.idx_to_char, self.beam_config, blank_idx=0
         )
-        mel_db = librosa.power_to_db(mel, ref=np.max)
+        text = "".join(self.idx_to_char.get(i, "") for i in result.tokens)
+        # Probabilidad media por frame (media geométrica) del camino elegido.
+        num_frames = max(1, int(log_probs.size(0)))
+        confidence = (
+            float(np.exp(result.acoustic_log_prob / num_frames)) if text else 0.0
+        )
+        char_frames = tuple((f, f + 1) for f in result.frames)
+        return Transcription(text=text, confidence=confidence, char_frames=char_frames)
+
+    def _decode(self, log_probs: torch.Tensor) -> Transcription:
+        check_cancelled()
+        with span("decode"):
+            if self.decoder == "beam":
+                return self._decode_beam(log_probs)
+            return self._decode_greedy(log_probs, self.idx_to_char, blank_idx=0)
+
+    def _load_audio(self, source: AudioSource) -> np.ndarray:
+        # Los arrays se asumen ya a config.sample_rate.
+        if isinstance(source, np.ndarray):
+            return load_audio(source, self.config.sample_rate)
+
+        check_cancelled()
+        with span("resample"):
+            return load_audio(source, self.config.sample_rate)
+
+    def _compute_mel(self, audio: np.ndarray) -> torch.Tensor:
+        check_cancelled()
+        with span("mel"):
+            mel_db, _ = self.features(audio)
+        return mel_db[0]
+
+    def _features(self, source: AudioSource) -> torch.Tensor:
+        cache = self.feature_cache
+        if cache is None:
+            return self._compute_mel(self._load_audio(source))
+
+        key = cache.key(hash_audio(source), self.config)
+        cached = cache.get(key)
+        if cached is not None:
+            return torch.from_numpy(cached)
+
+        mel_db = self._compute_mel(self._load_audio(source))
+        cache.put(key, mel_db.cpu().numpy())
+        return mel_db
+
+    def _forward_mels(
+        self, mels: Sequence[torch.Tensor]
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        lengths = [int(m.size(1)) for m in mels]
 
-        mel_tensor = (
-            torch.tensor(mel_db, dtype=torch.float32).unsqueeze(0).to(self.device)
+        # Relleno con 0.0, el mismo valor que el zero-padding de conv1.
+        mel_tensor = torch.zeros(
+            (len(mels), self.config.n_mels, max(lengths)),
+            dtype=torch.float32,
+            device=self.device,
         )
-        mel_length = torch.tensor([mel_tensor.size(2)], dtype=torch.long).to(
-            self.device
+        for row, mel in enumerate(mels):
+            mel_tensor[row, :, : lengths[row]] = mel
+        mel_lengths = torch.tensor(lengths, dtype=torch.long).to(self.device)
+
+        check_cancelled()
+        with span("forward"):
+            return self.backend(mel_tensor, mel_lengths)
+
+    def log_probs(self, audio: np.ndarray) -> torch.Tensor:
+        """Log-probs CTC ``(frames, vocabulario)`` de un audio mono ya a
+        ``config.sample_rate``: el mel y una pasada del modelo, sin caché."""
+        log_probs, output_lengths = self._forward_mels([self._compute_mel(audio)])
+        return log_probs[0, : int(output_lengths[0])]
+
+    def decode(self, log_probs: torch.Tensor) -> Transcription:
+        """Texto de log-probs ``(frames, vocabulario)`` con el decodificador
+        configurado."""
+        return self._decode(log_probs)
+
+    def warmup(self, seconds: float = 1.0) -> None:
+        """Pasada con silencio para que la primera transcripción real no pague
+        la reserva de memoria ni la selección de kernels."""
+        audio = np.zeros(int(seconds * self.config.sample_rate), dtype=np.float32)
+        self._forward_mels([self._compute_mel(audio)])
+
+    def warmup_audio_io(self) -> None:
+        """Lee y remuestrea un WAV corto para importar soundfile y scipy y
+        diseñar el filtro de 44.1 kHz antes del primer archivo real."""
+        import tempfile
+
+        import soundfile as sf
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "warmup.wav"
+            sf.write(str(path), np.zeros(4410, dtype=np.float32), 44100)
+            self._compute_mel(self._load_audio(path))
+
+    def _iter_windows(
+        self, source: AudioSource, window: int, step: int
+    ) -> Iterator[tuple[np.ndarray, bool]]:
+        """Ventanas de ``window`` muestras cada ``step`` y si es la última.
+
+        Los archivos se leen por partes con soundfile, así que nunca hay más de
+        una ventana de audio en memoria.
+        """
+        sample_rate = self.config.sample_rate
+
+        # Lo que ya está en memoria se corta en vistas, sin releer nada.
+        if isinstance(source, (np.ndarray, DecodedAudio)):
+            audio = self._load_audio(source)
+            total = audio.shape[0]
+            start = 0
+            while True:
+                last = start + window >= total
+                yield audio[start : start + window], last
+                if last:
+                    return
+                start += step
+
+        import soundfile as sf
+
+        try:
+            f = sf.SoundFile(str(Path(source)))
+        except RuntimeError:
+            # Formato que soundfile no lee: se carga completo (ver load_audio).
+            yield from self._iter_windows(self._load_audio(source), window, step)
+            return
+
+        with f:
+            native_rate = int(f.samplerate)
+            total = int(math.ceil(f.frames * sample_rate / native_rate))
+            start = 0
+            while True:
+                last = start + window >= total
+                with span("resample"):
+                    f.seek(int(round(start * native_rate / sample_rate)))
+                    chunk = f.read(
+                        int(math.ceil(window * native_rate / sample_rate)),
+                        dtype="float32",
+                        always_2d=True,
+                    )
+                    chunk = resample(downmix(chunk), native_rate, sample_rate)
+                yield chunk[: min(window, total - start)], last
+                if last:
+                    return
+                start += step
+
+    def _transcribe_chunked(
+        self,
+        audio: AudioSource,
+        chunk_seconds: float,
+        overlap_seconds: float,
+        chunk_batch_size: int,
+    ) -> Transcription:
+        # Ventanas y solapamiento alineados a frames de salida (hop x4), con un
+        # número par de frames de solapamiento: cada ventana descarta la mitad
+        # del solapamiento en cada borde y los tramos conservados quedan
+        # contiguos en el eje de tiempo global.
+        sample_rate = self.config.sample_rate
+        frame_samples = self.config.hop_length * 4
+        window_frames = max(1, round(chunk_seconds * sample_rate / frame_samples))
+        half_overlap = max(0, round(overlap_seconds * sample_rate / frame_samples / 2))
+        step_frames = window_frames - 2 * half_overlap
+        if step_frames <= 0:
+            raise ValueError("El solapamiento debe ser menor que la duración del chunk")
+
+        kept: list[torch.Tensor] = []
+        first = True
+        pending: list[tuple[np.ndarray, bool]] = []
+
+        def flush() -> None:
+            nonlocal first
+            log_probs, output_lengths = self._forward_mels(
+                [self._compute_mel(chunk) for chunk, _ in pending]
+            )
+            for row, (_, last) in enumerate(pending):
+                length = int(output_lengths[row])
+                lo = 0 if first else half_overlap
+                hi = length if last else min(length, step_frames + half_overlap)
+                kept.append(log_probs[row, lo:hi].cpu())
+                first = False
+            pending.clear()
+
+        windows = self._iter_windows(
+            audio, window_frames * frame_samples, step_frames * frame_samples
         )
+        for chunk, last in windows:
+            # Una cola de menos de un frame de salida no aporta frames.
+            if chunk.shape[0] >= frame_samples or first and not pending:
+                pending.append((chunk, last))
+            if pending and (len(pending) >= chunk_batch_size or last):
+                flush()
 
-        with torch.no_grad():
-            log_probs, _ = self.model(mel_tensor, mel_length)
+        return self._decode(torch.cat(kept, dim=0))
 
-        text, confidence = self._decode_greedy(
-            log_probs[0], self.idx_to_char, blank_idx=0
+    def _transcribe_mels(
+        self,
+        mels: Sequence[torch.Tensor],
+        max_batch_frames: int,
+        max_length_ratio: float | None,
+    ) -> list[Transcription]:
+        results: list[Transcription] = [Transcription("", 0.0)] * len(mels)
+        lengths = [m.size(1) for m in mels]
+        for bucket in _length_buckets(lengths, max_batch_frames, max_length_ratio):
+            log_probs, output_lengths = self._forward_mels([mels[i] for i in bucket])
+            for row, idx in enumerate(bucket):
+                length = int(output_lengths[row])
+                results[idx] = self._decode(log_probs[row, :length])
+        return results
+
+    def _transcribe_speech(
+        self,
+        audio: AudioSource,
+        vad: VadConfig,
+        chunk_seconds: float | None,
+        overlap_seconds: float,
+        chunk_batch_size: int,
+        max_batch_frames: int,
+    ) -> Transcription:
+        # El VAD necesita el audio completo, así que aquí no se lee por partes.
+        samples = self._load_audio(audio)
+        sample_rate = self.config.sample_rate
+        with span("vad"):
+            segments = detect_speech(samples, sample_rate, vad)
+        report = vad_report(segments, samples.shape[0], sample_rate)
+
+        clips = [samples[start:end] for start, end in segments]
+        max_samples = None if chunk_seconds is None else chunk_seconds * sample_rate
+        short = [
+            i
+            for i, clip in enumerate(clips)
+            if max_samples is None or clip.shape[0] <= max_samples
+        ]
+        parts: list[Transcription] = [Transcription("", 0.0)] * len(clips)
+        for i, result in zip(
+            short,
+            self._transcribe_mels(
+                [self._compute_mel(clips[i]) for i in short],
+                max_batch_frames=max_batch_frames,
+                max_length_ratio=VAD_LENGTH_RATIO,
+            ),
+        ):
+            parts[i] = result
+        batched = set(short)
+        for i, clip in enumerate(clips):
+            if i not in batched:
+                parts[i] = self._transcribe_chunked(
+                    clip, chunk_seconds, overlap_seconds, chunk_batch_size
+                )
+
+        frame_samples = self.config.hop_length * 4
+        offsets = [start // frame_samples for start, _ in segments]
+        return replace(_join_segments(parts, offsets), vad=report)
+
+    def profile_next(self, output_dir: str | Path) -> None:
+        """Perfila la próxima transcripción (ver ``timings.profile_trace``)."""
+        self._profile_dir = Path(output_dir)
+
+    @contextmanager
+    def _measure(self) -> Iterator[Timings]:
+        timings = Timings()
+        profile_dir, self._profile_dir = self._profile_dir, None
+        with ExitStack() as stack:
+            if profile_dir is not None:
+                stack.enter_context(profile_trace(profile_dir, "transcribe"))
+            stack.enter_context(timings.activate())
+            yield timings
+        if self.metrics_hook is not None:
+            self.metrics_hook("transcribe", timings)
+
+    def transcribe(
+        self,
+        audio: AudioSource,
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        chunk_batch_size: int = 4,
+        vad: VadConfig | None = None,
+        max_batch_frames: int = 48000,
+    ) -> Transcription:
+        """Transcribe un audio completo o, con ``chunk_seconds``, por ventanas.
+
+        En modo por ventanas el audio se lee de a ``chunk_seconds`` con
+        ``overlap_seconds`` de solapamiento, las ventanas se procesan de a
+        ``chunk_batch_size`` por pasada del modelo y las salidas CTC se unen
+        recortando el solapamiento. La memoria pico ya no depende de la duración
+        del archivo, salvo por los log-probs acumulados (~3 KB por segundo).
+
+        Con ``vad`` solo se transcriben los tramos con voz (en batch, o por
+        ventanas los más largos que ``chunk_seconds``) y los textos se unen en
+        orden; ``Transcription.vad`` informa el cómputo ahorrado. Los tramos
+        se agrupan como en ``transcribe_many``, con ``max_batch_frames``.
+
+        ``Transcription.timings`` trae el tiempo de cada etapa, que además se
+        pasa a ``metrics_hook``. Dentro de un job de ``jobs.JobExecutor``, una
+        cancelación corta la transcripción con ``jobs.Cancelled`` en el
+        siguiente cambio de etapa o de ventana.
+        """
+        with self._measure() as timings:
+            result = self._transcribe(
+                audio,
+                chunk_seconds,
+                overlap_seconds,
+                chunk_batch_size,
+                vad,
+                max_batch_frames,
+            )
+        return replace(result, timings=timings)
+
+    def _transcribe(
+        self,
+        audio: AudioSource,
+        chunk_seconds: float | None,
+        overlap_seconds: float,
+        chunk_batch_size: int,
+        vad: VadConfig | None,
+        max_batch_frames: int,
+    ) -> Transcription:
+        if vad is not None:
+            return self._transcribe_speech(
+                audio,
+                vad,
+                chunk_seconds,
+                overlap_seconds,
+                chunk_batch_size,
+                max_batch_frames,
+            )
+        if chunk_seconds is not None:
+            return self._transcribe_chunked(
+                audio, chunk_seconds, overlap_seconds, chunk_batch_size
+            )
+
+        mel_db = self._features(audio)
+        log_probs, _ = self._forward_mels([mel_db])
+        return self._decode(log_probs[0])
+
+    def transcribe_many(
+        self,
+        paths_or_arrays: Sequence[AudioSource],
+        max_batch_frames: int = 48000,
+        max_length_ratio: float | None = None,
+    ) -> list[Transcription]:
+        """Transcribe varios audios agrupándolos por longitud.
+
+        Cada grupo (bucket) contiene clips de longitud parecida y como máximo
+        ``max_batch_frames`` frames de mel contando el relleno, y se procesa en
+        una sola pasada del modelo. Con ``max_length_ratio`` además se corta el
+        bucket cuando el clip más largo supera en esa proporción al más corto
+        (en CPU, un batch con mucho relleno es más lento que procesar los clips
+        por separado). Los resultados vuelven en el orden de entrada.
+        """
+        with self._measure() as timings:
+            mels = [self._features(src) for src in paths_or_arrays]
+            results = self._transcribe_mels(mels, max_batch_frames, max_length_ratio)
+        # Una sola medición para todo el grupo: cada resultado la comparte.
+        return [replace(result, timings=timings) for result in results]
+
+    def transcribe_pipelined(
+        self,
+        sources: Sequence[AudioSource],
+        workers: int = 2,
+        prefetch: int = 4,
+        lookup: Callable[[int, AudioSource], Transcription | None] | None = None,
+    ) -> Iterator[tuple[int, Transcription | Exception]]:
+        """Transcribe ``sources`` uno por uno, preparando los siguientes en paralelo.
+
+        La lectura, el remuestreo y el mel de los próximos ``prefetch`` audios
+        corren en ``workers`` threads mientras el modelo procesa el actual, así
+        el modelo no espera al disco entre archivos. Devuelve ``(índice,
+        resultado)`` en el orden de entrada; un archivo que falla entrega su
+        excepción en lugar del resultado y la cola sigue. Cada audio pasa
+        entero por el modelo (sin ventanas ni VAD).
+
+        ``lookup(índice, audio)`` se llama en los threads de preparación antes
+        de leer el audio; si devuelve un resultado, ese audio sale tal cual sin
+        pasar por el modelo (así la caché de resultados consulta cada archivo
+        mientras el modelo procesa otro).
+        """
+
+        def prepare(
+            index: int, source: AudioSource
+        ) -> tuple[Timings, torch.Tensor | Transcription]:
+            timings = Timings()
+            if lookup is not None:
+                cached = lookup(index, source)
+                if cached is not None:
+                    return timings, cached
+            with timings.activate():
+                mel_db = self._features(source)
+            return timings, mel_db
+
+        pending: deque[tuple[int, Future]] = deque()
+        queued = iter(enumerate(sources))
+        with ThreadPoolExecutor(workers, thread_name_prefix="asr-prep") as pool:
+
+            def refill() -> None:
+                for index, source in queued:
+                    pending.append((index, pool.submit(prepare, index, source)))
+                    if len(pending) >= prefetch:
+                        return
+
+            try:
+                refill()
+                while pending:
+                    index, future = pending.popleft()
+                    refill()
+                    try:
+                        timings, prepared = future.result()
+                        found = isinstance(prepared, Transcription)
+                        if not found:
+                            # Los tiempos del modelo se suman a los de la
+                            # preparación.
+                            with timings.activate():
+                                log_probs, _ = self._forward_mels([prepared])
+                                result = self._decode(log_probs[0])
+                    except Cancelled:
+                        raise
+                    except Exception as exc:
+                        yield index, exc
+                        continue
+                    if found:
+                        # Devuelto por lookup: no pasó por el modelo.
+                        yield index, prepared
+                        continue
+                    if self.metrics_hook is not None:
+                        self.metrics_hook("transcribe", timings)
+                    yield index, replace(result, timings=timings)
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def transcribe_wavs(
+        self, audio_paths: Sequence[str | Path], workers: int = 2
+    ) -> Iterator[tuple[int, tuple[str, float] | Exception]]:
+        """``transcribe_pipelined`` con resultados ``(texto, confianza)``."""
+        for index, result in self.transcribe_pipelined(audio_paths, workers):
+            if isinstance(result, Exception):
+                yield index, result
+            else:
+                yield index, (result.text, result.confidence)
+
+    def transcribe_wav(
+        self,
+        audio_path: AudioSource,
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        vad: VadConfig | None = None,
+    ) -> tuple[str, float]:
+        result = self.transcribe(
+            audio_path,
+            chunk_seconds=chunk_seconds,
+            overlap_seconds=overlap_seconds,
+            vad=vad,
+        )
+        return result.text, result.confidence
+
+    def transcribe_batch(
+        self, paths_or_arrays: Sequence[AudioSource], max_batch_frames: int = 48000
+    ) -> list[tuple[str, float]]:
+        return [
+            (r.text, r.confidence)
+            for r in self.transcribe_many(paths_or_arrays, max_batch_frames)
+        ]
+
+
+def _join_segments(
+    parts: Sequence[Transcription], offsets: Sequence[int]
+) -> Transcription:
+    # Une los textos de cada segmento con un espacio, en el eje de tiempo del
+    # audio completo (``offsets`` en frames de salida). El espacio agregado
+    # ocupa cero frames al inicio del segmento siguiente.
+    text: list[str] = []
+    char_frames: list[tuple[int, int]] = []
+    weighted = 0.0
+    num_chars = 0
+    for part, offset in zip(parts, offsets):
+        lo = len(part.text) - len(part.text.lstrip())
+        hi = len(part.text.rstrip())
+        if lo >= hi:
+            continue
+        if text:
+            text.append(" ")
+            char_frames.append((offset, offset))
+        text.append(part.text[lo:hi])
+        char_frames.extend((s + offset, e + offset) for s, e in part.char_frames[lo:hi])
+        weighted += part.confidence * (hi - lo)
+        num_chars += hi - lo
+
+    confidence = weighted / num_chars if num_chars else 0.0
+    return Transcription("".join(text), confidence, tuple(char_frames))
+
+
+def _length_buckets(
+    lengths: Sequence[int],
+    max_batch_frames: int,
+    max_length_ratio: float | None = None,
+) -> list[list[int]]:
+    # Ordenar por longitud deja juntos clips parecidos; cada bucket crece mientras
+    # (n_clips * longitud_máxima) quepa en max_batch_frames y, si se pide, la
+    # longitud máxima no pase de max_length_ratio veces la mínima.
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+    buckets: list[list[int]] = []
+    current: list[int] = []
+    for idx in order:
+        full = current and (len(current) + 1) * lengths[idx] > max_batch_frames
+        spread = (
+            current
+            and max_length_ratio is not None
+            and lengths[idx] > lengths[current[0]] * max_length_ratio
         )
-        return text, confidence
+        if full or spread:
+            buckets.append(current)
+            current = []
+        current.append(idx)
+    if current:
+        buckets.append(current)
+    return buckets
 
 
 def _parse_model_config(raw: dict[str, Any]) -> ModelConfig:
@@ -187,33 +832,144 @@ def _coerce_idx_to_char(mapping: dict[Any, Any]) -> dict[int, str]:
     return out
 
 
+def _build_model(config: ModelConfig) -> ASRCNN_BiLSTM:
+    return ASRCNN_BiLSTM(
+        n_mels=config.n_mels,
+        hidden_size=config.hidden_size,
+        vocab_size=config.vocab_size,
+        num_lstm_layers=config.num_lstm_layers,
+        dropout=config.dropout,
+    )
+
+
+def quantize_int8(model: nn.Module) -> nn.Module:
+    """Cuantización dinámica int8 (en el lugar) de la BiLSTM y la capa ``fc``.
+
+    Los pesos quedan en int8 y las activaciones se cuantizan al vuelo en cada
+    llamada; solo tiene kernels en CPU. Las convoluciones quedan en float.
+    """
+    with warnings.catch_warnings():
+        # torch.ao.quantization avisa que migrará a torchao; sigue funcionando.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return torch.ao.quantization.quantize_dynamic(
+            model, {nn.LSTM, nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+
 def load_transcriber(
-    checkpoint_path: str | Path, device: torch.device | None = None
+    checkpoint_path: str | Path,
+    device: torch.device | None = None,
+    decoder: str = "greedy",
+    beam_config: BeamSearchConfig | None = None,
+    feature_cache: FeatureCache | None = None,
+    quantize: str | None = None,
+    optimize: bool = True,
+    backend: str = "eager",
+    backend_path: str | Path | None = None,
+    metrics_hook: MetricsHook | None = None,
 ) -> AsrTranscriber:
-    device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    """Carga un checkpoint y arma el transcriptor listo para usar.
 
-    checkpoint_path = Path(checkpoint_path)
-    checkpoint = torch.load(str(checkpoint_path), map_location=device)
+    Con ``optimize`` (por defecto) el modelo se reemplaza por
+    ``InferenceASRCNN_BiLSTM`` y se hace una pasada de calentamiento antes de
+    devolverlo.
 
-    if not isinstance(checkpoint, dict) or "model_state_dict" not in checkpoint:
+    ``backend`` elige cómo se ejecuta el modelo (ver ``backends.BACKENDS``);
+    los backends exportados leen ``backend_path`` o, por defecto, el archivo
+    que escribe ``asr-export`` junto al checkpoint.
+
+    El tiempo de cada etapa de la carga queda en ``load_timings``;
+    ``metrics_hook`` lo recibe como evento ``"load"`` y después uno
+    ``"transcribe"`` por cada transcripción.
+    """
+    if quantize not in QUANTIZATIONS:
         raise ValueError(
-            "Checkpoint no tiene formato esperado (falta 'model_state_dict')"
+            f"Cuantización desconocida: {quantize!r} (opciones: {QUANTIZATIONS})"
         )
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend!r} (opciones: {BACKENDS})")
+    if quantize is not None and backend != "eager":
+        raise ValueError("La cuantización int8 solo está disponible con backend eager")
+    if quantize is not None or backend == "onnx":
+        if device is not None and device.type != "cpu":
+            raise ValueError(
+                "La cuantización int8 y el backend ONNX solo funcionan en CPU"
+            )
+        device = torch.device("cpu")
 
-    config = _parse_model_config(checkpoint["model_config"])  # type: ignore[arg-type]
-    idx_to_char = _coerce_idx_to_char(checkpoint["idx_to_char"])  # type: ignore[arg-type]
-
-    model = ASRCNN_BiLSTM(
-        n_mels=config.n_mels,
-        hidden_size=config.hidden_size,
-        vocab_size=config.vocab_size,
-        num_lstm_layers=config.num_lstm_layers,
-        dropout=config.dropout,
-    ).to(device)
-
-    model.load_state_dict(checkpoint["model_state_dict"])  # type: ignore[arg-type]
-    model.eval()
+    device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-    return AsrTranscriber(
-        model=model, idx_to_char=idx_to_char, config=config, device=device
-    )
+    timings = Timings()
+    with timings.activate():
+        checkpoint_path = Path(checkpoint_path)
+        fingerprint = ""
+        with span("read"):
+            if is_inference_checkpoint(checkpoint_path):
+                # Pesos mapeados del archivo: el modelo se arma en "meta" (sin
+                # memoria) y load_state_dict(assign=True) usa los tensores
+                # mapeados tal cual.
+                state_dict, raw_config, raw_idx_to_char, fingerprint = (
+                    load_inference_checkpoint(checkpoint_path)
+                )
+                config = _parse_model_config(raw_config)
+                idx_to_char = _coerce_idx_to_char(raw_idx_to_char)
+                with torch.device("meta"):
+                    model = _build_model(config)
+                model.load_state_dict(state_dict, assign=True)
+                model = model.to(device)
+            else:
+                checkpoint = torch.load(str(checkpoint_path), map_location=device)
+
+                if (
+                    not isinstance(checkpoint, dict)
+                    or "model_state_dict" not in checkpoint
+                ):
+                    raise ValueError(
+                        "Checkpoint no tiene formato esperado (falta 'model_state_dict')"
+                    )
+
+                config = _parse_model_config(checkpoint["model_config"])  # type: ignore[arg-type]
+                idx_to_char = _coerce_idx_to_char(checkpoint["idx_to_char"])  # type: ignore[arg-type]
+
+                model = _build_model(config).to(device)
+                model.load_state_dict(checkpoint["model_state_dict"])  # type: ignore[arg-type]
+            model.eval()
+
+        with span("optimize"):
+            if optimize:
+                model = InferenceASRCNN_BiLSTM(model).eval()
+            if quantize == "int8":
+                model = quantize_int8(model)
+
+        # El formato compacto trae el hash del .pth de origen: los resultados
+        # en caché y los modelos exportados siguen valiendo tras convertirlo.
+        with span("fingerprint"):
+            fingerprint = fingerprint or hash_file(checkpoint_path)
+        if backend != "eager" and backend_path is None:
+            backend_path = default_export_path(checkpoint_path, backend)
+
+        with span("backend"):
+            inference_backend = load_backend(
+                backend, model, device, backend_path, fingerprint
+            )
+        transcriber = AsrTranscriber(
+            model=model,
+            idx_to_char=idx_to_char,
+            config=config,
+            device=device,
+            decoder=decoder,
+            beam_config=beam_config,
+            feature_cache=feature_cache,
+            checkpoint_fingerprint=fingerprint,
+            quantize=quantize,
+            backend=inference_backend,
+            metrics_hook=metrics_hook,
+        )
+        if optimize:
+            with span("warmup"):
+                transcriber.warmup()
+
+    transcriber.load_timings = timings
+    if metrics_hook is not None:
+        metrics_hook("load", timings)
+    return transcriber
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from pathlib import Path
+
+import numpy as np
+
+# Filtro antialias del remuestreo polifásico (sin soxr): ventana Kaiser con beta 5, como
+# scipy.signal.resample_poly por defecto, con 10 ceros por lado.
+KAISER_BETA = 5.0
+HALF_ZEROS = 10
+
+# Audio de cada lado que ``resample_span`` usa como contexto del filtro (s).
+SPAN_CONTEXT_SECONDS = 0.01
+
+# Tamaño decodificado (float32) a partir del cual un archivo no se carga
+# entero: ~25 min a 44.1 kHz estéreo, más de 1 h a 16 kHz mono.
+DECODE_MAX_BYTES = 256 * 1024**2
+
+
+@dataclass(frozen=True, eq=False)
+class DecodedAudio:
+    """Un archivo decodificado una sola vez, a su frecuencia original.
+
+    ``samples`` es (muestras, canales) float32. El reproductor, la forma de
+    onda y el transcriptor toman vistas de este mismo array en vez de volver a
+    leer el archivo; ninguno lo modifica. ``path`` es el archivo de origen (lo
+    usan el servidor y la caché de picos), o None si vino de memoria.
+    """
+
+    samples: np.ndarray
+    sample_rate: int
+    path: Path | None = None
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> DecodedAudio:
+        """Lee con soundfile; lo que soundfile no lee pasa por librosa."""
+        import soundfile as sf
+
+        path = Path(path)
+        try:
+            samples, sample_rate = sf.read(str(path), dtype="float32", always_2d=True)
+        except RuntimeError:
+            import librosa
+
+            audio, sample_rate = librosa.load(str(path), sr=None, mono=False)
+            samples = np.ascontiguousarray(np.atleast_2d(audio).T, dtype=np.float32)
+        if samples.shape[0] == 0:
+            raise ValueError("Audio vacío")
+        return cls(samples, int(sample_rate), path)
+
+    @property
+    def frames(self) -> int:
+        return int(self.samples.shape[0])
+
+    @property
+    def channels(self) -> int:
+        return int(self.samples.shape[1])
+
+    @property
+    def seconds(self) -> float:
+        return self.frames / self.sample_rate
+
+    @cached_property
+    def mono(self) -> np.ndarray:
+        """Vista mono (sin copia si el audio ya es mono); se calcula una vez."""
+        return downmix(self.samples)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Huella de las muestras (ver ``hash_audio``); no relee el archivo."""
+        from fingerprints import hash_audio
+
+        return hash_audio(self.samples)
+
+
+def decoded_bytes(path: str | Path) -> int | None:
+    """Bytes que ocuparía el archivo decodificado en float32, sin leerlo.
+
+    None si soundfile no lo abre (esos formatos se decodifican con librosa).
+    """
+    import soundfile as sf
+
+    try:
+        info = sf.info(str(path))
+    except RuntimeError:
+        return None
+    return int(info.frames) * int(info.channels) * 4
+
+
+AudioSource = str | Path | np.ndarray | DecodedAudio
+
+
+def downmix(audio: np.ndarray) -> np.ndarray:
+    """Mono float32 a partir de ``(muestras,)`` o ``(muestras, canales)``.
+
+    Un solo canal (o un array con una sola fila) se devuelve sin copiar; con
+    varios se suman sobre el primero, copiado una vez, en vez de armar el
+    promedio con temporales.
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim == 1 or 1 in audio.shape:
+        return audio.reshape(-1)
+    mono = audio[:, 0].copy()
+    for channel in range(1, audio.shape[1]):
+        mono += audio[:, channel]
+    mono *= 1.0 / audio.shape[1]
+    return mono
+
+
+@lru_cache(maxsize=16)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    from scipy.signal import firwin
+
+    max_rate = max(up, down)
+    taps = firwin(
+        2 * HALF_ZEROS * max_rate + 1, 1.0 / max_rate, window=("kaiser", KAISER_BETA)
+    )
+    # En float32 el filtrado corre en float32 (~20 % más rápido que en float64).
+    taps = taps.astype(np.float32)
+    taps.setflags(write=False)
+    return taps
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Remuestrea float32 (muestras,) o (muestras, canales); si las frecuencias
+    coinciden devuelve el mismo array.
+
+    Usa soxr en calidad HQ (lo mismo que ``librosa.load`` por defecto, así
+    que las features no cambian) y, si no está instalado, un filtro
+    polifásico de scipy.
+    """
+    if orig_sr == target_sr:
+        return audio
+    try:
+        import soxr
+    except ImportError:
+        return _resample_polyphase(audio, orig_sr, target_sr)
+    return soxr.resample(audio, orig_sr, target_sr, quality="HQ").astype(
+        np.float32, copy=False
+    )
+
+
+def _resample_polyphase(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    # El filtro de cada par de frecuencias se diseña una sola vez y queda en
+    # caché, así remuestrear ventana por ventana no lo recalcula cada vez.
+    if orig_sr == target_sr:
+        return audio
+    from scipy.signal import resample_poly
+
+    divisor = math.gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // divisor, int(orig_sr) // divisor
+    # resample_poly copia el filtro antes de escalarlo; el de la caché no cambia.
+    out = resample_poly(audio, up, down, window=_polyphase_filter(up, down))
+    return out.astype(np.float32, copy=False)
+
+
+def span_step(orig_sr: int, target_sr: int) -> int:
+    """Múltiplo de muestras en el que un tramo cae justo en una muestra de salida."""
+    return int(orig_sr) // math.gcd(int(orig_sr), int(target_sr))
+
+
+def span_context(orig_sr: int, target_sr: int) -> int:
+    """Muestras de contexto que ``resample_span`` lee de cada lado del tramo."""
+    if orig_sr == target_sr:
+        return 0
+    step = span_step(orig_sr, target_sr)
+    return math.ceil(SPAN_CONTEXT_SECONDS * orig_sr / step) * step
+
+
+def resample_span(
+    audio: np.ndarray, start: int, stop: int, orig_sr: int, target_sr: int
+) -> np.ndarray:
+    """Remuestrea ``audio[start:stop]`` con el audio de alrededor como contexto.
+
+    Los bordes del tramo se filtran como si se remuestreara el audio entero,
+    así tramos consecutivos se pegan sin clics. ``start`` (y ``stop``, salvo
+    al final del audio) deben ser múltiplos de ``span_step``.
+    """
+    if orig_sr == target_sr:
+        return audio[start:stop]
+    context = span_context(orig_sr, target_sr)
+    lo, hi = max(0, start - context), min(audio.shape[0], stop + context)
+    out = resample(audio[lo:hi], orig_sr, target_sr)
+    first = (start - lo) * target_sr // orig_sr
+    count = math.ceil((stop - start) * target_sr / orig_sr)
+    return out[first : first + count]
+
+
+def load_audio(
+    source: AudioSource, sample_rate: int, source_rate: int | None = None
+) -> np.ndarray:
+    """Audio mono float32 a ``sample_rate``.
+
+    Los archivos se leen con soundfile (WAV, FLAC, OGG...) y solo se
+    remuestrean si vienen a otra frecuencia; lo que soundfile no lee pasa
+    por ``librosa.load``. Un array se toma como ya muestreado a
+    ``sample_rate``, salvo que se indique ``source_rate``. Un
+    ``DecodedAudio`` mono a ``sample_rate`` se devuelve sin copiar.
+    """
+    if isinstance(source, DecodedAudio):
+        return resample(source.mono, source.sample_rate, sample_rate)
+    if isinstance(source, np.ndarray):
+        audio = downmix(source)
+        if source_rate is not None:
+            audio = resample(audio, source_rate, sample_rate)
+        return audio
+
+    import soundfile as sf
+
+    try:
+        data, native_rate = sf.read(str(Path(source)), dtype="float32", always_2d=True)
+    except RuntimeError:
+        import librosa
+
+        audio, _ = librosa.load(str(Path(source)), sr=sample_rate, mono=True)
+        return audio
+    return resample(downmix(data), int(native_rate), sample_rate)
@@ -1,80 +1,122 @@
 from __future__ import annotations
 
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from audio_io import DecodedAudio
+
+# El mezclador se abre una sola vez con este formato; cada audio se remuestrea
+# a él por tramos mientras suena, en vez de cerrarlo y reabrirlo por archivo.
+MIXER_RATE = 44100
+MIXER_CHANNELS = 2
+
+# Segundos de cada tramo que se encola en el canal. Siempre hay uno sonando y
+# otro en cola, así que poll_finished tiene que llamarse antes de que pase
+# este tiempo (la app lo hace cada 50 ms mientras suena).
+CHUNK_SECONDS = 2.0
 
 
 class AudioPlayer:
     def __init__(self) -> None:
-        self._loaded_path: Path | None = None
-        self._sample_rate: int | None = None
-        self._channels: int | None = None
+        self._audio: DecodedAudio | None = None
+        # Con una ruta el audio no se carga entero: cada tramo se lee de acá.
+        self._file = None
+        self._sample_rate: int = 0
+        self._frames: int = 0
+        self._channel = None
+        # (frecuencia, formato, canales) del mezclador, una vez abierto.
+        self._mixer: tuple[int, int, int] | None = None
+        self._chunk_frames: int = 0
+        # Próxima muestra del audio que todavía no se encoló.
+        self._next_frame: int = 0
 
         self._state: str = "stopped"  # stopped | playing | paused
         self._paused_by_user: bool = False
         self._started_once: bool = False
 
+        # Segundo desde el que se cuenta y, mientras suena, cuándo arrancó.
+        self._start_offset: float = 0.0
+        self._clock: float | None = None
+
     @property
     def state(self) -> str:
         return self._state
 
     @property
     def has_audio(self) -> bool:
-        return self._loaded_path is not None
+        return self._frames > 0
+
+    @property
+    def duration(self) -> float:
+        return self._frames / self._sample_rate if self._frames else 0.0
 
-    def load(self, path: str | Path) -> None:
+    @property
+    def position(self) -> float:
+        """Segundos reproducidos desde el inicio del audio."""
+        if self._clock is None:
+            return self._start_offset
+        elapsed = time.perf_counter() - self._clock
+        return min(self._start_offset + elapsed, self.duration)
+
+    def load(self, audio: str | Path | DecodedAudio) -> None:
+        """Prepara ``audio`` para reproducir.
+
+        Con un ``DecodedAudio`` no se vuelve a leer el archivo: los tramos se
+        toman del mismo buffer que usa el transcriptor. Una ruta se lee del
+        disco tramo a tramo mientras suena, así un audio largo no ocupa
+        memoria; lo que soundfile no abre se decodifica entero.
+        """
         import soundfile as sf
-        import pygame
-        from pathlib import Path
-        import tempfile
-        import os
-        try:
-            path = Path(path)
-            with sf.SoundFile(str(path)) as f:
-                if f.frames <= 0:
-                    raise ValueError("Audio vacío")
-                sample_rate = int(f.samplerate)
-                channels = int(f.channels)
 
-            self._loaded_path = path
-            self._ensure_mixer(sample_rate=sample_rate, channels=channels)
+        from audio_io import DecodedAudio, span_step
 
+        self.cleanup()
+        source = None
+        if not isinstance(audio, DecodedAudio):
             try:
-                pygame.mixer.music.load(str(path))
-                self._sample_rate = sample_rate
-                self._channels = channels
-                self._state = "paused"
-                self._paused_by_user = False
-                self._started_once = False
-            except Exception as e:
-                # Si es un ogg y falla, intenta convertir a wav temporalmente
-                if path.suffix.lower() == ".ogg":
-                    try:
-                        from pydub import AudioSegment
-                        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_wav:
-                            audio = AudioSegment.from_file(str(path))
-                            audio.export(tmp_wav.name, format="wav")
-                            tmp_wav_path = tmp_wav.name
-                        try:
-                            pygame.mixer.music.load(tmp_wav_path)
-                            self._sample_rate = sample_rate
-                            self._channels = channels
-                            self._state = "paused"
-                            self._paused_by_user = False
-                            self._started_once = False
-                        finally:
-                            if os.path.exists(tmp_wav_path):
-                                os.remove(tmp_wav_path)
-                    except Exception as conv_exc:
-                        raise RuntimeError(f"No se pudo convertir/reproducir el archivo OGG: {conv_exc}") from e
-                else:
-                    raise e
+                source = sf.SoundFile(str(audio))
+            except RuntimeError:
+                audio = DecodedAudio.from_file(audio)
+        if source is not None:
+            sample_rate, frames = int(source.samplerate), int(source.frames)
+            if frames == 0:
+                # Igual que DecodedAudio.from_file con un archivo vacío.
+                source.close()
+                raise ValueError("Audio vacío")
+        else:
+            sample_rate, frames = audio.sample_rate, audio.frames
+
+        try:
+            self._ensure_mixer()
         except Exception:
+            if source is not None:
+                source.close()
             raise
+        assert self._mixer is not None
+        step = span_step(sample_rate, self._mixer[0])
+        self._chunk_frames = max(1, round(CHUNK_SECONDS * sample_rate / step)) * step
+
+        self._audio = None if source is not None else audio
+        self._file = source
+        self._sample_rate = sample_rate
+        self._frames = frames
+        self._next_frame = 0
+        self._start_offset = 0.0
+        self._clock = None
+        self._state = "paused"
+        self._paused_by_user = False
+        self._started_once = False
+
     def cleanup(self):
-        import os
-        if hasattr(self, '_temp_wav_path') and os.path.exists(self._temp_wav_path):
-            os.remove(self._temp_wav_path)
-            del self._temp_wav_path
+        self.stop()
+        if self._file is not None:
+            self._file.close()
+        self._audio = None
+        self._file = None
+        self._frames = 0
+        self._state = "stopped"
 
     def __enter__(self):
         return self
@@ -82,13 +124,13 @@ class AudioPlayer:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.cleanup()
     def toggle_play_pause(self) -> None:
-        if self._loaded_path is None:
+        if not self.has_audio:
             return
 
-        import pygame
-
         if self._state == "playing":
-            pygame.mixer.music.pause()
+            self._start_offset = self.position
+            self._clock = None
+            self._channel.pause()
             self._state = "paused"
             self._paused_by_user = True
             return
@@ -97,9 +139,10 @@ class AudioPlayer:
             self._state = "paused"
 
         if self._paused_by_user:
-            pygame.mixer.music.unpause()
+            self._channel.unpause()
+            self._clock = time.perf_counter()
         else:
-            pygame.mixer.music.play()
+            self._play_from(self._start_offset)
             self._started_once = True
 
         self._state = "playing"
@@ -107,21 +150,37 @@ class AudioPlayer:
 
     def reset(self) -> None:
         self.stop()
-        self._state = "paused" if self._loaded_path is not None else "stopped"
+        self._state = "paused" if self.has_audio else "stopped"
         self._paused_by_user = False
         self._started_once = False
+        self._start_offset = 0.0
+
+    def seek(self, seconds: float) -> None:
+        """Salta a ``seconds``; si estaba en pausa, arranca desde ahí al reanudar."""
+        if not self.has_audio:
+            return
+
+        seconds = min(max(0.0, float(seconds)), self.duration)
+        if self._state == "playing":
+            self._play_from(seconds)
+            return
+
+        self._channel.stop()
+        self._start_offset = seconds
+        self._clock = None
+        self._paused_by_user = False
 
     def stop(self) -> None:
-        if self._loaded_path is None:
+        if not self.has_audio:
             self._state = "stopped"
             self._paused_by_user = False
             self._started_once = False
             return
 
+        self._start_offset = self.position
+        self._clock = None
         try:
-            import pygame
-
-            pygame.mixer.music.stop()
+            self._channel.stop()
         except Exception:
             pass
 
@@ -130,13 +189,14 @@ class AudioPlayer:
         self._paused_by_user = False
 
     def poll_finished(self) -> bool:
-        if self._state != "playing" or self._loaded_path is None:
+        if self._state != "playing" or not self.has_audio:
             return False
 
         try:
-            import pygame
-
-            still_playing = bool(pygame.mixer.music.get_busy())
+            # Encolar el próximo tramo; si el canal se quedó sin nada (la app
+            # tardó en llamar), esto también lo vuelve a arrancar.
+            self._feed()
+            still_playing = bool(self._channel.get_busy())
         except Exception:
             still_playing = False
 
@@ -146,18 +206,85 @@ class AudioPlayer:
         self._state = "paused"
         self._paused_by_user = False
         self._started_once = False
+        self._start_offset = 0.0
+        self._clock = None
         return True
 
-    def _ensure_mixer(self, sample_rate: int, channels: int) -> None:
+    def _play_from(self, seconds: float) -> None:
+        from audio_io import span_step
+
+        assert self.has_audio and self._mixer is not None
+        # El tramo arranca en una muestra que cae justo en una de salida.
+        step = span_step(self._sample_rate, self._mixer[0])
+        frame = int(seconds * self._sample_rate) // step * step
+
+        self._channel.stop()
+        self._next_frame = frame
+        self._channel.play(self._next_sound())
+        self._feed()
+        self._start_offset = frame / self._sample_rate
+        self._clock = time.perf_counter()
+
+    def _feed(self) -> None:
+        if self._next_frame >= self._frames:
+            return
+        if self._channel.get_queue() is None:
+            self._channel.queue(self._next_sound())
+
+    def _next_sound(self):
+        import numpy as np
+        import pygame
+
+        from audio_io import downmix, resample_span, span_context
+
+        assert self.has_audio and self._mixer is not None
+        rate, size, channels = self._mixer
+        start = self._next_frame
+        stop = min(self._frames, start + self._chunk_frames)
+
+        audio = self._audio
+        if audio is not None:
+            # Vistas del buffer compartido: solo se copia el tramo ya remuestreado.
+            offset = 0
+            samples = (
+                audio.samples if audio.channels == channels else audio.mono[:, None]
+            )
+        else:
+            # Del disco, el tramo con el contexto que usa resample_span.
+            context = span_context(self._sample_rate, rate)
+            offset = max(0, start - context)
+            self._file.seek(offset)
+            samples = self._file.read(
+                stop + context - offset, dtype="float32", always_2d=True
+            )
+            if samples.shape[1] != channels:
+                samples = downmix(samples)[:, None]
+        chunk = resample_span(
+            samples, start - offset, stop - offset, self._sample_rate, rate
+        )
+        if chunk.shape[1] != channels:
+            chunk = np.repeat(chunk, channels, axis=1)
+        if size == 32:
+            data = np.ascontiguousarray(chunk, dtype=np.float32)
+        else:
+            data = (np.clip(chunk, -1.0, 1.0) * 32767).astype(np.int16)
+
+        self._next_frame = stop
+        return pygame.mixer.Sound(buffer=data.tobytes())
+
+    def _ensure_mixer(self) -> None:
+        if self._mixer is not None:
+            return
+
         import pygame
 
-        init = pygame.mixer.get_init()
-        if init is not None:
-            current_sample_rate, _format, current_channels = init
-            if int(current_sample_rate) == int(sample_rate) and int(
-                current_channels
-            ) == int(channels):
-                return
-            pygame.mixer.quit()
+        if pygame.mixer.get_init() is None:
+            pygame.mixer.init(frequency=MIXER_RATE, size=-16, channels=MIXER_CHANNELS)
 
-        pygame.mixer.init(frequency=int(sample_rate), channels=int(channels))
+        rate, size, channels = pygame.mixer.get_init()
+        if size not in (-16, 32):
+            raise RuntimeError(f"Formato de mezclador no soportado: {size}")
+        # Un canal reservado para este reproductor: otros Sound no lo toman.
+        pygame.mixer.set_reserved(1)
+        self._channel = pygame.mixer.Channel(0)
+        self._mixer = (int(rate), int(size), int(channels))
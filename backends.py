@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import warnings
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+BACKENDS = ("eager", "torchscript", "onnx")
+
+# Archivo exportado por defecto, junto al checkpoint: best_model.pth -> best_model.ts
+EXPORT_SUFFIXES = {"torchscript": ".ts", "onnx": ".onnx"}
+
+# Metadato con el sha256 del checkpoint del que se exportó el modelo.
+CHECKPOINT_METADATA = "checkpoint_sha256"
+
+
+def default_export_path(checkpoint_path: str | Path, backend: str) -> Path:
+    return Path(checkpoint_path).with_suffix(EXPORT_SUFFIXES[backend])
+
+
+def _check_fingerprint(path: Path, exported: str, expected: str) -> None:
+    if expected and exported != expected:
+        raise ValueError(
+            f"{path} se exportó desde otro checkpoint; vuelve a correr asr-export"
+        )
+
+
+class InferenceBackend:
+    """Ejecuta el modelo acústico sobre un batch de log-mels.
+
+    Recibe ``mels`` (batch, n_mels, frames) rellenado con ceros y las
+    longitudes válidas de cada fila; devuelve los log-probs (batch, frames/4,
+    vocab) y los frames de salida válidos de cada fila, igual que
+    ``ASRCNN_BiLSTM.forward``.
+    """
+
+    name = ""
+
+    def __call__(
+        self, mels: torch.Tensor, lengths: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    name = "eager"
+
+    def __init__(self, model: nn.Module) -> None:
+        self.model = model
+
+    def __call__(
+        self, mels: torch.Tensor, lengths: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        with torch.inference_mode():
+            return self.model(mels, lengths)
+
+
+class TorchScriptBackend(InferenceBackend):
+    """``InferenceASRCNN_BiLSTM`` compilado con ``torch.jit.script``.
+
+    El módulo exportado conserva la máscara y el empaquetado, así que acepta
+    batches con relleno directamente.
+    """
+
+    name = "torchscript"
+
+    def __init__(
+        self, path: str | Path, device: torch.device, checkpoint_fingerprint: str = ""
+    ) -> None:
+        path = Path(path)
+        extra_files = {CHECKPOINT_METADATA: ""}
+        with warnings.catch_warnings():
+            # torch.jit avisa que está deprecado; la carga sigue funcionando.
+            warnings.simplefilter("ignore", FutureWarning)
+            self.module = torch.jit.load(
+                str(path), map_location=device, _extra_files=extra_files
+            )
+        self.module.eval()
+        exported = extra_files[CHECKPOINT_METADATA]
+        if isinstance(exported, bytes):
+            exported = exported.decode()
+        _check_fingerprint(path, exported, checkpoint_fingerprint)
+
+    def __call__(
+        self, mels: torch.Tensor, lengths: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        with torch.inference_mode():
+            return self.module(mels, lengths)
+
+
+class OnnxBackend(InferenceBackend):
+    """Grafo ONNX (``forward_dense``) ejecutado con ONNX Runtime en CPU.
+
+    El grafo no tiene máscara ni empaquetado: un batch sin relleno va en una
+    sola llamada y uno con relleno se procesa fila por fila, recortada a su
+    longitud, para que el resultado coincida con el modelo eager.
+    """
+
+    name = "onnx"
+
+    def __init__(self, path: str | Path, checkpoint_fingerprint: str = "") -> None:
+        import onnxruntime as ort
+
+        path = Path(path)
+        self.session = ort.InferenceSession(
+            str(path), providers=["CPUExecutionProvider"]
+        )
+        self._input = self.session.get_inputs()[0].name
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        _check_fingerprint(
+            path, metadata.get(CHECKPOINT_METADATA, ""), checkpoint_fingerprint
+        )
+
+    def _run(self, mels: torch.Tensor) -> torch.Tensor:
+        feed = {self._input: np.ascontiguousarray(mels.cpu().numpy())}
+        return torch.from_numpy(self.session.run(None, feed)[0])
+
+    def __call__(
+        self, mels: torch.Tensor, lengths: torch.Tensor
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        lengths = lengths.cpu()
+        output_lengths = lengths // 4
+        if bool((lengths == mels.size(2)).all()):
+            return self._run(mels), output_lengths
+
+        rows = [
+            self._run(mels[row : row + 1, :, :length])[0]
+            for row, length in enumerate(lengths.tolist())
+        ]
+        return nn.utils.rnn.pad_sequence(rows, batch_first=True), output_lengths
+
+
+def load_backend(
+    name: str,
+    model: nn.Module,
+    device: torch.device,
+    path: str | Path | None = None,
+    checkpoint_fingerprint: str = "",
+) -> InferenceBackend:
+    """Crea el backend ``name``; los exportados se leen de ``path``."""
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {name!r} (opciones: {BACKENDS})")
+    if name == "eager":
+        return EagerBackend(model)
+    if path is None:
+        raise ValueError(f"El backend {name!r} necesita la ruta del modelo exportado")
+    if name == "torchscript":
+        return TorchScriptBackend(path, device, checkpoint_fingerprint)
+    return OnnxBackend(path, checkpoint_fingerprint)
@@ -0,0 +1,147 @@
+"""Lectura + remuestreo: ``audio_io.load_audio`` frente a ``librosa.load``.
+
+Genera WAVs sintéticos a 16 kHz (lo que graba la app), 44.1 kHz y 48 kHz
+estéreo, y mide cada camino en caliente (p50 de varias repeticiones) y en
+frío (primera llamada en un proceso nuevo, con los imports); ``polyphase`` es
+el remuestreo que usa ``audio_io`` cuando soxr no está instalado. También
+informa cuánto difiere la señal de cada camino de la de librosa (SNR en dB):
+
+    uv run python benchmarks/bench_audio_io.py --seconds 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+TARGET_RATE = 16000
+# (etiqueta, frecuencia, canales)
+FORMATS = (("16k mono", 16000, 1), ("44.1k mono", 44100, 1), ("48k estéreo", 48000, 2))
+LOADERS = ("librosa", "audio_io", "polyphase")
+
+
+def make_wav(path: Path, seconds: float, sample_rate: int, channels: int) -> None:
+    import soundfile as sf
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    phase = 2 * np.pi * np.cumsum(140 + 30 * np.sin(2 * np.pi * 2 * t)) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 10))
+    audio = 0.15 * voiced + 0.005 * rng.standard_normal(t.size)
+    audio = np.stack([audio * (1 - 0.3 * c) for c in range(channels)], axis=1)
+    sf.write(str(path), audio.astype(np.float32), sample_rate, subtype="PCM_16")
+
+
+def load(loader: str, path: Path) -> np.ndarray:
+    if loader == "librosa":
+        import librosa
+
+        audio, _ = librosa.load(str(path), sr=TARGET_RATE, mono=True)
+        return audio
+
+    from audio_io import load_audio
+
+    if loader == "audio_io":
+        return load_audio(path, TARGET_RATE)
+
+    # El camino sin soxr: lectura con soundfile y filtro polifásico de scipy.
+    import soundfile as sf
+
+    from audio_io import _resample_polyphase, downmix
+
+    data, rate = sf.read(str(path), dtype="float32", always_2d=True)
+    return _resample_polyphase(downmix(data), rate, TARGET_RATE)
+
+
+def snr_db(reference: np.ndarray, other: np.ndarray) -> float:
+    # Sin los bordes: cada filtro los trata distinto.
+    n = min(reference.size, other.size)
+    margin = TARGET_RATE // 10
+    ref, out = reference[margin : n - margin], other[margin : n - margin]
+    noise = float(np.sum((ref - out) ** 2))
+    return float("inf") if noise == 0 else 10 * np.log10(np.sum(ref**2) / noise)
+
+
+def cold(loader: str, path: Path) -> float:
+    """Primera llamada en un proceso nuevo, con los imports."""
+    script = (
+        "import sys, time; sys.path.insert(0, sys.argv[3]); "
+        "sys.path.insert(0, sys.argv[4]); start = time.perf_counter(); "
+        "import bench_audio_io; bench_audio_io.load(sys.argv[1], sys.argv[2]); "
+        "print(time.perf_counter() - start)"
+    )
+    out = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            script,
+            loader,
+            str(path),
+            str(ROOT),
+            str(ROOT / "benchmarks"),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--json", type=Path, default=None, help="Guarda el resultado.")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, rate, channels in FORMATS:
+            path = Path(tmp) / f"{rate}_{channels}.wav"
+            make_wav(path, args.seconds, rate, channels)
+
+            row: dict[str, float] = {}
+            outputs = {}
+            for loader in LOADERS:
+                row[f"{loader}_cold"] = cold(loader, path)
+                outputs[loader] = load(loader, path)
+                times = []
+                for _ in range(args.repeats):
+                    start = time.perf_counter()
+                    load(loader, path)
+                    times.append(time.perf_counter() - start)
+                row[loader] = sorted(times)[len(times) // 2]
+            for loader in LOADERS[1:]:
+                row[f"{loader}_snr_db"] = snr_db(outputs["librosa"], outputs[loader])
+            results[label] = row
+
+    print(
+        f"{args.seconds:g} s de audio; ms (p50 en caliente / primera llamada en frío)"
+    )
+    header = "".join(f"{loader:>17}" for loader in LOADERS)
+    print(f"{'formato':>12}{header}{'x':>6}{'SNR dB':>15}")
+    for label, row in results.items():
+        cells = "".join(
+            f"{row[loader] * 1e3:>10.1f} /{row[f'{loader}_cold'] * 1e3:>5.0f}"
+            for loader in LOADERS
+        )
+        speedup = row["librosa"] / row["audio_io"]
+        snr = " / ".join(f"{row[f'{loader}_snr_db']:.0f}" for loader in LOADERS[1:])
+        print(f"{label:>12}{cells}{speedup:>6.1f}{snr:>15}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Latencia de cada backend de inferencia (eager, TorchScript, ONNX Runtime).
+
+Requiere haber exportado el checkpoint con ``asr-export``. Mide el forward del
+modelo sobre mels sintéticos de varias duraciones, en CPU:
+
+    uv run asr-export
+    uv run python benchmarks/bench_backends.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from asr_model import load_transcriber  # noqa: E402
+from backends import BACKENDS  # noqa: E402
+from inference_checkpoint import default_checkpoint  # noqa: E402
+
+
+def best_time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-c", "--checkpoint", type=Path, default=None)
+    parser.add_argument("--seconds", default="1,5,30")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    checkpoint = args.checkpoint or default_checkpoint()
+    cpu = torch.device("cpu")
+    transcribers = {
+        name: load_transcriber(checkpoint, device=cpu, backend=name)
+        for name in BACKENDS
+    }
+
+    config = transcribers["eager"].config
+    frames_per_second = config.sample_rate / config.hop_length
+    torch.manual_seed(0)
+
+    print(f"{'segundos':>9}" + "".join(f"{name + ' ms':>16}" for name in BACKENDS))
+    for seconds in (float(s) for s in args.seconds.split(",")):
+        mel = torch.randn(config.n_mels, int(seconds * frames_per_second)) * 20 - 40
+        times = [
+            best_time(lambda: t._forward_mels([mel]), args.repeats)
+            for t in transcribers.values()
+        ]
+        print(f"{seconds:>9.0f}" + "".join(f"{t * 1e3:>16.1f}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
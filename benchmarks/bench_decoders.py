@@ -0,0 +1,143 @@
+"""Benchmark de decodificación CTC: greedy vs beam search según el ancho del haz.
+
+Usa log-probs sintéticas con forma parecida a las del modelo (mayoría de frames
+blank, picos por carácter), así que no necesita checkpoint:
+
+    uv run python benchmarks/bench_decoders.py --seconds 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from asr_model import AsrTranscriber  # noqa: E402
+from ctc_beam import (  # noqa: E402
+    SPACE_TOKEN,
+    BeamSearchConfig,
+    CharNgramLM,
+    ctc_prefix_beam_search,
+)
+
+ALPHABET = " abcdefghijklmnopqrstuvwxyzñáé"
+FRAME_SECONDS = 0.04  # hop 160 a 16 kHz, x4 por el max-pool
+
+
+def synthetic_log_probs(
+    num_frames: int, rng: np.random.Generator
+) -> tuple[np.ndarray, str]:
+    vocab_size = len(ALPHABET) + 1
+    logits = rng.normal(0.0, 1.0, size=(num_frames, vocab_size))
+    logits[:, 0] += 11.0
+
+    chars: list[str] = []
+    t = 0
+    while t < num_frames:
+        t += int(rng.integers(1, 4))
+        if t >= num_frames:
+            break
+        idx = int(rng.integers(1, vocab_size))
+        width = int(rng.integers(1, 3))
+        logits[t : t + width, idx] += 12.0 + rng.normal(0.0, 2.0)
+        chars.append(ALPHABET[idx - 1])
+        t += width
+
+    log_probs = logits - np.logaddexp.reduce(logits, axis=1, keepdims=True)
+    return log_probs.astype(np.float32), "".join(chars)
+
+
+def write_bigram_arpa(text: str, path: Path) -> None:
+    tokens = [SPACE_TOKEN if c == " " else c for c in text]
+    unigrams = Counter(tokens)
+    bigrams = Counter(zip(tokens, tokens[1:]))
+    vocab = sorted(unigrams) + ["</s>"]
+    total = sum(unigrams.values()) + len(vocab)
+
+    lines = [
+        "\\data\\",
+        f"ngram 1={len(vocab) + 1}",
+        f"ngram 2={len(bigrams)}",
+        "",
+        "\\1-grams:",
+        "-99\t<s>\t-0.3",
+    ]
+    for tok in vocab:
+        lines.append(f"{math.log10((unigrams[tok] + 1) / total):.4f}\t{tok}\t-0.3")
+    lines += ["", "\\2-grams:"]
+    for (a, b), count in bigrams.items():
+        lines.append(f"{math.log10(count / unigrams[a]):.4f}\t{a} {b}")
+    lines += ["", "\\end\\", ""]
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def time_call(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--widths", default="1,4,8,16,32,64")
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    num_frames = int(args.seconds / FRAME_SECONDS)
+    log_probs, text = synthetic_log_probs(num_frames, rng)
+    idx_to_char = {i + 1: c for i, c in enumerate(ALPHABET)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        arpa = Path(tmp) / "chars.arpa"
+        write_bigram_arpa(text, arpa)
+        lm = CharNgramLM.load(arpa)
+
+    tensor = torch.from_numpy(log_probs)
+    greedy = time_call(
+        lambda: AsrTranscriber._decode_greedy(tensor, idx_to_char), args.repeats
+    )
+    skipped = float(
+        np.mean(np.exp(log_probs[:, 0]) >= BeamSearchConfig().blank_skip_threshold)
+    )
+    print(
+        f"{num_frames} frames ({args.seconds:.0f} s de audio), top_k={args.top_k}, "
+        f"{skipped:.0%} frames saltados por blank"
+    )
+    print(f"{'decoder':<16}{'ms':>10}{'x greedy':>10}{'x tiempo real':>15}")
+    print(
+        f"{'greedy':<16}{greedy * 1e3:>10.1f}{1.0:>10.1f}{args.seconds / greedy:>15.0f}"
+    )
+
+    for with_lm in (False, True):
+        for width in (int(w) for w in args.widths.split(",")):
+            config = BeamSearchConfig(
+                beam_width=width, top_k=args.top_k, lm=lm if with_lm else None
+            )
+            elapsed = time_call(
+                lambda: ctc_prefix_beam_search(log_probs, idx_to_char, config),
+                args.repeats,
+            )
+            name = f"beam{width}{'+lm' if with_lm else ''}"
+            print(
+                f"{name:<16}{elapsed * 1e3:>10.1f}{elapsed / greedy:>10.1f}"
+                f"{args.seconds / elapsed:>15.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
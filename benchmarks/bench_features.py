@@ -0,0 +1,136 @@
+"""Paridad y velocidad del front end mel en torch frente al camino de librosa.
+
+Compara ``MelFeatureExtractor`` con ``librosa.feature.melspectrogram`` +
+``power_to_db(ref=np.max)`` sobre audio sintético, y sale con código 1 si la
+diferencia máxima supera ``--tolerance`` dB:
+
+    uv run python benchmarks/bench_features.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from features import MelFeatureExtractor  # noqa: E402
+
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+WIN_LENGTH = 400
+N_MELS = 80
+
+# torch ya está importado en ambos casos (lo necesita el modelo); se mide el
+# costo adicional de cada front end en un proceso nuevo.
+COLD_START = {
+    "librosa": (
+        "import numpy as np, librosa; y = np.zeros(16000, np.float32) + 0.1; "
+        "librosa.power_to_db(librosa.feature.melspectrogram(y=y, sr=16000, "
+        "n_fft=400, hop_length=160, win_length=400, n_mels=80, window='hamming'), "
+        "ref=np.max)"
+    ),
+    "torch": (
+        "import numpy as np; from features import MelFeatureExtractor; "
+        "MelFeatureExtractor(16000, 400, 160, 400, 80)(np.zeros(16000, np.float32) + 0.1)"
+    ),
+}
+
+
+def librosa_mel_db(audio: np.ndarray) -> np.ndarray:
+    import librosa
+
+    mel = librosa.feature.melspectrogram(
+        y=audio,
+        sr=SAMPLE_RATE,
+        n_mels=N_MELS,
+        n_fft=N_FFT,
+        hop_length=HOP_LENGTH,
+        win_length=WIN_LENGTH,
+        window="hamming",
+        center=True,
+        pad_mode="reflect",
+    )
+    return librosa.power_to_db(mel, ref=np.max)
+
+
+def best_time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", default="1,5,30,120")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    extractor = MelFeatureExtractor(SAMPLE_RATE, N_FFT, HOP_LENGTH, WIN_LENGTH, N_MELS)
+    rng = np.random.default_rng(0)
+    worst = 0.0
+
+    print(f"{'segundos':>9}{'max |dB|':>12}{'librosa ms':>12}{'torch ms':>10}")
+    clips = []
+    for seconds in (float(d) for d in args.durations.split(",")):
+        n = int(seconds * SAMPLE_RATE)
+        envelope = np.abs(np.sin(np.linspace(0, 20, n))) ** 3
+        audio = (rng.standard_normal(n) * envelope).astype(np.float32)
+        clips.append(audio)
+
+        expected = librosa_mel_db(audio)
+        actual, _ = extractor(audio)
+        diff = float(np.abs(expected - actual[0].numpy()).max())
+        worst = max(worst, diff)
+
+        t_librosa = best_time(lambda: librosa_mel_db(audio), args.repeats)
+        t_torch = best_time(lambda: extractor(audio), args.repeats)
+        print(
+            f"{seconds:>9.0f}{diff:>12.2e}{t_librosa * 1e3:>12.1f}{t_torch * 1e3:>10.1f}"
+        )
+
+    # Batch con relleno: cada fila debe coincidir con su cálculo individual.
+    lengths = torch.tensor([c.shape[0] for c in clips])
+    batch = torch.nn.utils.rnn.pad_sequence(
+        [torch.from_numpy(c) for c in clips], batch_first=True
+    )
+    mel_batch, frames = extractor(batch, lengths)
+    for row, clip in enumerate(clips):
+        expected = librosa_mel_db(clip)
+        got = mel_batch[row, :, : int(frames[row])].numpy()
+        worst = max(worst, float(np.abs(expected - got).max()))
+
+    print("\nimport + primera llamada (proceso nuevo, torch ya importado):")
+    for name, code in COLD_START.items():
+        timed = (
+            "import time, torch; start = time.perf_counter(); "
+            f"{code}; print(f'{{time.perf_counter() - start:.2f}}')"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", timed],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        print(f"  {name:<8}{float(out.stdout.strip()):>8.2f} s")
+
+    print(f"\ndiferencia máxima: {worst:.2e} dB (tolerancia {args.tolerance:g})")
+    if worst > args.tolerance:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
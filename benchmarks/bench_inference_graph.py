@@ -0,0 +1,111 @@
+"""Paridad y velocidad del modelo de inferencia (Conv-BN fusionada) frente al original.
+
+Carga el checkpoint con ``optimize=False`` y ``optimize=True``, compara los
+log-probs sobre mels sintéticos (un clip solo y un batch con relleno) y sale
+con código 1 si la diferencia máxima supera ``--tolerance``. También mide la
+latencia de la primera transcripción en un proceso nuevo, con y sin
+calentamiento:
+
+    uv run python benchmarks/bench_inference_graph.py -c best_model.pth
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from asr_model import AsrTranscriber, load_transcriber  # noqa: E402
+from inference_checkpoint import default_checkpoint  # noqa: E402
+
+# Carga el modelo y mide solo la primera transcripción de 3 s de ruido.
+FIRST_CALL = (
+    "import sys, time, numpy as np; from asr_model import load_transcriber; "
+    "t = load_transcriber(sys.argv[1], device=__import__('torch').device('cpu'), "
+    "optimize=sys.argv[2] == '1'); "
+    "audio = np.random.default_rng(0).standard_normal(48000).astype(np.float32); "
+    "start = time.perf_counter(); t.transcribe(audio); "
+    "print(f'{time.perf_counter() - start:.4f}')"
+)
+
+
+def best_time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def max_diff(
+    reference: AsrTranscriber, optimized: AsrTranscriber, mels: list[torch.Tensor]
+) -> float:
+    expected, lengths = reference._forward_mels(mels)
+    actual, actual_lengths = optimized._forward_mels(mels)
+    if not torch.equal(lengths, actual_lengths):
+        return float("inf")
+    worst = 0.0
+    for row, length in enumerate(lengths.tolist()):
+        diff = (expected[row, :length] - actual[row, :length]).abs().max()
+        worst = max(worst, float(diff))
+    return worst
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-c", "--checkpoint", type=Path, default=None)
+    parser.add_argument("--frames", default="100,1000,3000")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or default_checkpoint()
+    cpu = torch.device("cpu")
+    reference = load_transcriber(checkpoint, device=cpu, optimize=False)
+    optimized = load_transcriber(checkpoint, device=cpu, optimize=True)
+    n_mels = reference.config.n_mels
+
+    torch.manual_seed(0)
+    frame_counts = [int(n) for n in args.frames.split(",")]
+    mels = [torch.randn(n_mels, n) * 20 - 40 for n in frame_counts]
+    worst = 0.0
+
+    print(f"{'frames':>7}{'max |diff|':>12}{'original ms':>13}{'fusionado ms':>14}")
+    for mel in mels:
+        diff = max_diff(reference, optimized, [mel])
+        worst = max(worst, diff)
+        t_ref = best_time(lambda: reference._forward_mels([mel]), args.repeats)
+        t_opt = best_time(lambda: optimized._forward_mels([mel]), args.repeats)
+        print(f"{mel.size(1):>7}{diff:>12.2e}{t_ref * 1e3:>13.1f}{t_opt * 1e3:>14.1f}")
+
+    # Batch con relleno: usa el camino empaquetado de la LSTM.
+    diff = max_diff(reference, optimized, mels)
+    worst = max(worst, diff)
+    print(f"{'batch':>7}{diff:>12.2e}")
+
+    print("\nprimera transcripción (proceso nuevo, 3 s de audio):")
+    for name, flag in (("original", "0"), ("optimizado", "1")):
+        out = subprocess.run(
+            [sys.executable, "-c", FIRST_CALL, str(checkpoint), flag],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        print(f"  {name:<11}{float(out.stdout.strip()) * 1e3:>8.1f} ms")
+
+    print(f"\ndiferencia máxima: {worst:.2e} (tolerancia {args.tolerance:g})")
+    if worst > args.tolerance:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""RAM y throughput de ``InferencePool`` según la cantidad de workers.
+
+Compara el pool (pesos en memoria compartida) con N procesos que cargan cada
+uno su propio checkpoint, como ``asr-batch -j N``. La memoria es la suma del
+PSS (Linux, ``/proc/<pid>/smaps_rollup``) de este proceso y todos sus hijos,
+así las páginas compartidas cuentan una sola vez:
+
+    uv run python benchmarks/bench_pool.py --workers 1,2,4,8 --clips 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent))
+sys.path.insert(0, str(ROOT))
+
+from bench_suite import make_checkpoint, make_wav  # noqa: E402
+
+_transcriber: Any = None
+
+
+def _init_independent(checkpoint: str) -> None:
+    global _transcriber
+
+    import torch
+
+    from asr_model import load_transcriber
+
+    torch.set_num_threads(1)
+    _transcriber = load_transcriber(checkpoint, device=torch.device("cpu"))
+
+
+def _transcribe_independent(path: str) -> str:
+    return _transcriber.transcribe(path).text
+
+
+def _pss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _tree(pid: int) -> list[int]:
+    pids = [pid]
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    for child in children:
+        pids += _tree(int(child))
+    return pids
+
+
+def total_pss_mb() -> float | None:
+    if not Path("/proc/self/smaps_rollup").exists():
+        return None
+    total = 0.0
+    for pid in _tree(os.getpid()):
+        try:
+            total += _pss_mb(pid)
+        except OSError:  # terminó entre la lista y la lectura
+            pass
+    return total
+
+
+def run_pool(checkpoint: Path, clips: list[Path], workers: int) -> dict[str, Any]:
+    from inference_pool import InferencePool
+
+    with InferencePool(checkpoint, workers=workers) as pool:
+        # La primera ronda arranca los workers y no cuenta.
+        for future in pool.map(clips[:workers]):
+            future.result()
+        start = time.perf_counter()
+        texts = [f.result().text for f in pool.map(clips)]
+        seconds = time.perf_counter() - start
+        memory = total_pss_mb()
+    return {"seconds": seconds, "pss_mb": memory, "texts": texts}
+
+
+def run_independent(
+    checkpoint: Path, clips: list[Path], workers: int
+) -> dict[str, Any]:
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_independent,
+        initargs=(str(checkpoint),),
+    ) as pool:
+        list(pool.map(_transcribe_independent, map(str, clips[:workers])))
+        start = time.perf_counter()
+        texts = list(pool.map(_transcribe_independent, map(str, clips)))
+        seconds = time.perf_counter() - start
+        memory = total_pss_mb()
+    return {"seconds": seconds, "pss_mb": memory, "texts": texts}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--clips", type=int, default=32)
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    parser.add_argument("--hidden-size", type=int, default=512)
+    parser.add_argument("--lstm-layers", type=int, default=4)
+    parser.add_argument(
+        "-c",
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Usa este checkpoint en vez de uno con pesos aleatorios.",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Guarda el resultado.")
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        checkpoint = args.checkpoint
+        if checkpoint is None:
+            checkpoint = tmp_dir / "random.pth"
+            make_checkpoint(checkpoint, args.hidden_size, args.lstm_layers)
+        clips = []
+        for i in range(args.clips):
+            clip = tmp_dir / f"clip_{i}.wav"
+            make_wav(clip, args.clip_seconds * (0.8 + 0.4 * (i % 5) / 4), 16000)
+            clips.append(clip)
+
+        for workers in (int(w) for w in args.workers.split(",")):
+            pool = run_pool(checkpoint, clips, workers)
+            independent = run_independent(checkpoint, clips, workers)
+            if pool["texts"] != independent["texts"]:
+                sys.exit(f"{workers} workers: las transcripciones no coinciden")
+            results[str(workers)] = {
+                mode: {k: v for k, v in result.items() if k != "texts"}
+                for mode, result in (("pool", pool), ("independent", independent))
+            }
+
+    print(f"{args.clips} clips; PSS total en MB / segundos")
+    print(f"{'workers':>8}{'pool':>18}{'independientes':>18}")
+    for workers, row in results.items():
+        cells = ""
+        for mode in ("pool", "independent"):
+            memory = row[mode]["pss_mb"]
+            memory_text = "?" if memory is None else f"{memory:.0f}"
+            cells += f"{memory_text:>10} /{row[mode]['seconds']:>6.2f}"
+        print(f"{workers:>8}{cells}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
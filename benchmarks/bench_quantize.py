@@ -0,0 +1,118 @@
+"""Velocidad y CER del modelo cuantizado int8 frente al modelo float.
+
+Transcribe un conjunto de audios con ambos modelos en CPU y reporta la
+latencia por archivo, la aceleración y el CER. Con ``--references`` (JSONL con
+``path`` y ``text``) el CER se mide contra las transcripciones de referencia;
+sin referencias, se mide el CER del int8 tomando la salida float como
+referencia:
+
+    uv run python benchmarks/bench_quantize.py audios/ --references refs.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from asr_batch import collect_inputs  # noqa: E402
+from asr_model import AsrTranscriber, load_transcriber  # noqa: E402
+from inference_checkpoint import default_checkpoint  # noqa: E402
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = current
+    return previous[-1]
+
+
+def cer(hypotheses: list[str], references: list[str]) -> float:
+    errors = sum(edit_distance(h, r) for h, r in zip(hypotheses, references))
+    return errors / max(1, sum(len(r) for r in references))
+
+
+def run(
+    transcriber: AsrTranscriber, inputs: list[Path], repeats: int
+) -> tuple[list[str], list[float]]:
+    texts: list[str] = []
+    latencies: list[float] = []
+    for path in inputs:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            text, _ = transcriber.transcribe_wav(path)
+            best = min(best, time.perf_counter() - start)
+        texts.append(text)
+        latencies.append(best)
+    return texts, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="Directorio o manifiesto de audios.")
+    parser.add_argument("-c", "--checkpoint", type=Path, default=None)
+    parser.add_argument("--references", type=Path, default=None)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    inputs = collect_inputs(args.source)
+    if not inputs:
+        sys.exit("No se encontraron audios.")
+    checkpoint = args.checkpoint or default_checkpoint()
+    cpu = torch.device("cpu")
+
+    results = {}
+    for name, quantize in (("float", None), ("int8", "int8")):
+        transcriber = load_transcriber(checkpoint, device=cpu, quantize=quantize)
+        transcriber.transcribe_wav(inputs[0])  # calentamiento
+        results[name] = run(transcriber, inputs, args.repeats)
+
+    float_texts, float_times = results["float"]
+    int8_texts, int8_times = results["int8"]
+    speedups = [f / q for f, q in zip(float_times, int8_times)]
+
+    print(f"{len(inputs)} archivos, {torch.get_num_threads()} threads")
+    print(f"latencia media float: {statistics.mean(float_times) * 1e3:.1f} ms")
+    print(f"latencia media int8:  {statistics.mean(int8_times) * 1e3:.1f} ms")
+    print(
+        f"aceleración: total {sum(float_times) / sum(int8_times):.2f}x, "
+        f"mediana por archivo {statistics.median(speedups):.2f}x"
+    )
+
+    if args.references:
+        refs: dict[str, str] = {}
+        with args.references.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    refs[str(Path(record["path"]).resolve())] = record["text"]
+        references = [refs.get(str(p), "") for p in inputs]
+        cer_float = cer(float_texts, references)
+        cer_int8 = cer(int8_texts, references)
+        print(
+            f"CER float {cer_float:.4f}, int8 {cer_int8:.4f}, "
+            f"diferencia {cer_int8 - cer_float:+.4f}"
+        )
+    else:
+        print(f"CER int8 respecto de float: {cer(int8_texts, float_texts):.4f}")
+
+
+if __name__ == "__main__":
+    main()
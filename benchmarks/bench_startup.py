@@ -0,0 +1,98 @@
+"""Tiempos de arranque de la app por etapa, cada una en un proceso nuevo.
+
+Mide lo mismo que ``ASR_STARTUP_REPORT`` pero sin abrir la ventana (sirve en
+CI o por SSH): importar ``app``, importar torch + ``asr_model``, cargar el
+checkpoint y preparar librosa. Sale con código 1 si ``import app`` arrastra
+numpy, torch o librosa, que deben cargarse después de mostrar la ventana:
+
+    uv run python benchmarks/bench_startup.py --json startup.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from inference_checkpoint import default_checkpoint  # noqa: E402
+
+HEAVY_MODULES = ("numpy", "torch", "librosa")
+
+IMPORT_APP = (
+    "import sys, time; start = time.perf_counter(); import app; "
+    "elapsed = time.perf_counter() - start; "
+    f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]; "
+    "print(elapsed, ','.join(heavy))"
+)
+
+# Las etapas que corre App._start_model_load, en el mismo orden.
+LOAD_STAGES = (
+    "import sys, time; marks = []; start = time.perf_counter(); "
+    "from asr_model import load_transcriber; "
+    "marks.append(time.perf_counter() - start); "
+    "t = load_transcriber(sys.argv[1]); marks.append(time.perf_counter() - start); "
+    "t.warmup_audio_io(); "
+    "marks.append(time.perf_counter() - start); print(*marks)"
+)
+
+
+def run(code: str, *args: str) -> str:
+    out = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return out.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-c", "--checkpoint", type=Path, default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--json", type=Path, default=None, help="Agrega el resultado a este JSONL."
+    )
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or default_checkpoint()
+    stages = {
+        "import app": [],
+        "import torch + asr_model": [],
+        "cargar modelo": [],
+        "preparar librosa": [],
+    }
+    heavy = ""
+    for _ in range(args.repeats):
+        elapsed, heavy = (run(IMPORT_APP).split(" ") + [""])[:2]
+        stages["import app"].append(float(elapsed))
+
+        marks = [float(m) for m in run(LOAD_STAGES, str(checkpoint)).split()]
+        stages["import torch + asr_model"].append(marks[0])
+        stages["cargar modelo"].append(marks[1] - marks[0])
+        stages["preparar librosa"].append(marks[2] - marks[1])
+
+    best = {name: min(times) for name, times in stages.items()}
+    print(f"mejor de {args.repeats} (segundos):")
+    for name, seconds in best.items():
+        print(f"  {name:<28}{seconds:>7.3f}")
+    print(f"  {'total hasta listo':<28}{sum(best.values()):>7.3f}")
+
+    if args.json:
+        with args.json.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"time": time.time(), "stages": best}) + "\n")
+
+    if heavy:
+        print(f"\n`import app` importa {heavy}; la ventana va a tardar en aparecer.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Tiempos por etapa del pipeline con un checkpoint de pesos aleatorios.
+
+No necesita el modelo real: arma ``ASRCNN_BiLSTM`` con pesos aleatorios a
+partir de un ``ModelConfig`` (por defecto el tamaño del constructor), genera
+WAVs sintéticos de varias duraciones a 44.1 kHz (así se mide el remuestreo) y,
+para cada duración en un proceso nuevo, mide por separado: carga del
+checkpoint (``load_transcriber``, con su calentamiento), lectura + remuestreo, mel, CNN, LSTM (+ capa final) y
+decodificación. Informa p50/p95 por etapa, el factor de tiempo real (RTF,
+sin contar la carga) y la memoria pico del proceso.
+
+    uv run python benchmarks/bench_suite.py --json base.json
+    # ... cambios en asr_model.py ...
+    uv run python benchmarks/bench_suite.py --json nuevo.json --baseline base.json
+
+Con ``--max-regression 0.1`` sale con código 1 si alguna etapa empeora más de
+un 10 % (p50) respecto al baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+STAGES = ("load", "audio", "mel", "cnn", "lstm", "decode")
+CHARS = "_ abcdefghijklmnopqrstuvwxyzñ'"
+
+# Etapas con p50 por debajo de esto (segundos) no cuentan como regresión: a
+# esa escala domina el ruido del sistema.
+MIN_COMPARABLE_SECONDS = 5e-3
+
+
+def make_checkpoint(path: Path, hidden_size: int, num_lstm_layers: int) -> None:
+    import torch
+
+    from asr_model import ModelConfig, _build_model
+
+    config = ModelConfig(
+        n_mels=80,
+        hidden_size=hidden_size,
+        vocab_size=len(CHARS),
+        num_lstm_layers=num_lstm_layers,
+        dropout=0.3,
+        sample_rate=16000,
+        n_fft=400,
+        hop_length=160,
+        win_length=400,
+    )
+    torch.manual_seed(0)
+    model = _build_model(config)
+    torch.save(
+        {
+            "model_state_dict": model.state_dict(),
+            "model_config": asdict(config),
+            "idx_to_char": dict(enumerate(CHARS)),
+        },
+        path,
+    )
+
+
+def make_wav(path: Path, seconds: float, sample_rate: int) -> None:
+    """Tono con armónicos que se prende y apaga, más ruido de fondo."""
+    import soundfile as sf
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    phase = 2 * np.pi * np.cumsum(140 + 30 * np.sin(2 * np.pi * 2 * t)) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 10))
+    gate = np.sin(2 * np.pi * 0.7 * t) > -0.3
+    audio = 0.15 * voiced * gate + 0.005 * rng.standard_normal(t.size)
+    sf.write(str(path), audio.astype(np.float32), sample_rate)
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes.
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _summary(times: list[float]) -> dict[str, float]:
+    ordered = sorted(times)
+    return {
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "mean": sum(ordered) / len(ordered),
+    }
+
+
+def run_one(checkpoint: Path, wav: Path, repeats: int) -> dict[str, Any]:
+    """Mide una duración; corre en su propio proceso (ver ``main``)."""
+    import torch
+
+    from asr_model import load_transcriber
+
+    times: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    cpu = torch.device("cpu")
+
+    # La primera carga paga la lectura del disco; se informa aparte.
+    start = time.perf_counter()
+    transcriber = load_transcriber(checkpoint, device=cpu)
+    cold_load = time.perf_counter() - start
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load_transcriber(checkpoint, device=cpu)
+        times["load"].append(time.perf_counter() - start)
+
+    model = transcriber.model
+    with torch.inference_mode():
+        # La primera vuelta (imports de librosa, reserva de memoria) no cuenta.
+        for repeat in range(repeats + 1):
+            marks = [time.perf_counter()]
+            audio = transcriber._load_audio(wav)
+            marks.append(time.perf_counter())
+            mel = transcriber._compute_mel(audio).unsqueeze(0)
+            marks.append(time.perf_counter())
+            features = model._cnn(mel, None)
+            marks.append(time.perf_counter())
+            lstm_out, _ = model.lstm(features)
+            log_probs = torch.log_softmax(model.fc(lstm_out), dim=2)
+            marks.append(time.perf_counter())
+            transcriber._decode(log_probs[0])
+            marks.append(time.perf_counter())
+            if repeat == 0:
+                continue
+            for stage, begin, end in zip(STAGES[1:], marks, marks[1:]):
+                times[stage].append(end - begin)
+
+    audio_seconds = audio.shape[0] / transcriber.config.sample_rate
+    stages = {stage: _summary(values) for stage, values in times.items()}
+    pipeline = sum(stages[stage]["p50"] for stage in STAGES[1:])
+    return {
+        "audio_seconds": round(audio_seconds, 3),
+        "cold_load": cold_load,
+        "stages": stages,
+        "rtf": pipeline / audio_seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], max_regression: float | None
+) -> bool:
+    """Imprime la comparación con el baseline; False si hay una regresión."""
+    ok = True
+    print("\ncomparación con el baseline (p50, nuevo / baseline):")
+    for label, result in current["results"].items():
+        base = baseline["results"].get(label)
+        if base is None:
+            print(f"  {label}: no está en el baseline")
+            continue
+        cells = []
+        for stage in STAGES:
+            now = result["stages"][stage]["p50"]
+            before = base["stages"][stage]["p50"]
+            ratio = now / before if before else float("inf")
+            flag = ""
+            if (
+                max_regression is not None
+                and max(now, before) >= MIN_COMPARABLE_SECONDS
+                and ratio > 1 + max_regression
+            ):
+                flag = "!"
+                ok = False
+            cells.append(f"{stage} {ratio:.2f}{flag}")
+        rtf_ratio = result["rtf"] / base["rtf"] if base["rtf"] else float("inf")
+        print(f"  {label:>6}: " + "  ".join(cells) + f"  rtf {rtf_ratio:.2f}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--durations",
+        default="1,5,30,120",
+        help="Segundos de audio, separados por coma.",
+    )
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument(
+        "--sample-rate",
+        type=int,
+        default=44100,
+        help="Frecuencia de los WAV de prueba.",
+    )
+    parser.add_argument("--hidden-size", type=int, default=256)
+    parser.add_argument("--lstm-layers", type=int, default=4)
+    parser.add_argument(
+        "-c",
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Usa este checkpoint en vez de uno con pesos aleatorios.",
+    )
+    parser.add_argument("--threads", type=int, default=None, help="Threads de torch.")
+    parser.add_argument("--json", type=Path, default=None, help="Guarda el resultado.")
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=None,
+        help="Fracción de empeoramiento tolerada por etapa (con --baseline).",
+    )
+    # Uso interno: medir una duración en este proceso.
+    parser.add_argument("--run-one", nargs=2, metavar=("CHECKPOINT", "WAV"))
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+
+        torch.set_num_threads(args.threads)
+    if args.run_one:
+        checkpoint, wav = (Path(p) for p in args.run_one)
+        print(json.dumps(run_one(checkpoint, wav, args.repeats)))
+        return
+
+    durations = [float(d) for d in args.durations.split(",")]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        checkpoint = args.checkpoint
+        if checkpoint is None:
+            checkpoint = tmp_dir / "random.pth"
+            make_checkpoint(checkpoint, args.hidden_size, args.lstm_layers)
+
+        results: dict[str, Any] = {}
+        for seconds in durations:
+            wav = tmp_dir / f"synthetic_{seconds:g}s.wav"
+            make_wav(wav, seconds, args.sample_rate)
+            command = [
+                sys.executable,
+                __file__,
+                "--run-one",
+                str(checkpoint),
+                str(wav),
+                "--repeats",
+                str(args.repeats),
+            ]
+            if args.threads:
+                command += ["--threads", str(args.threads)]
+            out = subprocess.run(
+                command, cwd=ROOT, check=True, capture_output=True, text=True
+            )
+            results[f"{seconds:g}s"] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    import torch
+
+    report = {
+        "time": time.time(),
+        "meta": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "threads": args.threads or torch.get_num_threads(),
+            "checkpoint": str(args.checkpoint) if args.checkpoint else "random",
+            "hidden_size": args.hidden_size,
+            "lstm_layers": args.lstm_layers,
+            "sample_rate": args.sample_rate,
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+
+    header = "".join(f"{stage:>9}" for stage in STAGES)
+    print(
+        f"p50 / p95 en ms (carga en frío aparte)\n{'audio':>6}{header}{'rtf':>8}{'rss MB':>9}"
+    )
+    for label, result in results.items():
+        stages = result["stages"]
+        row = "".join(f"{stages[stage]['p50'] * 1e3:>9.1f}" for stage in STAGES)
+        p95 = "".join(f"{stages[stage]['p95'] * 1e3:>9.1f}" for stage in STAGES)
+        rss = result["peak_rss_mb"]
+        print(
+            f"{label:>6}{row}{result['rtf']:>8.3f}"
+            f"{rss if rss is None else round(rss):>9}"
+        )
+        print(f"{'p95':>6}{p95}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
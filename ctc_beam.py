@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import gzip
+import heapq
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from fingerprints import hash_file
+
+NEG_INF = float("-inf")
+LN10 = math.log(10.0)
+
+# Token que representa el espacio en el ARPA (los tokens van separados por espacios).
+SPACE_TOKEN = "<space>"
+# Formato compacto de ``CharNgramLM.save``: JSON comprimido, sin pickle, así
+# cargar un LM ajeno no puede ejecutar código.
+_LM_FORMAT = "asr-char-lm"
+_LM_VERSION = 2
+
+# Nodos nuevos del trie (por unidad de beam_width) que se acumulan, como
+# mínimo, antes de descartar los que ya no son prefijo de ningún haz vivo.
+COMPACT_INTERVAL = 64
+
+
+class CharNgramLM:
+    """Modelo de lenguaje n-grama de caracteres con backoff (formato ARPA).
+
+    Los log-probs se guardan en logaritmo natural. ``load`` acepta un ``.arpa``
+    (opcionalmente ``.arpa.gz``) o el JSON comprimido que escribe ``save``.
+    """
+
+    def __init__(
+        self,
+        order: int,
+        log_probs: dict[tuple[str, ...], float],
+        backoffs: dict[tuple[str, ...], float],
+    ) -> None:
+        self.order = order
+        self._log_probs = log_probs
+        self._backoffs = backoffs
+        self._unk = log_probs.get(("<unk>",), -10.0 * LN10)
+        self._cache: dict[tuple[tuple[str, ...], str], float] = {}
+        # Hash del archivo de origen; identifica al LM en claves de caché.
+        self.fingerprint = ""
+
+    @classmethod
+    def from_arpa(cls, path: str | Path) -> CharNgramLM:
+        path = Path(path)
+        opener = gzip.open if path.suffix == ".gz" else open
+
+        log_probs: dict[tuple[str, ...], float] = {}
+        backoffs: dict[tuple[str, ...], float] = {}
+        order = 0
+        current = 0
+        with opener(path, "rt", encoding="utf-8") as f:  # type: ignore[operator]
+            for raw in f:
+                line = raw.strip()
+                if not line or line == "\\data\\" or line.startswith("ngram "):
+                    continue
+                if line == "\\end\\":
+                    break
+                if line.startswith("\\") and line.endswith("-grams:"):
+                    current = int(line[1:].split("-")[0])
+                    order = max(order, current)
+                    continue
+                if current == 0:
+                    continue
+
+                parts = line.split()
+                ngram = tuple(parts[1 : 1 + current])
+                log_probs[ngram] = float(parts[0]) * LN10
+                if len(parts) > 1 + current:
+                    backoffs[ngram] = float(parts[1 + current]) * LN10
+
+        if order == 0:
+            raise ValueError(f"ARPA sin n-gramas: {path}")
+        return cls(order, log_probs, backoffs)
+
+    @classmethod
+    def load(cls, path: str | Path) -> CharNgramLM:
+        path = Path(path)
+        if path.name.endswith((".arpa", ".arpa.gz")):
+            lm = cls.from_arpa(path)
+        else:
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise ValueError(f"No es un LM de caracteres: {path}") from exc
+            if not isinstance(data, dict) or data.get("format") != _LM_FORMAT:
+                raise ValueError(f"No es un LM de caracteres: {path}")
+            if data.get("version") != _LM_VERSION:
+                raise ValueError(f"Versión de LM no soportada: {data.get('version')}")
+            lm = cls(
+                int(data["order"]),
+                {tuple(k.split(" ")): float(v) for k, v in data["log_probs"].items()},
+                {tuple(k.split(" ")): float(v) for k, v in data["backoffs"].items()},
+            )
+
+        lm.fingerprint = hash_file(path)
+        return lm
+
+    def save(self, path: str | Path) -> None:
+        # Los tokens del ARPA no tienen espacios: el n-grama se une con uno.
+        data = {
+            "format": _LM_FORMAT,
+            "version": _LM_VERSION,
+            "order": self.order,
+            "log_probs": {" ".join(k): v for k, v in self._log_probs.items()},
+            "backoffs": {" ".join(k): v for k, v in self._backoffs.items()},
+        }
+        with gzip.open(Path(path), "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    def start_state(self) -> tuple[str, ...]:
+        return ("<s>",)
+
+    def score(self, state: tuple[str, ...], char: str) -> tuple[float, tuple[str, ...]]:
+        """Log-prob de ``char`` tras el contexto ``state`` y el nuevo estado."""
+        token = SPACE_TOKEN if char == " " else char
+        key = (state, token)
+        log_prob = self._cache.get(key)
+        if log_prob is None:
+            log_prob = self._backoff_log_prob(state, token)
+            self._cache[key] = log_prob
+        next_state = (state + (token,))[-(self.order - 1) :] if self.order > 1 else ()
+        return log_prob, next_state
+
+    def _backoff_log_prob(self, context: tuple[str, ...], token: str) -> float:
+        penalty = 0.0
+        while True:
+            log_prob = self._log_probs.get(context + (token,))
+            if log_prob is not None:
+                return penalty + log_prob
+            if not context:
+                return penalty + self._unk
+            penalty += self._backoffs.get(context, 0.0)
+            context = context[1:]
+
+
+@dataclass(frozen=True)
+class BeamSearchConfig:
+    beam_width: int = 16
+    # Candidatos no-blank que se expanden por frame, descartando los de
+    # log-prob menor a min_token_log_prob.
+    top_k: int = 8
+    min_token_log_prob: float = -10.0
+    # Frames con p(blank) >= umbral se tratan como blank puro, sin expandir.
+    blank_skip_threshold: float = 0.999
+    lm: CharNgramLM | None = None
+    lm_weight: float = 0.5
+    # Bonificación por carácter emitido; compensa la penalización del LM.
+    length_bonus: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.beam_width <= 0:
+            raise ValueError("beam_width debe ser al menos 1")
+
+
+@dataclass(frozen=True)
+class BeamResult:
+    tokens: list[int]
+    # Frame en que se emitió cada token.
+    frames: list[int]
+    acoustic_log_prob: float
+
+
+def _logaddexp(a: float, b: float) -> float:
+    if a == NEG_INF:
+        return b
+    if b == NEG_INF:
+        return a
+    if a > b:
+        return a + math.log1p(math.exp(b - a))
+    return b + math.log1p(math.exp(a - b))
+
+
+def ctc_prefix_beam_search(
+    log_probs: np.ndarray,
+    idx_to_char: dict[int, str],
+    config: BeamSearchConfig,
+    blank_idx: int = 0,
+) -> BeamResult:
+    """Búsqueda en haz de prefijos CTC sobre ``log_probs`` de forma (T, V).
+
+    Los prefijos viven en un trie (arrays paralelos indexados por nodo), así
+    que extender un prefijo es O(1) y el puntaje del LM se calcula una sola vez
+    por nodo. Cada tanto el trie se compacta a los prefijos de los haces vivos,
+    así la memoria no crece con la cantidad de frames.
+    """
+    log_probs = np.asarray(log_probs, dtype=np.float64)
+    num_frames, vocab_size = log_probs.shape
+    lm = config.lm
+    top_k = max(1, min(config.top_k, vocab_size - 1))
+
+    # Candidatos y frames a saltar, precalculados para toda la matriz.
+    masked = log_probs.copy()
+    masked[:, blank_idx] = NEG_INF
+    candidates = np.argpartition(-masked, top_k - 1, axis=1)[:, :top_k]
+    candidate_ok = (
+        np.take_along_axis(masked, candidates, axis=1) >= config.min_token_log_prob
+    )
+    skip = log_probs[:, blank_idx] >= math.log(config.blank_skip_threshold)
+
+    # Trie de prefijos; el nodo 0 es el prefijo vacío.
+    parent = [-1]
+    token = [-1]
+    frame = [-1]
+    length = [0]
+    lm_score = [0.0]
+    lm_state = [lm.start_state() if lm is not None else ()]
+    # Mayor que cero si el nodo es un haz vivo o prefijo de uno: cuenta si
+    # está en el haz más cuántos hijos tienen la cuenta positiva.
+    in_use = [1]
+    children: dict[tuple[int, int], int] = {}
+
+    def lm_extension(node: int, tok: int) -> tuple[float, tuple[str, ...]]:
+        if lm is None:
+            return 0.0, ()
+        char_log_prob, state = lm.score(lm_state[node], idx_to_char.get(tok, ""))
+        return lm_score[node] + config.lm_weight * char_log_prob, state
+
+    def add_node(node: int, tok: int, t: int) -> int:
+        child = len(parent)
+        children[(node, tok)] = child
+        parent.append(node)
+        token.append(tok)
+        frame.append(t)
+        length.append(length[node] + 1)
+        score, state = lm_extension(node, tok)
+        lm_score.append(score)
+        lm_state.append(state)
+        in_use.append(0)
+        return child
+
+    def update_in_use(
+        before: dict[int, list[float]], after: dict[int, list[float]]
+    ) -> None:
+        for node in after.keys() - before.keys():
+            while node >= 0:
+                in_use[node] += 1
+                if in_use[node] > 1:
+                    break
+                node = parent[node]
+        for node in before.keys() - after.keys():
+            while node >= 0:
+                in_use[node] -= 1
+                if in_use[node] > 0:
+                    break
+                node = parent[node]
+
+    # Las extensiones nuevas se identifican como (padre, token) y solo se
+    # agregan al trie si sobreviven la poda; los prefijos existentes usan su id.
+    Key = int | tuple[int, int]
+
+    def rank(item: tuple[Key, list[float]]) -> float:
+        key, probs = item
+        if isinstance(key, tuple):
+            prefix_lm = lm_extension(*key)[0]
+            prefix_length = length[key[0]] + 1
+        else:
+            prefix_lm = lm_score[key]
+            prefix_length = length[key]
+        return _logaddexp(*probs) + prefix_lm + config.length_bonus * prefix_length
+
+    def compact(beams: dict[int, list[float]]) -> dict[int, list[float]]:
+        # Conserva los nodos que son prefijo de algún haz vivo. Un padre
+        # siempre tiene id menor que sus hijos, así que renumerar en orden
+        # mantiene esa propiedad y el recorrido hacia la raíz.
+        live = [False] * len(parent)
+        live[0] = True
+        for node in beams:
+            while not live[node]:
+                live[node] = True
+                node = parent[node]
+        new_id = [-1] * len(parent)
+        kept = [node for node in range(len(parent)) if live[node]]
+        for new, old in enumerate(kept):
+            new_id[old] = new
+
+        parent[:] = [new_id[parent[old]] if old else -1 for old in kept]
+        for values in (token, frame, length, lm_score, lm_state, in_use):
+            values[:] = [values[old] for old in kept]
+        live_children = {
+            (new_id[node], tok): new_id[child]
+            for (node, tok), child in children.items()
+            if live[child]
+        }
+        children.clear()
+        children.update(live_children)
+        return {new_id[node]: probs for node, probs in beams.items()}
+
+    # nodo -> [log p(termina en blank), log p(termina en no-blank)]
+    beams: dict[int, list[float]] = {0: [0.0, NEG_INF]}
+    compact_at = COMPACT_INTERVAL * config.beam_width
+
+    for t in range(num_frames):
+        frame_log_probs = log_probs[t]
+        blank_log_prob = float(frame_log_probs[blank_idx])
+
+        if skip[t]:
+            for probs in beams.values():
+                probs[0] = _logaddexp(probs[0], probs[1]) + blank_log_prob
+                probs[1] = NEG_INF
+            continue
+
+        next_beams: dict[Key, list[float]] = {}
+        frame_candidates = candidates[t][candidate_ok[t]].tolist()
+        for node, (p_blank, p_non_blank) in beams.items():
+            total = _logaddexp(p_blank, p_non_blank)
+            stay = next_beams.setdefault(node, [NEG_INF, NEG_INF])
+            stay[0] = _logaddexp(stay[0], total + blank_log_prob)
+
+            last = token[node]
+            if last >= 0:
+                # Repetir el último carácter sin blank intermedio lo colapsa.
+                stay[1] = _logaddexp(
+                    stay[1], p_non_blank + float(frame_log_probs[last])
+                )
+
+            for tok in frame_candidates:
+                key: Key = children.get((node, tok), (node, tok))
+                probs = next_beams.setdefault(key, [NEG_INF, NEG_INF])
+                # Tras el mismo carácter solo se puede extender desde un blank.
+                source = p_blank if tok == last else total
+                probs[1] = _logaddexp(probs[1], source + float(frame_log_probs[tok]))
+
+        survivors: dict[int, list[float]] = {}
+        for key, probs in heapq.nlargest(
+            config.beam_width, next_beams.items(), key=rank
+        ):
+            if isinstance(key, tuple):
+                node = add_node(*key, t)
+            else:
+                node = key
+                if in_use[node] == 0:
+                    # Un prefijo podado que vuelve al haz: su último carácter
+                    # sale en este frame, no en el de la alineación podada. Si
+                    # aún es prefijo de un haz vivo, su frame es el de ese haz.
+                    frame[node] = t
+            survivors[node] = probs
+        update_in_use(beams, survivors)
+        beams = survivors
+
+        if len(parent) >= compact_at:
+            beams = compact(beams)
+            # Al menos el doble de lo que sobrevivió: el costo de compactar
+            # (lineal en los nodos vivos) queda amortizado por nodo agregado.
+            compact_at = max(
+                2 * len(parent), len(parent) + COMPACT_INTERVAL * config.beam_width
+            )
+
+    def final_score(node: int) -> float:
+        score = _logaddexp(*beams[node]) + lm_score[node]
+        score += config.length_bonus * length[node]
+        if lm is not None:
+            end_log_prob, _ = lm.score(lm_state[node], "</s>")
+            score += config.lm_weight * end_log_prob
+        return score
+
+    best = max(beams, key=final_score)
+
+    tokens: list[int] = []
+    frames: list[int] = []
+    node = best
+    while node > 0:
+        tokens.append(token[node])
+        frames.append(frame[node])
+        node = parent[node]
+    tokens.reverse()
+    frames.reverse()
+
+    return BeamResult(
+        tokens=tokens, frames=frames, acoustic_log_prob=_logaddexp(*beams[best])
+    )
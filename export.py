@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import warnings
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+
+from asr_model import AsrTranscriber, load_transcriber
+from backends import (
+    CHECKPOINT_METADATA,
+    EXPORT_SUFFIXES,
+    default_export_path,
+    load_backend,
+)
+
+ONNX_OPSET = 17
+
+
+class _DenseGraph(nn.Module):
+    # torch.onnx exporta ``forward``; este envoltorio expone forward_dense.
+    def __init__(self, model: nn.Module) -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(self, mels: torch.Tensor) -> torch.Tensor:
+        return self.model.forward_dense(mels)
+
+
+def export_torchscript(transcriber: AsrTranscriber, path: Path) -> None:
+    with warnings.catch_warnings():
+        # torch.jit avisa que está deprecado; el export sigue funcionando.
+        warnings.simplefilter("ignore", FutureWarning)
+        scripted = torch.jit.script(transcriber.model)
+        torch.jit.save(
+            scripted,
+            str(path),
+            _extra_files={CHECKPOINT_METADATA: transcriber.checkpoint_fingerprint},
+        )
+
+
+def export_onnx(transcriber: AsrTranscriber, path: Path) -> None:
+    import onnx
+
+    example = torch.zeros(1, transcriber.config.n_mels, 400)
+    with warnings.catch_warnings():
+        # El exportador basado en torch.export no soporta nn.LSTM con tiempo
+        # dinámico; se usa el de TorchScript, que avisa que está deprecado.
+        warnings.simplefilter("ignore")
+        torch.onnx.export(
+            _DenseGraph(transcriber.model).eval(),
+            (example,),
+            str(path),
+            input_names=["mels"],
+            output_names=["log_probs"],
+            dynamic_axes={
+                "mels": {0: "batch", 2: "frames"},
+                "log_probs": {0: "batch", 1: "output_frames"},
+            },
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+
+    graph = onnx.load(str(path))
+    entry = graph.metadata_props.add()
+    entry.key = CHECKPOINT_METADATA
+    entry.value = transcriber.checkpoint_fingerprint
+    onnx.save(graph, str(path))
+
+
+EXPORTERS = {"torchscript": export_torchscript, "onnx": export_onnx}
+
+
+def check_parity(transcriber: AsrTranscriber, backend: str, path: Path) -> float:
+    """Diferencia máxima de log-probs entre ``backend`` y el modelo eager.
+
+    Usa mels aleatorios: clips sueltos de varias longitudes y un batch con
+    relleno con los mismos clips.
+    """
+    exported = load_backend(
+        backend,
+        transcriber.model,
+        transcriber.device,
+        path,
+        transcriber.checkpoint_fingerprint,
+    )
+    generator = torch.Generator().manual_seed(0)
+    mels = [
+        torch.randn(transcriber.config.n_mels, n, generator=generator) * 20 - 40
+        for n in (37, 400, 1001)
+    ]
+
+    worst = 0.0
+    for batch in [[m] for m in mels] + [mels]:
+        lengths = torch.tensor([m.size(1) for m in batch])
+        padded = nn.utils.rnn.pad_sequence([m.T for m in batch], batch_first=True)
+        padded = padded.transpose(1, 2).contiguous()
+
+        expected, output_lengths = transcriber.backend(padded, lengths)
+        actual, actual_lengths = exported(padded, lengths)
+        if not torch.equal(output_lengths.cpu(), actual_lengths.cpu()):
+            return float("inf")
+        for row, length in enumerate(output_lengths.tolist()):
+            diff = expected[row, :length].cpu() - actual[row, :length].cpu()
+            worst = max(worst, float(diff.abs().max()))
+    return worst
+
+
+def main(argv: list[str] | None = None) -> None:
+    from inference_checkpoint import default_checkpoint
+
+    parser = argparse.ArgumentParser(
+        prog="asr-export",
+        description="Exporta el checkpoint a TorchScript y/o ONNX (tiempo dinámico).",
+    )
+    parser.add_argument(
+        "-c", "--checkpoint", type=Path, default=None, help="Checkpoint del modelo."
+    )
+    parser.add_argument(
+        "--format",
+        dest="formats",
+        nargs="+",
+        choices=tuple(EXPORT_SUFFIXES),
+        default=list(EXPORT_SUFFIXES),
+        help="Formatos a exportar (por defecto, todos).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Carpeta de salida (por defecto, la del checkpoint).",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Compara los log-probs de cada export con el modelo eager.",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=1e-4, help="Diferencia máxima (--check)."
+    )
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or default_checkpoint()
+    transcriber = load_transcriber(checkpoint, device=torch.device("cpu"))
+
+    failed = False
+    for backend in args.formats:
+        path = default_export_path(checkpoint, backend)
+        if args.output_dir is not None:
+            args.output_dir.mkdir(parents=True, exist_ok=True)
+            path = args.output_dir / path.name
+        EXPORTERS[backend](transcriber, path)
+        print(f"{backend}: {path}", file=sys.stderr)
+
+        if args.check:
+            diff = check_parity(transcriber, backend, path)
+            ok = diff <= args.tolerance
+            failed = failed or not ok
+            status = "ok" if ok else "FALLA"
+            print(f"  paridad con eager: {diff:.2e} ({status})", file=sys.stderr)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
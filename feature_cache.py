@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from asr_model import ModelConfig
+
+# Cambiar si cambia la forma de calcular el log-mel, para no reusar entradas viejas.
+FEATURE_VERSION = 1
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("LOCALAPPDATA") or Path.home() / ".cache"
+    return Path(base) / "asr-tkinter-gui"
+
+
+class FeatureCache:
+    """Caché en disco de log-mels direccionada por contenido.
+
+    Cada entrada es un ``.npy`` nombrado con el hash del audio y de los campos
+    de ``ModelConfig`` que afectan al mel, y se abre con memory-map. El tamaño
+    total se limita a ``max_bytes`` descartando primero las entradas usadas
+    hace más tiempo (la fecha de modificación se actualiza en cada acierto).
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = 2 * 1024**3) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(audio_hash: str, config: ModelConfig) -> str:
+        fields = {
+            "version": FEATURE_VERSION,
+            "sample_rate": config.sample_rate,
+            "n_fft": config.n_fft,
+            "hop_length": config.hop_length,
+            "win_length": config.win_length,
+            "n_mels": config.n_mels,
+        }
+        payload = audio_hash + json.dumps(fields, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npy"
+
+    def get(self, key: str) -> np.ndarray | None:
+        path = self._path(key)
+        try:
+            # mmap_mode="c": las páginas se leen del archivo bajo demanda y el
+            # array sigue siendo escribible (copy-on-write) para torch.
+            mel = np.load(path, mmap_mode="c")
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return mel
+
+    def put(self, key: str, mel: np.ndarray) -> None:
+        # Escritura atómica: otro proceso nunca ve un .npy a medio escribir.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(mel, dtype=np.float32))
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.npy"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        entries = list(self.directory.glob("*.npy"))
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": len(entries),
+            "bytes": sum(p.stat().st_size for p in entries if p.exists()),
+        }
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+if TYPE_CHECKING:
+    from asr_model import ModelConfig
+
+# Mismos valores por defecto que librosa.power_to_db.
+AMIN = 1e-10
+TOP_DB = 80.0
+
+
+def _hz_to_mel(freqs: np.ndarray) -> np.ndarray:
+    # Escala de Slaney (librosa con htk=False): lineal hasta 1 kHz, log después.
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+
+    mels = freqs / f_sp
+    log_region = freqs >= min_log_hz
+    mels[log_region] = min_log_mel + np.log(freqs[log_region] / min_log_hz) / logstep
+    return mels
+
+
+def _mel_to_hz(mels: np.ndarray) -> np.ndarray:
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+
+    freqs = f_sp * mels
+    log_region = mels >= min_log_mel
+    freqs[log_region] = min_log_hz * np.exp(logstep * (mels[log_region] - min_log_mel))
+    return freqs
+
+
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Banco de filtros mel equivalente a ``librosa.filters.mel`` (slaney)."""
+    fft_freqs = np.linspace(0.0, sample_rate / 2.0, 1 + n_fft // 2)
+    mel_edges = np.linspace(
+        _hz_to_mel(np.array([0.0]))[0],
+        _hz_to_mel(np.array([sample_rate / 2.0]))[0],
+        n_mels + 2,
+    )
+    mel_freqs = _mel_to_hz(mel_edges)
+
+    fdiff = np.diff(mel_freqs)
+    ramps = np.subtract.outer(mel_freqs, fft_freqs)
+    lower = -ramps[:n_mels] / fdiff[:n_mels, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+
+    weights *= (2.0 / (mel_freqs[2:] - mel_freqs[:n_mels]))[:, None]
+    return weights.astype(np.float32)
+
+
+class MelFeatureExtractor:
+    """Log-mel en torch, equivalente al camino de librosa que usaba el modelo.
+
+    Reproduce ``librosa.feature.melspectrogram`` (ventana hamming, center=True,
+    pad reflect, potencia 2) seguido de ``power_to_db(ref=np.max)``. La ventana
+    y el banco de filtros se calculan una sola vez al construir el objeto.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        n_fft: int,
+        hop_length: int,
+        win_length: int,
+        n_mels: int,
+        device: torch.device | None = None,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.device = device or torch.device("cpu")
+
+        # Hamming periódica (fftbins=True en librosa) centrada en n_fft.
+        window = torch.hamming_window(win_length, periodic=True, dtype=torch.float32)
+        left = (n_fft - win_length) // 2
+        self.window = F.pad(window, (left, n_fft - win_length - left)).to(self.device)
+
+        self.filterbank = torch.from_numpy(
+            mel_filterbank(sample_rate, n_fft, n_mels)
+        ).to(self.device)
+
+    @classmethod
+    def from_config(
+        cls, config: ModelConfig, device: torch.device | None = None
+    ) -> MelFeatureExtractor:
+        return cls(
+            sample_rate=config.sample_rate,
+            n_fft=config.n_fft,
+            hop_length=config.hop_length,
+            win_length=config.win_length,
+            n_mels=config.n_mels,
+            device=device,
+        )
+
+    def num_frames(self, num_samples: int) -> int:
+        return 1 + num_samples // self.hop_length
+
+    def __call__(
+        self,
+        waveforms: torch.Tensor | np.ndarray,
+        lengths: torch.Tensor | None = None,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Calcula el log-mel de uno o varios audios.
+
+        ``waveforms`` es (muestras,) o (batch, muestras) a ``sample_rate``;
+        ``lengths`` indica las muestras válidas de cada fila si vienen con
+        relleno. Devuelve (batch, n_mels, frames) en dB y los frames válidos de
+        cada fila. Cada fila se normaliza con su propio máximo, como si se
+        hubiera procesado sola.
+        """
+        waveforms = torch.as_tensor(waveforms, dtype=torch.float32).to(self.device)
+        if waveforms.dim() == 1:
+            waveforms = waveforms.unsqueeze(0)
+        if lengths is None:
+            lengths = torch.full((waveforms.size(0),), waveforms.size(1))
+        lengths = lengths.to(torch.long).cpu()
+
+        # Reflect pad por fila sobre su parte válida (igual que center=True),
+        # para que el relleno del batch no entre en los últimos frames.
+        pad = self.n_fft // 2
+        rows = []
+        for row, length in enumerate(lengths.tolist()):
+            signal = waveforms[row, :length].unsqueeze(0)
+            mode = "reflect" if length > pad else "constant"
+            rows.append(F.pad(signal, (pad, pad), mode=mode).squeeze(0))
+        padded = torch.nn.utils.rnn.pad_sequence(rows, batch_first=True)
+
+        spec = torch.stft(
+            padded,
+            n_fft=self.n_fft,
+            hop_length=self.hop_length,
+            window=self.window,
+            center=False,
+            return_complex=True,
+        )
+        power = spec.real.square() + spec.imag.square()
+        mel = torch.matmul(self.filterbank, power)
+
+        frame_lengths = torch.tensor(
+            [self.num_frames(int(n)) for n in lengths], dtype=torch.long
+        )
+        mel = mel[:, :, : int(frame_lengths.max())]
+
+        valid = (
+            torch.arange(mel.size(2), device=mel.device)[None, :]
+            < frame_lengths.to(mel.device)[:, None]
+        )
+        log_mel = 10.0 * torch.log10(torch.clamp(mel, min=AMIN))
+        ref = torch.where(valid[:, None, :], mel, torch.zeros_like(mel))
+        ref = ref.amax(dim=(1, 2), keepdim=True)
+        log_mel = log_mel - 10.0 * torch.log10(torch.clamp(ref, min=AMIN))
+
+        peak = torch.where(
+            valid[:, None, :], log_mel, torch.full_like(log_mel, -torch.inf)
+        ).amax(dim=(1, 2), keepdim=True)
+        log_mel = torch.maximum(log_mel, peak - TOP_DB)
+        log_mel = log_mel * valid[:, None, :].to(log_mel.dtype)
+
+        return log_mel, frame_lengths
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from audio_io import AudioSource, DecodedAudio
+
+
+def hash_file(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_audio(source: AudioSource) -> str:
+    """Huella del contenido de un audio: bytes del archivo o del array.
+
+    Un ``DecodedAudio`` tiene la huella de sus muestras, calculada una sola vez
+    y sin volver a leer el archivo.
+    """
+    if isinstance(source, DecodedAudio):
+        return source.fingerprint
+    if not isinstance(source, np.ndarray):
+        return hash_file(source)
+
+    array = np.ascontiguousarray(source)
+    digest = hashlib.sha256()
+    digest.update(f"{array.dtype.str}{array.shape}".encode())
+    digest.update(memoryview(array).cast("B"))
+    return digest.hexdigest()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+# torch se importa al convertir o cargar: default_checkpoint y
+# is_inference_checkpoint los usa la app antes de mostrar la ventana.
+if TYPE_CHECKING:
+    import torch
+
+# Formato safetensors: 8 bytes con el largo del encabezado JSON, el encabezado
+# y los tensores contiguos. Se escribe a mano para no agregar la dependencia;
+# el archivo se puede abrir con la librería safetensors.
+FORMAT_NAME = "asr-inference-v1"
+INFERENCE_SUFFIX = ".safetensors"
+
+# dtype de safetensors -> nombre del dtype en torch.
+_DTYPES = {
+    "F64": "float64",
+    "F32": "float32",
+    "F16": "float16",
+    "BF16": "bfloat16",
+    "I64": "int64",
+    "I32": "int32",
+    "I16": "int16",
+    "I8": "int8",
+    "U8": "uint8",
+    "BOOL": "bool",
+}
+
+
+def default_checkpoint() -> Path:
+    """El checkpoint junto al código: ``best_model.pth`` (o el de la época 40),
+    o su ``.safetensors`` de asr-convert si está al día con el ``.pth``."""
+    checkpoint_path = Path(__file__).resolve().parent / "best_model.pth"
+    if not checkpoint_path.exists():
+        checkpoint_path = Path(__file__).resolve().parent / "checkpoint_epoch_40.pth"
+
+    # El formato compacto de asr-convert carga más rápido; se usa si está al
+    # día con el .pth (un .pth más nuevo significa un modelo reentrenado).
+    compact = checkpoint_path.with_suffix(INFERENCE_SUFFIX)
+    if compact.exists() and (
+        not checkpoint_path.exists()
+        or compact.stat().st_mtime >= checkpoint_path.stat().st_mtime
+    ):
+        checkpoint_path = compact
+    return checkpoint_path
+
+
+def is_inference_checkpoint(path: str | Path) -> bool:
+    """True si ``path`` es un safetensors (los checkpoints de torch son zip)."""
+    with Path(path).open("rb") as f:
+        prefix = f.read(9)
+    if len(prefix) < 9:
+        return False
+    header_size = int.from_bytes(prefix[:8], "little")
+    return prefix[8:9] == b"{" and 0 < header_size < Path(path).stat().st_size
+
+
+def save_inference_checkpoint(
+    state_dict: dict[str, torch.Tensor],
+    model_config: dict[str, Any],
+    idx_to_char: dict[Any, Any],
+    path: str | Path,
+    checkpoint_fingerprint: str = "",
+) -> None:
+    """Escribe solo los pesos, ``model_config`` e ``idx_to_char``.
+
+    Los tensores se ordenan por tamaño de elemento (de mayor a menor) y el
+    encabezado se rellena a múltiplo de 8, así cada tensor queda alineado y
+    se puede mapear sin copiar.
+    """
+    import torch
+
+    dtype_names = {getattr(torch, attr): name for name, attr in _DTYPES.items()}
+    tensors = sorted(
+        ((name, t.detach().cpu().contiguous()) for name, t in state_dict.items()),
+        key=lambda item: -item[1].element_size(),
+    )
+
+    header: dict[str, Any] = {
+        "__metadata__": {
+            "format": FORMAT_NAME,
+            "model_config": json.dumps(model_config),
+            "idx_to_char": json.dumps({str(k): v for k, v in idx_to_char.items()}),
+            "checkpoint_sha256": checkpoint_fingerprint,
+        }
+    }
+    offset = 0
+    for name, tensor in tensors:
+        size = tensor.numel() * tensor.element_size()
+        header[name] = {
+            "dtype": dtype_names[tensor.dtype],
+            "shape": list(tensor.shape),
+            "data_offsets": [offset, offset + size],
+        }
+        offset += size
+
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    encoded += b" " * (-(8 + len(encoded)) % 8)
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(len(encoded).to_bytes(8, "little"))
+        f.write(encoded)
+        for _, tensor in tensors:
+            f.write(tensor.reshape(-1).view(torch.uint8).numpy().tobytes())
+    tmp.replace(path)
+
+
+def load_inference_checkpoint(
+    path: str | Path,
+) -> tuple[dict[str, torch.Tensor], dict[str, Any], dict[str, Any], str]:
+    """Mapea el archivo en memoria y devuelve vistas sobre él, sin copiar.
+
+    Devuelve (state_dict, model_config, idx_to_char, checkpoint_sha256). El
+    mapeo es privado: las páginas se comparten por el page cache entre
+    procesos que cargan el mismo archivo y una escritura no toca el disco.
+    """
+    import torch
+
+    path = Path(path)
+    with path.open("rb") as f:
+        header_size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_size))
+
+    metadata = header.pop("__metadata__", {})
+    if metadata.get("format") != FORMAT_NAME:
+        raise ValueError(f"No es un checkpoint de inferencia ({FORMAT_NAME}): {path}")
+
+    data = torch.from_file(
+        str(path), shared=False, size=path.stat().st_size, dtype=torch.uint8
+    )
+    start = 8 + header_size
+
+    state_dict: dict[str, torch.Tensor] = {}
+    for name, info in header.items():
+        dtype = getattr(torch, _DTYPES[info["dtype"]])
+        begin, end = (start + o for o in info["data_offsets"])
+        raw = data[begin:end]
+        if begin % dtype.itemsize:
+            # Archivo de otra herramienta sin alinear: se copia ese tensor.
+            raw = raw.clone()
+        state_dict[name] = raw.view(dtype).reshape(info["shape"])
+
+    return (
+        state_dict,
+        json.loads(metadata["model_config"]),
+        json.loads(metadata["idx_to_char"]),
+        metadata.get("checkpoint_sha256", ""),
+    )
+
+
+def convert(checkpoint_path: str | Path, output: str | Path) -> None:
+    """Convierte un checkpoint de entrenamiento (``torch.save``) al formato compacto."""
+    import torch
+
+    from fingerprints import hash_file
+
+    checkpoint = torch.load(str(checkpoint_path), map_location="cpu")
+    if not isinstance(checkpoint, dict) or "model_state_dict" not in checkpoint:
+        raise ValueError(
+            "Checkpoint no tiene formato esperado (falta 'model_state_dict')"
+        )
+    save_inference_checkpoint(
+        checkpoint["model_state_dict"],
+        checkpoint["model_config"],
+        checkpoint["idx_to_char"],
+        output,
+        checkpoint_fingerprint=hash_file(checkpoint_path),
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="asr-convert",
+        description=(
+            "Convierte un checkpoint de entrenamiento a un archivo solo de "
+            "inferencia (safetensors) que se carga mapeado en memoria."
+        ),
+    )
+    parser.add_argument("checkpoint", type=Path, help="Checkpoint .pth de origen.")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="Archivo de salida (por defecto, el .pth con extensión .safetensors).",
+    )
+    args = parser.parse_args(argv)
+
+    output = args.output or args.checkpoint.with_suffix(INFERENCE_SUFFIX)
+    convert(args.checkpoint, output)
+    before = args.checkpoint.stat().st_size / 2**20
+    after = output.stat().st_size / 2**20
+    print(f"{output} ({before:.1f} MB -> {after:.1f} MB)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
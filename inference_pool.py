@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable
+
+import torch
+import torch.multiprocessing as torch_mp
+
+from asr_model import AsrTranscriber, Transcription, load_transcriber
+from audio_io import AudioSource
+from ctc_beam import BeamSearchConfig
+from inference_checkpoint import is_inference_checkpoint
+from vad import VadConfig
+
+# Transcriptor de cada proceso worker; lo arma _init_worker con los pesos
+# compartidos del proceso principal o mapeando el checkpoint compacto.
+_worker_transcriber: AsrTranscriber | None = None
+
+
+def _init_worker(state: dict[str, Any], num_threads: int) -> None:
+    global _worker_transcriber
+
+    torch.set_num_threads(num_threads)
+    if "checkpoint_path" in state:
+        # load_transcriber ya hace la pasada de calentamiento.
+        _worker_transcriber = load_transcriber(device=torch.device("cpu"), **state)
+        return
+    transcriber = AsrTranscriber(device=torch.device("cpu"), **state)
+    transcriber.warmup()
+    _worker_transcriber = transcriber
+
+
+def _transcribe(audio: AudioSource, options: dict[str, Any]) -> Transcription:
+    assert _worker_transcriber is not None
+    return _worker_transcriber.transcribe(audio, **options)
+
+
+def _worker_context() -> Any:
+    # forkserver: los workers salen de un proceso que ya importó torch y este
+    # módulo pero nunca corrió un kernel (sin threads de OpenMP que heredar),
+    # así comparten esas páginas en vez de cargar torch cada uno. En Windows
+    # no existe y se usa spawn. Los contextos de torch pasan los tensores
+    # compartidos como handles en vez de copiarlos.
+    if "forkserver" not in torch_mp.get_all_start_methods():
+        return torch_mp.get_context("spawn")
+    ctx = torch_mp.get_context("forkserver")
+    ctx.set_forkserver_preload([__name__])
+    return ctx
+
+
+class InferencePool:
+    """Procesos worker de un solo thread con un único juego de pesos.
+
+    Un checkpoint de torch (``.pth``) se carga una vez en este proceso y sus
+    tensores pasan a memoria compartida (``share_memory_``); cada worker
+    recibe un handle y mapea las mismas páginas. Un checkpoint compacto
+    (``.safetensors``) ya está mapeado del archivo y esas vistas no se pueden
+    pasar por handle: cada worker mapea el mismo archivo y el page cache
+    comparte las páginas. En los dos casos la RAM casi no crece con
+    ``workers``. En
+    CPU la BiLSTM escala mal con muchos threads dentro de un proceso, por eso
+    cada worker usa ``threads_per_worker`` (1 por defecto) y el paralelismo
+    viene de la cantidad de procesos.
+
+    Solo CPU y backend eager. Los workers arrancan a medida que llega
+    trabajo, desde un proceso que ya importó torch (ver ``_worker_context``),
+    así que tampoco duplican las páginas de torch.
+
+        with InferencePool("best_model.safetensors", workers=16) as pool:
+            futures = pool.map(paths)
+            texts = [f.result().text for f in futures]
+    """
+
+    def __init__(
+        self,
+        checkpoint_path: str | Path,
+        workers: int | None = None,
+        threads_per_worker: int = 1,
+        decoder: str = "greedy",
+        beam_config: BeamSearchConfig | None = None,
+        optimize: bool = True,
+    ) -> None:
+        if threads_per_worker < 1:
+            raise ValueError("threads_per_worker debe ser al menos 1")
+        self.workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.threads_per_worker = threads_per_worker
+
+        transcriber = load_transcriber(
+            checkpoint_path,
+            device=torch.device("cpu"),
+            decoder=decoder,
+            beam_config=beam_config,
+            optimize=optimize,
+        )
+        # Mientras el pool viva, este proceso conserva el dueño de los pesos.
+        self.transcriber = transcriber
+
+        state: dict[str, Any]
+        if is_inference_checkpoint(checkpoint_path):
+            state = {
+                "checkpoint_path": str(checkpoint_path),
+                "decoder": decoder,
+                "beam_config": transcriber.beam_config,
+                "optimize": optimize,
+            }
+        else:
+            transcriber.model.share_memory()
+            state = {
+                "model": transcriber.model,
+                "idx_to_char": transcriber.idx_to_char,
+                "config": transcriber.config,
+                "decoder": transcriber.decoder,
+                "beam_config": transcriber.beam_config,
+                "checkpoint_fingerprint": transcriber.checkpoint_fingerprint,
+            }
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=_worker_context(),
+            initializer=_init_worker,
+            initargs=(state, threads_per_worker),
+        )
+
+    def submit(
+        self,
+        audio: AudioSource,
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        vad: VadConfig | None = None,
+    ) -> Future[Transcription]:
+        """Encola una transcripción (ver ``AsrTranscriber.transcribe``)."""
+        options = {
+            "chunk_seconds": chunk_seconds,
+            "overlap_seconds": overlap_seconds,
+            "vad": vad,
+        }
+        return self._executor.submit(_transcribe, audio, options)
+
+    def map(
+        self,
+        sources: Iterable[AudioSource],
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        vad: VadConfig | None = None,
+    ) -> list[Future[Transcription]]:
+        """``submit`` para cada audio; los futures vuelven en el orden de entrada."""
+        return [
+            self.submit(audio, chunk_seconds, overlap_seconds, vad) for audio in sources
+        ]
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def __enter__(self) -> InferencePool:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
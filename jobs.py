@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable
+
+_current_job: ContextVar[Job | None] = ContextVar("asr_job", default=None)
+
+
+class Cancelled(Exception):
+    """El trabajo se canceló; lo lanza ``check_cancelled`` en el thread del job."""
+
+
+def check_cancelled() -> None:
+    """Lanza ``Cancelled`` si el job que corre en este thread se canceló.
+
+    ``AsrTranscriber`` la llama entre etapas y entre ventanas; fuera de un job
+    no hace nada.
+    """
+    job = _current_job.get()
+    if job is not None and job.cancel_requested:
+        raise Cancelled(job.name)
+
+
+class Job:
+    """Un trabajo enviado a ``JobExecutor``.
+
+    ``cancel`` no interrumpe la etapa en curso: el job termina con
+    ``Cancelled`` en el siguiente ``check_cancelled``, o no empieza si seguía
+    en cola.
+    """
+
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self.future: Future = Future()
+        self._cancel = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: float | None = None) -> Any:
+        return self.future.result(timeout)
+
+
+class JobExecutor:
+    """Pool de threads de larga vida para todo el trabajo en segundo plano.
+
+    Cada ``submit`` devuelve un ``Job`` que se puede cancelar; dentro del job
+    ``check_cancelled`` sabe cuál es sin pasarlo como argumento.
+    """
+
+    def __init__(self, max_workers: int = 2, name: str = "asr-job") -> None:
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._active: set[Job] = set()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, name: str = "") -> Job:
+        job = Job(name or getattr(fn, "__name__", ""))
+
+        def run() -> Any:
+            token = _current_job.set(job)
+            try:
+                check_cancelled()
+                return fn(*args)
+            finally:
+                _current_job.reset(token)
+
+        def forget(_: Future) -> None:
+            with self._lock:
+                self._active.discard(job)
+
+        with self._lock:
+            self._active.add(job)
+        job.future = self._pool.submit(run)
+        job.future.add_done_callback(forget)
+        return job
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            jobs = list(self._active)
+        for job in jobs:
+            job.cancel()
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancela lo pendiente y lo que está corriendo, y cierra el pool."""
+        self.cancel_all()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
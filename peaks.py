@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+from audio_io import DecodedAudio, downmix
+from feature_cache import default_cache_dir
+
+# Muestras por bloque del nivel más fino; cada nivel siguiente junta dos bloques.
+BASE_BLOCK = 256
+
+# Bloques del nivel más fino que se leen del disco por vez (~1M muestras).
+READ_BLOCKS = 4096
+
+PEAKS_SUFFIX = ".peaks"
+PEAKS_VERSION = 1
+
+
+def _block_peaks(samples: np.ndarray, block: int) -> tuple[np.ndarray, np.ndarray]:
+    body = samples.shape[0] // block * block
+    blocks = samples[:body].reshape(-1, block)
+    mins, maxs = blocks.min(axis=1), blocks.max(axis=1)
+    if body < samples.shape[0]:
+        tail = samples[body:]
+        mins = np.append(mins, tail.min())
+        maxs = np.append(maxs, tail.max())
+    return mins, maxs
+
+
+def _halve(mins: np.ndarray, maxs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Junta bloques de a dos; un bloque impar al final queda solo.
+    pairs = mins.shape[0] // 2 * 2
+    lo = np.minimum(mins[0:pairs:2], mins[1:pairs:2])
+    hi = np.maximum(maxs[0:pairs:2], maxs[1:pairs:2])
+    if pairs < mins.shape[0]:
+        lo = np.append(lo, mins[-1])
+        hi = np.append(hi, maxs[-1])
+    return lo, hi
+
+
+class PeakPyramid:
+    """Mínimo y máximo de cada bloque de un audio, a varias resoluciones.
+
+    El nivel 0 tiene un par (mín, máx) cada ``block`` muestras y cada nivel
+    siguiente la mitad de bloques que el anterior. Para dibujar ``width``
+    columnas ``columns`` usa solo el nivel cuyo bloque entra en una columna,
+    así el costo depende del ancho en píxeles y no de la duración del audio.
+    """
+
+    def __init__(
+        self,
+        mins: np.ndarray,
+        maxs: np.ndarray,
+        sample_rate: int,
+        frames: int,
+        block: int = BASE_BLOCK,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.block = block
+        self.levels: list[tuple[np.ndarray, np.ndarray]] = [
+            (np.asarray(mins, dtype=np.float32), np.asarray(maxs, dtype=np.float32))
+        ]
+        while self.levels[-1][0].shape[0] > 1:
+            self.levels.append(_halve(*self.levels[-1]))
+
+    @property
+    def seconds(self) -> float:
+        return self.frames / self.sample_rate
+
+    @classmethod
+    def from_samples(
+        cls, samples: np.ndarray, sample_rate: int, block: int = BASE_BLOCK
+    ) -> PeakPyramid:
+        mono = downmix(samples)
+        return cls(*_block_peaks(mono, block), sample_rate, mono.shape[0], block)
+
+    @classmethod
+    def from_file(cls, path: str | Path, block: int = BASE_BLOCK) -> PeakPyramid:
+        """Lee el archivo por partes: la memoria no depende de su duración."""
+        import soundfile as sf
+
+        mins: list[np.ndarray] = []
+        maxs: list[np.ndarray] = []
+        with sf.SoundFile(str(path)) as f:
+            sample_rate, frames = int(f.samplerate), int(f.frames)
+            for chunk in f.blocks(
+                blocksize=block * READ_BLOCKS, dtype="float32", always_2d=True
+            ):
+                lo, hi = _block_peaks(downmix(chunk), block)
+                mins.append(lo)
+                maxs.append(hi)
+        if not mins:
+            raise ValueError("Audio vacío")
+        return cls(
+            np.concatenate(mins), np.concatenate(maxs), sample_rate, frames, block
+        )
+
+    def level_for(self, samples_per_pixel: float) -> int:
+        """El nivel más grueso cuyos bloques no son más anchos que una columna."""
+        if samples_per_pixel < 2 * self.block:
+            return 0
+        level = int(math.log2(samples_per_pixel / self.block))
+        return min(level, len(self.levels) - 1)
+
+    def columns(
+        self, start: float, samples_per_pixel: float, width: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Mín. y máx. de ``width`` columnas desde la muestra ``start`` (>= 0).
+
+        Devuelve menos columnas si el audio termina antes del borde derecho.
+        Un bloque que cruza el borde entre dos columnas cuenta en las dos, así
+        ningún pico se pierde; con columnas más angostas que un bloque del
+        nivel 0, columnas vecinas repiten el mismo bloque.
+        """
+        level = self.level_for(samples_per_pixel)
+        block = self.block << level
+        mins, maxs = self.levels[level]
+
+        edges = start + np.arange(width) * samples_per_pixel
+        edges = edges[edges < self.frames]
+        if not edges.shape[0]:
+            empty = np.zeros(0, dtype=np.float32)
+            return empty, empty
+        end = min(edges[-1] + samples_per_pixel, self.frames)
+        first = int(edges[0]) // block
+        stop = min(mins.shape[0], int(math.ceil(end / block)))
+        index = np.minimum(edges.astype(np.int64) // block, stop - 1) - first
+        # Solo se toca el tramo visible de este nivel.
+        lo = np.minimum.reduceat(mins[first:stop], index)
+        hi = np.maximum.reduceat(maxs[first:stop], index)
+        # reduceat deja el bloque donde empieza la columna siguiente solo en
+        # esa columna; si el borde cae dentro del bloque, también es de esta.
+        straddles = edges[1:] > (index[1:] + first) * block
+        following = index[1:][straddles]
+        lo[:-1][straddles] = np.minimum(lo[:-1][straddles], mins[first:stop][following])
+        hi[:-1][straddles] = np.maximum(hi[:-1][straddles], maxs[first:stop][following])
+        return lo, hi
+
+    def save(self, path: str | Path, source: os.stat_result) -> None:
+        """Guarda el nivel 0 (los demás se recalculan al cargar) junto con el
+        tamaño y la fecha del audio, para detectar si cambió."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        mins, maxs = self.levels[0]
+        with tmp.open("wb") as f:
+            np.savez(
+                f,
+                version=PEAKS_VERSION,
+                source_size=source.st_size,
+                source_mtime_ns=source.st_mtime_ns,
+                sample_rate=self.sample_rate,
+                frames=self.frames,
+                block=self.block,
+                mins=mins,
+                maxs=maxs,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path, source: os.stat_result) -> PeakPyramid | None:
+        """La pirámide guardada en ``path``, o None si no es del audio actual."""
+        with np.load(str(path), allow_pickle=False) as data:
+            if (
+                int(data["version"]) != PEAKS_VERSION
+                or int(data["source_size"]) != source.st_size
+                or int(data["source_mtime_ns"]) != source.st_mtime_ns
+            ):
+                return None
+            return cls(
+                data["mins"],
+                data["maxs"],
+                int(data["sample_rate"]),
+                int(data["frames"]),
+                int(data["block"]),
+            )
+
+
+def default_peaks_dir() -> Path:
+    return default_cache_dir() / "peaks"
+
+
+def peaks_path(audio_path: str | Path, cache_dir: str | Path | None = None) -> Path:
+    """Archivo de caché de ``audio_path``, nombrado con el hash de su ruta."""
+    resolved = str(Path(audio_path).resolve())
+    name = hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:32] + PEAKS_SUFFIX
+    return Path(cache_dir or default_peaks_dir()) / name
+
+
+def load_peaks(
+    audio: str | Path | DecodedAudio,
+    cache: bool = True,
+    cache_dir: str | Path | None = None,
+) -> PeakPyramid:
+    """Pirámide de picos del audio, de la caché si está al día.
+
+    Con ``cache`` la pirámide calculada se guarda en ``cache_dir`` (por
+    defecto ``default_peaks_dir()``), nunca en la carpeta del audio; si no se
+    puede escribir simplemente no se guarda. Con un ``DecodedAudio`` se
+    calcula de sus muestras en vez de releer el archivo.
+    """
+    decoded = audio if isinstance(audio, DecodedAudio) else None
+    if decoded is not None:
+        if decoded.path is None:
+            return PeakPyramid.from_samples(decoded.samples, decoded.sample_rate)
+        audio = decoded.path
+
+    audio_path = Path(audio)
+    source = audio_path.stat()
+    cache_path = peaks_path(audio_path, cache_dir)
+    if cache and cache_path.exists():
+        try:
+            pyramid = PeakPyramid.load(cache_path, source)
+        except (OSError, ValueError, KeyError):
+            pyramid = None
+        if pyramid is not None:
+            return pyramid
+
+    if decoded is not None:
+        pyramid = PeakPyramid.from_samples(decoded.samples, decoded.sample_rate)
+    else:
+        pyramid = PeakPyramid.from_file(audio_path)
+    if cache:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            pyramid.save(cache_path, source)
+        except OSError:
+            pass
+    return pyramid
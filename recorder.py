@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+# Capacidad inicial del buffer circular (segundos); crece si el disco se atrasa.
+RING_SECONDS = 10.0
+
+# Cada cuánto el thread escritor vacía el buffer aunque no lo despierten (segundos).
+DRAIN_INTERVAL = 0.1
+
+
+class RingBuffer:
+    """Buffer circular float32 de un productor y un consumidor.
+
+    ``write`` se llama desde el callback de audio y solo copia en memoria ya
+    reservada; si el consumidor se atrasa tanto que no hay lugar, la
+    capacidad se duplica en vez de perder muestras.
+    """
+
+    def __init__(self, capacity: int, channels: int = 1) -> None:
+        self._data = np.zeros((max(1, capacity), channels), dtype=np.float32)
+        self._read = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    def write(self, block: np.ndarray) -> None:
+        frames = block.shape[0]
+        with self._lock:
+            if self._size + frames > self.capacity:
+                self._grow(self._size + frames)
+            start = (self._read + self._size) % self.capacity
+            first = min(frames, self.capacity - start)
+            self._data[start : start + first] = block[:first]
+            self._data[: frames - first] = block[first:]
+            self._size += frames
+
+    def read(self) -> np.ndarray:
+        """Saca todo lo disponible (una copia, en orden)."""
+        with self._lock:
+            end = self._read + self._size
+            if end <= self.capacity:
+                out = self._data[self._read : end].copy()
+            else:
+                out = np.concatenate(
+                    [self._data[self._read :], self._data[: end - self.capacity]]
+                )
+            self._read = end % self.capacity
+            self._size = 0
+            return out
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        data = np.zeros((capacity, self._data.shape[1]), dtype=np.float32)
+        end = self._read + self._size
+        if end <= self.capacity:
+            data[: self._size] = self._data[self._read : end]
+        else:
+            head = self.capacity - self._read
+            data[:head] = self._data[self._read :]
+            data[head : self._size] = self._data[: end - self.capacity]
+        self._data = data
+        self._read = 0
+
+
+class Recorder:
+    """Graba del micrófono directo a un WAV PCM de 16 bits.
+
+    ``sounddevice`` entrega bloques en un callback que solo los copia al
+    ``RingBuffer``; un thread aparte los escribe con ``soundfile`` a medida
+    que llegan y se los pasa a ``on_audio`` (p. ej. la transcripción en
+    vivo). La memoria no crece con la duración y ``stop`` solo tiene que
+    vaciar lo que quedó en el buffer.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        on_audio: Callable[[np.ndarray], None] | None = None,
+        block_size: int = 1024,
+    ) -> None:
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.on_audio = on_audio
+        self.block_size = block_size
+
+        self.frames = 0
+        # Bloques que el driver marcó con desborde de entrada (audio perdido).
+        self.overflows = 0
+
+        self._ring = RingBuffer(int(RING_SECONDS * sample_rate), channels)
+        self._wake = threading.Event()
+        self._running = False
+        self._error: Exception | None = None
+        self._stream: Any = None
+        self._file: Any = None
+        self._writer: threading.Thread | None = None
+
+    @property
+    def seconds(self) -> float:
+        return self.frames / self.sample_rate
+
+    def start(self) -> None:
+        import sounddevice as sd
+        import soundfile as sf
+
+        self._file = sf.SoundFile(
+            str(self.path),
+            mode="w",
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            subtype="PCM_16",
+        )
+        self._running = True
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        try:
+            self._stream = sd.InputStream(
+                samplerate=self.sample_rate,
+                channels=self.channels,
+                dtype="float32",
+                blocksize=self.block_size,
+                callback=self._callback,
+            )
+            self._stream.start()
+        except Exception:
+            self._finish()
+            raise
+
+    def _callback(
+        self, indata: np.ndarray, frames: int, time: Any, status: Any
+    ) -> None:
+        if status.input_overflow:
+            self.overflows += 1
+        self._ring.write(indata)
+        self._wake.set()
+
+    def _write_loop(self) -> None:
+        while True:
+            self._wake.wait(DRAIN_INTERVAL)
+            self._wake.clear()
+            running = self._running
+            self._drain()
+            if not running:
+                return
+
+    def _drain(self) -> None:
+        block = self._ring.read()
+        if not block.shape[0] or self._error is not None:
+            return
+        try:
+            self._file.write(block)
+            self.frames += block.shape[0]
+            if self.on_audio is not None:
+                self.on_audio(block)
+        except Exception as exc:
+            # Se reporta en stop(); el callback de audio sigue sin bloquearse.
+            self._error = exc
+
+    def stop(self) -> Path:
+        """Cierra el micrófono, escribe lo pendiente y devuelve la ruta del WAV."""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        self._finish()
+        if self._error is not None:
+            raise self._error
+        return self.path
+
+    def _finish(self) -> None:
+        self._running = False
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+from asr_model import AsrTranscriber, Transcription
+from audio_io import AudioSource
+from fingerprints import hash_audio
+from vad import VadConfig
+
+
+class ResultCache:
+    """Caché de transcripciones ``(texto, confianza)`` por clave.
+
+    Tiene un nivel LRU en memoria de ``max_entries`` elementos y, si se pasa
+    ``sqlite_path``, un nivel persistente en SQLite que sobrevive entre
+    ejecuciones. Es seguro usarla desde varios threads, y varios procesos
+    pueden compartir el mismo archivo (``asr-batch -j N``): la base está en
+    modo WAL y una escritura espera hasta ``timeout`` segundos a que otro
+    proceso suelte el lock. Si aun así SQLite falla, la lectura cuenta como
+    fallo de caché y la escritura queda sólo en memoria (se cuenta en
+    ``write_errors``); la transcripción nunca falla por la caché.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        sqlite_path: str | Path | None = None,
+        timeout: float = 30.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.write_errors = 0
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db: sqlite3.Connection | None = None
+        if sqlite_path is not None:
+            sqlite_path = Path(sqlite_path)
+            sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(
+                str(sqlite_path), timeout=timeout, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+                "confidence REAL NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(
+        audio_hash: str, checkpoint_fingerprint: str, settings: dict[str, Any]
+    ) -> str:
+        payload = json.dumps(
+            [audio_hash, checkpoint_fingerprint, settings], sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+            elif self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT text, confidence FROM results WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    result = (str(row[0]), float(row[1]))
+                    self._remember(key, result)
+
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return result
+
+    def put(self, key: str, text: str, confidence: float) -> None:
+        with self._lock:
+            self._remember(key, (text, confidence))
+            if self._db is not None:
+                try:
+                    with self._db:
+                        self._db.execute(
+                            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                            (key, text, confidence, time.time()),
+                        )
+                except sqlite3.Error:
+                    self.write_errors += 1
+
+    def _remember(self, key: str, result: tuple[str, float]) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachedTranscriber:
+    """``AsrTranscriber`` con una ``ResultCache`` delante.
+
+    La clave combina el hash del audio, el hash del checkpoint cargado (y su
+    cuantización) y los parámetros del decodificador, así que cambiar
+    ``best_model.pth`` o el decodificador invalida los resultados anteriores
+    sin hacer nada más.
+    """
+
+    def __init__(self, transcriber: AsrTranscriber, cache: ResultCache) -> None:
+        self.transcriber = transcriber
+        self.cache = cache
+
+    @property
+    def device(self):  # type: ignore[no-untyped-def]
+        return self.transcriber.device
+
+    def transcribe(
+        self,
+        audio_path: AudioSource,
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        vad: VadConfig | None = None,
+    ) -> Transcription:
+        """Como ``AsrTranscriber.transcribe``; un acierto de la caché no trae
+        ``char_frames`` ni informe de VAD (no se corrió el modelo)."""
+        key = self._key(audio_path, chunk_seconds, overlap_seconds, vad)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return Transcription(*cached)
+
+        result = self.transcriber.transcribe(
+            audio_path,
+            chunk_seconds=chunk_seconds,
+            overlap_seconds=overlap_seconds,
+            vad=vad,
+        )
+        self.cache.put(key, result.text, result.confidence)
+        return result
+
+    def _key(
+        self,
+        audio_path: AudioSource,
+        chunk_seconds: float | None,
+        overlap_seconds: float,
+        vad: VadConfig | None,
+    ) -> str:
+        settings = self.transcriber.decoder_settings()
+        settings["quantize"] = self.transcriber.quantize
+        settings["backend"] = self.transcriber.backend.name
+        if chunk_seconds is not None:
+            settings["chunk"] = [chunk_seconds, overlap_seconds]
+        if vad is not None:
+            settings["vad"] = asdict(vad)
+        return self.cache.key(
+            hash_audio(audio_path), self.transcriber.checkpoint_fingerprint, settings
+        )
+
+    def transcribe_wavs(
+        self, audio_paths: Sequence[str | Path], workers: int = 2
+    ) -> Iterator[tuple[int, tuple[str, float] | Exception]]:
+        """Como ``AsrTranscriber.transcribe_wavs``, en el orden de entrada.
+
+        La clave de cada archivo se calcula y se busca en los threads de
+        preparación del pipeline, mientras el modelo procesa otro archivo; un
+        acierto sale sin leer el audio ni pasar por el modelo.
+        """
+        keys: dict[int, str] = {}
+        hits: set[int] = set()
+
+        def lookup(index: int, path: AudioSource) -> Transcription | None:
+            keys[index] = self._key(path, None, 2.0, None)
+            cached = self.cache.get(keys[index])
+            if cached is None:
+                return None
+            hits.add(index)
+            return Transcription(*cached)
+
+        results = self.transcriber.transcribe_pipelined(
+            audio_paths, workers, lookup=lookup
+        )
+        for index, result in results:
+            if isinstance(result, Exception):
+                yield index, result
+                continue
+            if index not in hits:
+                self.cache.put(keys[index], result.text, result.confidence)
+            yield index, (result.text, result.confidence)
+
+    def transcribe_wav(
+        self,
+        audio_path: AudioSource,
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        vad: VadConfig | None = None,
+    ) -> tuple[str, float]:
+        result = self.transcribe(audio_path, chunk_seconds, overlap_seconds, vad)
+        return result.text, result.confidence
@@ -0,0 +1,446 @@
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Sequence
+
+from transcription import Transcription
+
+if TYPE_CHECKING:
+    from asr_model import AsrTranscriber
+    from audio_io import DecodedAudio
+    from timings import Timings
+    from vad import VadConfig
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+
+# Tiempo máximo que una petición HTTP espera su resultado (segundos).
+REQUEST_TIMEOUT = 600.0
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class _Request:
+    path: str
+    chunk_seconds: float | None
+    overlap_seconds: float = 2.0
+    vad: VadConfig | None = None
+    enqueued: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatcher:
+    """Cola de peticiones servida por un único thread dueño del modelo.
+
+    El thread toma la primera petición pendiente y espera hasta
+    ``max_wait_seconds`` a que lleguen más (como máximo ``max_batch_size``);
+    el grupo se transcribe con ``transcribe_many``, que junta en una pasada
+    solo los clips de longitud parecida (``max_length_ratio``). Las
+    peticiones por ventanas (``chunk_seconds``) o con VAD ya agrupan sus
+    propias ventanas o segmentos y se procesan de a una.
+    """
+
+    def __init__(
+        self,
+        transcriber: AsrTranscriber,
+        max_batch_size: int = 8,
+        max_wait_seconds: float = 0.02,
+        max_length_ratio: float = 1.25,
+        stats_window: int = 1000,
+    ) -> None:
+        self.transcriber = transcriber
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.max_length_ratio = max_length_ratio
+
+        self._queue: queue.Queue[_Request] = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=stats_window)
+        self._waits: deque[float] = deque(maxlen=stats_window)
+        self._requests = 0
+        self._errors = 0
+        self._batches = 0
+        self._batched_requests = 0
+        # Tiempo por etapa de cada pasada (una por batch o por petición suelta).
+        self._stages: dict[str, deque[float]] = {}
+        self._stats_window = stats_window
+        # Se encadena al hook que ya tuviera el transcriptor en vez de pisarlo.
+        self._previous_hook = transcriber.metrics_hook
+        transcriber.metrics_hook = self._on_metrics
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        path: str,
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        vad: VadConfig | None = None,
+    ) -> Future:
+        request = _Request(path, chunk_seconds, overlap_seconds, vad)
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self) -> list[_Request]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            whole, single = [], []
+            for request in batch:
+                alone = request.chunk_seconds is not None or request.vad is not None
+                (single if alone else whole).append(request)
+
+            if whole:
+                try:
+                    results = self.transcriber.transcribe_many(
+                        [r.path for r in whole], max_length_ratio=self.max_length_ratio
+                    )
+                except Exception:
+                    # Un archivo roto no debe tumbar al resto del grupo.
+                    results = None
+                if results is None:
+                    for request in whole:
+                        self._finish_one(request, started)
+                else:
+                    for request, result in zip(whole, results):
+                        self._resolve(request, started, result)
+
+            for request in single:
+                self._finish_one(request, started)
+
+            with self._lock:
+                self._batches += 1
+                self._batched_requests += len(batch)
+
+    def _finish_one(self, request: _Request, started: float) -> None:
+        try:
+            result = self.transcriber.transcribe(
+                request.path,
+                chunk_seconds=request.chunk_seconds,
+                overlap_seconds=request.overlap_seconds,
+                vad=request.vad,
+            )
+        except Exception as exc:
+            self._resolve(request, started, exc)
+            return
+        self._resolve(request, started, result)
+
+    def _resolve(
+        self, request: _Request, started: float, result: Transcription | Exception
+    ) -> None:
+        with self._lock:
+            self._requests += 1
+            self._waits.append(started - request.enqueued)
+            self._latencies.append(time.perf_counter() - request.enqueued)
+            if isinstance(result, Exception):
+                self._errors += 1
+        if isinstance(result, Exception):
+            request.future.set_exception(result)
+        else:
+            request.future.set_result(result)
+
+    def _on_metrics(self, event: str, timings: Timings) -> None:
+        if self._previous_hook is not None:
+            self._previous_hook(event, timings)
+        if event != "transcribe":
+            return
+        with self._lock:
+            for name, seconds in timings.spans.items():
+                self._stages.setdefault(name, deque(maxlen=self._stats_window)).append(
+                    seconds
+                )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stages = {name: list(values) for name, values in self._stages.items()}
+            latencies = list(self._latencies)
+            waits = list(self._waits)
+            batches = self._batches
+            batched = self._batched_requests
+            requests = self._requests
+            errors = self._errors
+
+        def summary(values: list[float]) -> dict[str, float]:
+            return {
+                "p50": round(_percentile(values, 0.50) * 1e3, 2),
+                "p95": round(_percentile(values, 0.95) * 1e3, 2),
+                "max": round(max(values, default=0.0) * 1e3, 2),
+            }
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "requests": requests,
+            "errors": errors,
+            "batches": batches,
+            "mean_batch_size": round(batched / batches, 2) if batches else 0.0,
+            "latency_ms": summary(latencies),
+            "queue_wait_ms": summary(waits),
+            "stages_ms": {name: summary(values) for name, values in stages.items()},
+        }
+
+
+def _make_handler(batcher: MicroBatcher, info: dict[str, Any]) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                self._send_json(200, info)
+            elif self.path == "/stats":
+                self._send_json(200, batcher.stats())
+            else:
+                self._send_json(404, {"error": f"Ruta desconocida: {self.path}"})
+
+        def do_POST(self) -> None:
+            if self.path != "/transcribe":
+                self._send_json(404, {"error": f"Ruta desconocida: {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                path = str(payload["path"])
+                chunk_seconds = payload.get("chunk_seconds")
+                overlap_seconds = float(payload.get("overlap_seconds", 2.0))
+                vad = None
+                if payload.get("vad") is not None:
+                    from vad import VadConfig
+
+                    vad = VadConfig(**payload["vad"])
+            except (ValueError, KeyError, TypeError) as exc:
+                self._send_json(400, {"error": f"Petición inválida: {exc}"})
+                return
+
+            future = batcher.submit(path, chunk_seconds, overlap_seconds, vad)
+            try:
+                result = future.result(timeout=REQUEST_TIMEOUT)
+            except Exception as exc:
+                self._send_json(500, {"error": str(exc)})
+                return
+            self._send_json(
+                200,
+                {
+                    "text": result.text,
+                    "confidence": result.confidence,
+                    "char_frames": result.char_frames,
+                    "vad": result.vad.as_dict() if result.vad else None,
+                },
+            )
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Sin una línea por petición en stderr; las cifras están en /stats.
+            pass
+
+    return Handler
+
+
+class ServerTranscriber:
+    """Cliente de ``asr-server`` con la interfaz de ``transcribe`` y
+    ``transcribe_wav``.
+
+    Las rutas se envían tal cual: el servidor lee los archivos del mismo
+    disco, así que solo sirve para clientes en la misma máquina.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = REQUEST_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path: str, payload: dict[str, Any] | None = None) -> Any:
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        request = urllib.request.Request(
+            self.url + path,
+            data=data,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            message = json.loads(exc.read() or b"{}").get("error", str(exc))
+            raise RuntimeError(message) from None
+
+    def health(self) -> dict[str, Any]:
+        return self._request("/health")
+
+    def stats(self) -> dict[str, Any]:
+        return self._request("/stats")
+
+    def transcribe(
+        self,
+        audio_path: str | Path | DecodedAudio,
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        vad: VadConfig | None = None,
+    ) -> Transcription:
+        """Como ``AsrTranscriber.transcribe``, sin ``timings`` (el tiempo por
+        etapa queda en el ``/stats`` del servidor)."""
+        if not isinstance(audio_path, (str, Path)):
+            # Un DecodedAudio: el servidor relee su archivo de origen.
+            if audio_path.path is None:
+                raise ValueError("El servidor solo transcribe archivos")
+            audio_path = audio_path.path
+        payload: dict[str, Any] = {"path": str(Path(audio_path).resolve())}
+        if chunk_seconds is not None:
+            payload["chunk_seconds"] = chunk_seconds
+            payload["overlap_seconds"] = overlap_seconds
+        if vad is not None:
+            payload["vad"] = asdict(vad)
+        result = self._request("/transcribe", payload)
+        report = None
+        if result.get("vad") is not None:
+            from vad import VadReport
+
+            report = VadReport(
+                audio_seconds=result["vad"]["audio_seconds"],
+                speech_seconds=result["vad"]["speech_seconds"],
+                segments=result["vad"]["segments"],
+            )
+        return Transcription(
+            result["text"],
+            result["confidence"],
+            char_frames=tuple((start, end) for start, end in result["char_frames"]),
+            vad=report,
+        )
+
+    def transcribe_wav(
+        self,
+        audio_path: str | Path | DecodedAudio,
+        chunk_seconds: float | None = None,
+        overlap_seconds: float = 2.0,
+        vad: VadConfig | None = None,
+    ) -> tuple[str, float]:
+        result = self.transcribe(audio_path, chunk_seconds, overlap_seconds, vad)
+        return result.text, result.confidence
+
+    def transcribe_wavs(
+        self, audio_paths: Sequence[str | Path], workers: int = 4
+    ) -> Iterator[tuple[int, tuple[str, float] | Exception]]:
+        """Envía ``workers`` peticiones a la vez para que el servidor las agrupe
+        en micro-batches; los resultados salen en el orden en que terminan."""
+        pool = ThreadPoolExecutor(workers, thread_name_prefix="asr-client")
+        try:
+            futures = {
+                pool.submit(self.transcribe_wav, path): index
+                for index, path in enumerate(audio_paths)
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                yield futures[future], error if error is not None else future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="asr-server",
+        description=(
+            "Servidor HTTP local con un único modelo compartido; agrupa las "
+            "peticiones concurrentes en micro-batches."
+        ),
+    )
+    parser.add_argument(
+        "-c", "--checkpoint", type=Path, default=None, help="Checkpoint del modelo."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Dirección (sin auth).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--max-batch", type=int, default=8, help="Peticiones por micro-batch."
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=20.0,
+        help="Espera máxima por más peticiones antes de procesar el grupo.",
+    )
+    parser.add_argument("--threads", type=int, default=None, help="Threads de torch.")
+    parser.add_argument(
+        "--device", default=None, help="Dispositivo torch (cpu, cuda, ...)."
+    )
+    parser.add_argument(
+        "--decoder", choices=("greedy", "beam"), default="greedy", help="Decodificador."
+    )
+    parser.add_argument(
+        "--backend", choices=("eager", "torchscript", "onnx"), default="eager"
+    )
+    parser.add_argument("--quantize", choices=("int8",), default=None)
+    args = parser.parse_args(argv)
+
+    import torch
+
+    from asr_model import load_transcriber
+    from inference_checkpoint import default_checkpoint
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    checkpoint = args.checkpoint or default_checkpoint()
+    transcriber = load_transcriber(
+        checkpoint,
+        device=torch.device(args.device) if args.device else None,
+        decoder=args.decoder,
+        quantize=args.quantize,
+        backend=args.backend,
+    )
+    transcriber.warmup_audio_io()
+    batcher = MicroBatcher(
+        transcriber,
+        max_batch_size=args.max_batch,
+        max_wait_seconds=args.max_wait_ms / 1e3,
+    )
+    info = {
+        "checkpoint": str(checkpoint),
+        "device": transcriber.device.type,
+        "backend": transcriber.backend.name,
+        "decoder": transcriber.decoder,
+    }
+
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(batcher, info))
+    print(f"asr-server en http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
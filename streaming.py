@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import torch
+
+from asr_model import AsrTranscriber, Transcription
+from audio_io import resample
+
+# Índice del blank CTC, como en AsrTranscriber.
+BLANK_IDX = 0
+
+
+class StreamingTranscriber:
+    """Transcripción incremental de audio que llega por partes (micrófono).
+
+    ``accept`` agrega muestras desde el thread que graba y ``step`` corre el
+    modelo sobre el contexto reciente: los frames que quedan a más de
+    ``right_context_seconds`` del final se confirman y no se vuelven a
+    calcular; el resto es una hipótesis parcial que se corrige en el siguiente
+    paso. El buffer solo guarda ``left_context_seconds`` de audio antes del
+    último frame confirmado, y los frames confirmados se decodifican (greedy)
+    una sola vez, al confirmarse: cada paso cuesta lo mismo sin importar la
+    duración de la grabación.
+    """
+
+    def __init__(
+        self,
+        transcriber: AsrTranscriber,
+        input_sample_rate: int | None = None,
+        left_context_seconds: float = 2.0,
+        right_context_seconds: float = 1.0,
+    ) -> None:
+        config = transcriber.config
+        self.transcriber = transcriber
+        self.input_sample_rate = input_sample_rate or config.sample_rate
+
+        self._frame_samples = config.hop_length * 4
+        frame_rate = config.sample_rate / self._frame_samples
+        self._left_frames = int(round(left_context_seconds * frame_rate))
+        self._right_frames = int(round(right_context_seconds * frame_rate))
+
+        self._lock = threading.Lock()
+        self._buffer = np.zeros(0, dtype=np.float32)
+        # Índice global (en muestras) de self._buffer[0]; múltiplo de un frame.
+        self._buffer_start = 0
+
+        self._committed_frames = 0
+        # Log-probs confirmados, solo si finish usa otro decodificador que greedy.
+        self._keep_log_probs = transcriber.decoder != "greedy"
+        self._committed: list[torch.Tensor] = []
+
+        # Decodificación greedy de lo confirmado: texto, frames y probabilidad
+        # de cada carácter, y el índice del último frame (una corrida que lo
+        # continúa en el paso siguiente no repite el carácter).
+        self._text = ""
+        self._char_frames: list[tuple[int, int]] = []
+        self._char_probs: list[float] = []
+        self._last_index = BLANK_IDX
+
+    def accept(self, samples: np.ndarray) -> None:
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        samples = resample(
+            samples, self.input_sample_rate, self.transcriber.config.sample_rate
+        )
+        with self._lock:
+            self._buffer = np.concatenate([self._buffer, samples])
+
+    def step(self, final: bool = False) -> Transcription:
+        """Procesa el audio acumulado y devuelve la transcripción hasta ahora.
+
+        Las hipótesis parciales usan decodificación greedy; con ``final=True``
+        se confirma todo y se usa el decodificador configurado.
+        """
+        with self._lock:
+            audio = self._buffer
+            buffer_start = self._buffer_start
+
+        partial: torch.Tensor | None = None
+        if audio.shape[0] >= self._frame_samples:
+            log_probs = self.transcriber.log_probs(audio).cpu()
+
+            first_frame = buffer_start // self._frame_samples
+            end_frame = first_frame + log_probs.size(0)
+            commit_until = end_frame if final else end_frame - self._right_frames
+
+            lo = self._committed_frames - first_frame
+            if commit_until > self._committed_frames:
+                self._commit(log_probs[lo : commit_until - first_frame])
+                self._committed_frames = commit_until
+            partial = log_probs[self._committed_frames - first_frame :]
+
+            keep_frame = max(first_frame, self._committed_frames - self._left_frames)
+            drop = (keep_frame - first_frame) * self._frame_samples
+            if drop > 0:
+                with self._lock:
+                    self._buffer = self._buffer[drop:]
+                    self._buffer_start += drop
+
+        if final and self._keep_log_probs:
+            if not self._committed:
+                return Transcription("", 0.0)
+            return self.transcriber.decode(torch.cat(self._committed, dim=0))
+
+        text, char_frames, probs = self._text, self._char_frames, self._char_probs
+        if partial is not None and partial.size(0):
+            # La hipótesis parcial se decodifica aparte y se agrega al final.
+            extended, runs, _ = self._greedy_runs(partial, self._committed_frames)
+            text += "".join(self.transcriber.idx_to_char.get(s, "") for s, _, _ in runs)
+            char_frames = char_frames + [frames for _, frames, _ in runs]
+            probs = probs + [prob for _, _, prob in runs]
+            if extended is not None:
+                char_frames[len(self._char_frames) - 1] = extended
+        if not char_frames:
+            return Transcription("", 0.0)
+        return Transcription(
+            text=text,
+            confidence=sum(probs) / len(probs),
+            char_frames=tuple(char_frames),
+        )
+
+    def finish(self) -> Transcription:
+        return self.step(final=True)
+
+    def _commit(self, log_probs: torch.Tensor) -> None:
+        if self._keep_log_probs:
+            self._committed.append(log_probs)
+        extended, runs, self._last_index = self._greedy_runs(
+            log_probs, self._committed_frames
+        )
+        if extended is not None:
+            self._char_frames[-1] = extended
+        self._text += "".join(
+            self.transcriber.idx_to_char.get(s, "") for s, _, _ in runs
+        )
+        self._char_frames.extend(frames for _, frames, _ in runs)
+        self._char_probs.extend(prob for _, _, prob in runs)
+
+    def _greedy_runs(
+        self, log_probs: torch.Tensor, first_frame: int
+    ) -> tuple[tuple[int, int] | None, list[tuple[int, tuple[int, int], float]], int]:
+        """Colapso CTC de ``log_probs``, que siguen a los frames confirmados.
+
+        Devuelve los frames nuevos del último carácter confirmado si la
+        primera corrida lo continúa (o None), ``(símbolo, (inicio, fin),
+        probabilidad)`` de cada carácter nuevo en frames globales y el índice
+        del último frame. Igual que ``AsrTranscriber.decode`` en greedy, la
+        probabilidad de un carácter es la del primer frame de su corrida.
+        """
+        max_log_probs, indices = torch.max(log_probs, dim=1)
+        symbols, counts = torch.unique_consecutive(indices, return_counts=True)
+        ends = torch.cumsum(counts, dim=0)
+        starts = ends - counts
+
+        extended = None
+        if int(symbols[0]) == self._last_index:
+            if self._last_index != BLANK_IDX:
+                start = self._char_frames[-1][0]
+                extended = (start, first_frame + int(ends[0]))
+            symbols, starts, ends = symbols[1:], starts[1:], ends[1:]
+
+        keep = symbols != BLANK_IDX
+        symbols, starts, ends = symbols[keep], starts[keep], ends[keep]
+        probs = torch.exp(max_log_probs[starts]).tolist()
+        runs = [
+            (symbol, (first_frame + start, first_frame + end), prob)
+            for symbol, start, end, prob in zip(
+                symbols.tolist(), starts.tolist(), ends.tolist(), probs
+            )
+        ]
+        return extended, runs, int(indices[-1])
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+CHARS = "_ abcdefghijklmnopqrstuvwxyzñ'"
+
+
+@pytest.fixture(scope="session")
+def checkpoint(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Checkpoint chico con pesos aleatorios (no hace falta el modelo real)."""
+    import torch
+
+    from asr_model import ModelConfig, _build_model
+
+    config = ModelConfig(
+        n_mels=80,
+        hidden_size=32,
+        vocab_size=len(CHARS),
+        num_lstm_layers=2,
+        dropout=0.3,
+        sample_rate=16000,
+        n_fft=400,
+        hop_length=160,
+        win_length=400,
+    )
+    torch.manual_seed(0)
+    model = _build_model(config)
+    # BatchNorm con estadísticas distintas de las iniciales, para que la
+    # fusión Conv-BN tenga algo que hacer.
+    for module in model.modules():
+        if isinstance(module, torch.nn.BatchNorm2d):
+            module.running_mean.uniform_(-0.5, 0.5)
+            module.running_var.uniform_(0.5, 2.0)
+            module.weight.data.uniform_(0.5, 1.5)
+            module.bias.data.uniform_(-0.5, 0.5)
+
+    path = tmp_path_factory.mktemp("ckpt") / "model.pth"
+    torch.save(
+        {
+            "model_state_dict": model.state_dict(),
+            "model_config": asdict(config),
+            "idx_to_char": dict(enumerate(CHARS)),
+        },
+        path,
+    )
+    return path
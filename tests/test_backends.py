@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+from asr_model import AsrTranscriber, load_transcriber
+from backends import load_backend
+from export import EXPORTERS, check_parity
+
+# Diferencia máxima de log-probs aceptada (la de asr-export --check).
+TOLERANCE = 1e-4
+
+
+def require(backend: str) -> None:
+    if backend == "onnx":
+        pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+
+
+@pytest.fixture(scope="module")
+def eager(checkpoint: Path) -> AsrTranscriber:
+    return load_transcriber(checkpoint, device=torch.device("cpu"))
+
+
+@pytest.fixture(scope="module", params=sorted(EXPORTERS))
+def exported(
+    request: pytest.FixtureRequest,
+    eager: AsrTranscriber,
+    tmp_path_factory: pytest.TempPathFactory,
+) -> tuple[str, Path]:
+    backend = request.param
+    require(backend)
+    path = tmp_path_factory.mktemp(backend) / f"model.{backend}"
+    EXPORTERS[backend](eager, path)
+    return backend, path
+
+
+def test_exported_matches_eager(eager: AsrTranscriber, exported) -> None:
+    backend, path = exported
+    # Clips sueltos de varios largos y un batch con relleno (ver check_parity).
+    assert check_parity(eager, backend, path) <= TOLERANCE
+
+
+def test_exported_transcription(
+    checkpoint: Path, eager: AsrTranscriber, exported
+) -> None:
+    backend, path = exported
+    transcriber = load_transcriber(
+        checkpoint, device=torch.device("cpu"), backend=backend, backend_path=path
+    )
+    assert transcriber.backend.name == backend
+
+    audio = np.random.default_rng(0).standard_normal(3 * 16000).astype(np.float32)
+    assert transcriber.transcribe(audio).text == eager.transcribe(audio).text
+    clips = [audio[:8000], audio]
+    expected = [r.text for r in eager.transcribe_many(clips)]
+    assert [r.text for r in transcriber.transcribe_many(clips)] == expected
+
+
+def test_export_from_other_checkpoint_is_rejected(
+    eager: AsrTranscriber, exported
+) -> None:
+    backend, path = exported
+    with pytest.raises(ValueError, match="otro checkpoint"):
+        load_backend(backend, eager.model, eager.device, path, "0" * 64)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import numpy as np
+
+from ctc_beam import BeamSearchConfig, ctc_prefix_beam_search
+
+IDX_TO_CHAR = {0: "_", 1: "a", 2: "b"}
+
+
+def test_revived_prefix_gets_new_frame() -> None:
+    # "a" entra al haz en t=0, se poda en t=1 y vuelve desde "" en t=2: el
+    # carácter debe quedar en el frame 2, no en el de la alineación podada.
+    probs = np.array(
+        [
+            [0.5, 0.3, 0.2],
+            [0.5, 0.05, 0.45],
+            [0.1, 0.85, 0.05],
+            [0.9, 0.05, 0.05],
+        ]
+    )
+    result = ctc_prefix_beam_search(
+        np.log(probs), IDX_TO_CHAR, BeamSearchConfig(beam_width=2)
+    )
+    assert result.tokens == [1]
+    assert result.frames == [2]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import torch
+
+from features import MelFeatureExtractor
+
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+WIN_LENGTH = 400
+N_MELS = 80
+
+# Diferencia máxima aceptada con librosa, en dB (la de bench_features.py).
+TOLERANCE_DB = 1e-3
+
+
+def librosa_mel_db(audio: np.ndarray) -> np.ndarray:
+    librosa = pytest.importorskip("librosa")
+
+    mel = librosa.feature.melspectrogram(
+        y=audio,
+        sr=SAMPLE_RATE,
+        n_mels=N_MELS,
+        n_fft=N_FFT,
+        hop_length=HOP_LENGTH,
+        win_length=WIN_LENGTH,
+        window="hamming",
+        center=True,
+        pad_mode="reflect",
+    )
+    return librosa.power_to_db(mel, ref=np.max)
+
+
+def make_clip(seconds: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    envelope = np.abs(np.sin(np.linspace(0, 20, n))) ** 3
+    return (rng.standard_normal(n) * envelope).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def extractor() -> MelFeatureExtractor:
+    return MelFeatureExtractor(SAMPLE_RATE, N_FFT, HOP_LENGTH, WIN_LENGTH, N_MELS)
+
+
+@pytest.mark.parametrize("seconds", [0.05, 1.0, 3.3])
+def test_mel_matches_librosa(extractor: MelFeatureExtractor, seconds: float) -> None:
+    audio = make_clip(seconds, seed=int(seconds * 100))
+
+    expected = librosa_mel_db(audio)
+    actual, frames = extractor(audio)
+
+    assert actual.shape == (1, N_MELS, expected.shape[1])
+    assert int(frames[0]) == expected.shape[1] == extractor.num_frames(audio.shape[0])
+    np.testing.assert_allclose(actual[0].numpy(), expected, rtol=0, atol=TOLERANCE_DB)
+
+
+def test_padded_batch_matches_each_clip(extractor: MelFeatureExtractor) -> None:
+    clips = [make_clip(seconds, seed) for seed, seconds in enumerate((0.4, 2.0, 1.1))]
+    lengths = torch.tensor([clip.shape[0] for clip in clips])
+    batch = torch.nn.utils.rnn.pad_sequence(
+        [torch.from_numpy(clip) for clip in clips], batch_first=True
+    )
+
+    mels, frames = extractor(batch, lengths)
+
+    for row, clip in enumerate(clips):
+        expected = librosa_mel_db(clip)
+        assert int(frames[row]) == expected.shape[1]
+        got = mels[row, :, : int(frames[row])].numpy()
+        np.testing.assert_allclose(got, expected, rtol=0, atol=TOLERANCE_DB)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+
+from asr_model import AsrTranscriber, InferenceASRCNN_BiLSTM, load_transcriber
+
+# Diferencia máxima de log-probs aceptada (la de bench_inference_graph.py).
+TOLERANCE = 1e-4
+
+# Largos de mel (frames) de los clips; 37 no es múltiplo de 4.
+MEL_FRAMES = (37, 400, 1001)
+
+
+@pytest.fixture(scope="module")
+def transcribers(checkpoint: Path) -> tuple[AsrTranscriber, AsrTranscriber]:
+    cpu = torch.device("cpu")
+    reference = load_transcriber(checkpoint, device=cpu, optimize=False)
+    optimized = load_transcriber(checkpoint, device=cpu, optimize=True)
+    return reference, optimized
+
+
+def random_mels(n_mels: int) -> list[torch.Tensor]:
+    generator = torch.Generator().manual_seed(0)
+    return [torch.randn(n_mels, n, generator=generator) * 20 - 40 for n in MEL_FRAMES]
+
+
+def run(
+    transcriber: AsrTranscriber, mels: list[torch.Tensor]
+) -> tuple[torch.Tensor, torch.Tensor]:
+    lengths = torch.tensor([m.size(1) for m in mels])
+    padded = nn.utils.rnn.pad_sequence([m.T for m in mels], batch_first=True)
+    return transcriber.backend(padded.transpose(1, 2).contiguous(), lengths)
+
+
+def test_optimized_graph_has_no_batchnorm(transcribers) -> None:
+    reference, optimized = transcribers
+    assert isinstance(optimized.model, InferenceASRCNN_BiLSTM)
+    assert any(isinstance(m, nn.BatchNorm2d) for m in reference.model.modules())
+    assert not any(isinstance(m, nn.BatchNorm2d) for m in optimized.model.modules())
+
+
+@pytest.mark.parametrize("batch", ["single", "padded"])
+def test_fused_matches_unfused(transcribers, batch: str) -> None:
+    reference, optimized = transcribers
+    mels = random_mels(reference.config.n_mels)
+    batches = [[m] for m in mels] if batch == "single" else [mels]
+
+    for mels in batches:
+        expected, lengths = run(reference, mels)
+        actual, actual_lengths = run(optimized, mels)
+        assert torch.equal(lengths, actual_lengths)
+        for row, length in enumerate(lengths.tolist()):
+            torch.testing.assert_close(
+                actual[row, :length], expected[row, :length], rtol=0, atol=TOLERANCE
+            )
+
+
+def test_same_transcription(transcribers) -> None:
+    reference, optimized = transcribers
+    audio = np.random.default_rng(0).standard_normal(3 * 16000).astype(np.float32)
+    assert optimized.transcribe(audio).text == reference.transcribe(audio).text
+
+
+def test_source_model_untouched(transcribers) -> None:
+    reference, _ = transcribers
+    dropout = reference.model.lstm.dropout
+    InferenceASRCNN_BiLSTM(reference.model)
+    assert reference.model.lstm.dropout == dropout
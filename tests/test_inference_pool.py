@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+from asr_model import load_transcriber
+from inference_checkpoint import convert
+from inference_pool import InferencePool
+
+
+@pytest.fixture(scope="module")
+def compact_checkpoint(
+    checkpoint: Path, tmp_path_factory: pytest.TempPathFactory
+) -> Path:
+    path = tmp_path_factory.mktemp("compact") / "model.safetensors"
+    convert(checkpoint, path)
+    return path
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["pth", "safetensors"])
+def test_pool_matches_single_process(
+    checkpoint: Path, compact_checkpoint: Path, compact: bool
+) -> None:
+    rng = np.random.default_rng(0)
+    clips = [rng.standard_normal(n).astype(np.float32) for n in (8000, 24000, 16000)]
+    reference = load_transcriber(checkpoint, device=torch.device("cpu"))
+    expected = [reference.transcribe(clip).text for clip in clips]
+
+    path = compact_checkpoint if compact else checkpoint
+    with InferencePool(path, workers=2) as pool:
+        texts = [future.result(timeout=120).text for future in pool.map(clips)]
+
+    assert texts == expected
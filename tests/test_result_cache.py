@@ -0,0 +1,36 @@
+"""Varias conexiones (como los workers de ``asr-batch -j N``) escribiendo en
+la misma caché SQLite a la vez no deben perder resultados."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from result_cache import ResultCache
+
+
+def test_concurrent_writers_share_sqlite(tmp_path: Path) -> None:
+    path = tmp_path / "results.sqlite"
+    caches = [ResultCache(sqlite_path=path) for _ in range(4)]
+
+    def write(worker: int, cache: ResultCache) -> None:
+        for i in range(200):
+            cache.put(f"{worker}-{i}", f"texto {i}", 0.5)
+
+    threads = [
+        threading.Thread(target=write, args=(worker, cache))
+        for worker, cache in enumerate(caches)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [cache.write_errors for cache in caches] == [0] * 4
+    for cache in caches:
+        cache.close()
+
+    reader = ResultCache(sqlite_path=path)
+    assert reader.get("3-199") == ("texto 199", 0.5)
+    assert reader._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 800
+    reader.close()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Iterator
+
+# Recibe el evento ("load" o "transcribe") y sus tiempos; lo llama el thread que
+# hizo el trabajo, así que debe ser rápido (p. ej. encolar o sumar).
+MetricsHook = Callable[[str, "Timings"], None]
+
+_current: ContextVar[Timings | None] = ContextVar("asr_timings", default=None)
+_in_span: ContextVar[bool] = ContextVar("asr_in_span", default=False)
+
+
+class Timings:
+    """Segundos acumulados por etapa de una operación (carga o transcripción).
+
+    Las etapas se miden con ``span`` dentro de ``activate``; una etapa que se
+    repite (p. ej. ``mel`` en cada ventana) suma sus tiempos. Un ``span``
+    dentro de otro no se registra, así cada instante cuenta en una sola etapa
+    y la suma de las etapas no pasa de ``total``.
+    """
+
+    def __init__(self) -> None:
+        self.spans: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.total = 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    @contextmanager
+    def activate(self) -> Iterator[Timings]:
+        token = _current.set(self)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.total += time.perf_counter() - start
+            _current.reset(token)
+
+    def as_dict(self) -> dict[str, float]:
+        """Milisegundos por etapa, más ``total``."""
+        out = {name: round(s * 1e3, 2) for name, s in self.spans.items()}
+        out["total"] = round(self.total * 1e3, 2)
+        return out
+
+    def summary(self) -> str:
+        stages = " · ".join(f"{name} {s * 1e3:.0f}" for name, s in self.spans.items())
+        return f"{self.total * 1e3:.0f} ms ({stages})" if stages else ""
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Mide el bloque como etapa ``name`` de los ``Timings`` activos, si hay."""
+    timings = _current.get()
+    if timings is None or _in_span.get():
+        yield
+        return
+    token = _in_span.set(True)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+        _in_span.reset(token)
+
+
+@contextmanager
+def profile_trace(output_dir: str | Path, name: str = "request") -> Iterator[None]:
+    """Perfila el bloque con ``torch.profiler`` y ``tracemalloc``.
+
+    Deja en ``output_dir`` una traza para chrome://tracing o Perfetto
+    (``*.trace.json``) y un resumen de texto (``*.txt``) con las operaciones
+    de torch más caras y las líneas de Python que más memoria reservaron.
+    """
+    import tracemalloc
+
+    import torch
+    from torch.profiler import ProfilerActivity, profile
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = output_dir / f"{time.strftime('%Y%m%d_%H%M%S')}_{name}"
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+
+    # Un frame alcanza para agrupar por línea y es mucho más barato.
+    tracemalloc.start(1)
+    try:
+        with profile(
+            activities=activities, record_shapes=True, profile_memory=True
+        ) as prof:
+            yield
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    prof.export_chrome_trace(str(stem.with_suffix(".trace.json")))
+    top = snapshot.statistics("lineno")[:25]
+    with stem.with_suffix(".txt").open("w", encoding="utf-8") as f:
+        f.write(prof.key_averages().table(sort_by="self_cpu_time_total", row_limit=25))
+        f.write("\n\nMemoria de Python (tracemalloc), top 25 por línea:\n")
+        f.writelines(f"{stat}\n" for stat in top)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+# Sin torch ni numpy: el cliente de asr-server también devuelve Transcription.
+if TYPE_CHECKING:
+    from timings import Timings
+    from vad import VadReport
+
+
+@dataclass(frozen=True)
+class Transcription:
+    text: str
+    confidence: float
+    # (inicio, fin) de cada carácter de `text`, en frames de salida del modelo;
+    # `fin` es exclusivo. Para pasar a segundos: AsrTranscriber.frame_seconds.
+    char_frames: tuple[tuple[int, int], ...] = ()
+    # Con VAD: cuánto audio se transcribió y cuánto cómputo se ahorró.
+    vad: VadReport | None = None
+    # Tiempo por etapa (resample, mel, forward, decode, ...) de la llamada.
+    timings: Timings | None = None
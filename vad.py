@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# Nivel mínimo en dBFS de la energía por frame; evita log(0) en silencio digital.
+MIN_DB = -100.0
+
+
+@dataclass(frozen=True)
+class VadConfig:
+    """Parámetros del detector de voz por energía y planitud espectral.
+
+    Un frame es voz si su energía supera en ``margin_db`` al piso de ruido del
+    archivo (percentil ``noise_percentile``) y a ``min_level_db``, y su
+    espectro no es plano como el de un ruido blanco (``max_flatness``).
+    """
+
+    frame_ms: float = 20.0
+    margin_db: float = 10.0
+    min_level_db: float = -50.0
+    noise_percentile: float = 10.0
+    max_flatness: float = 0.5
+    # Tramos de voz más cortos se descartan (clics, golpes).
+    min_speech_ms: float = 100.0
+    # Silencios más cortos no cortan el segmento (pausas entre palabras).
+    min_silence_ms: float = 400.0
+    # Margen que se agrega a cada lado para no recortar consonantes.
+    padding_ms: float = 200.0
+
+
+@dataclass(frozen=True)
+class VadReport:
+    """Cuánto audio llegó al modelo tras descartar los silencios."""
+
+    audio_seconds: float
+    speech_seconds: float
+    segments: int
+
+    @property
+    def saved_fraction(self) -> float:
+        # El costo del modelo es lineal en frames: es la fracción de cómputo ahorrada.
+        if self.audio_seconds <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self.speech_seconds / self.audio_seconds)
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "audio_seconds": round(self.audio_seconds, 3),
+            "speech_seconds": round(self.speech_seconds, 3),
+            "segments": self.segments,
+            "saved_fraction": round(self.saved_fraction, 4),
+        }
+
+
+def vad_report(
+    segments: list[tuple[int, int]], total_samples: int, sample_rate: int
+) -> VadReport:
+    return VadReport(
+        audio_seconds=total_samples / sample_rate,
+        speech_seconds=sum(end - start for start, end in segments) / sample_rate,
+        segments=len(segments),
+    )
+
+
+def _frame_features(
+    audio: np.ndarray, frame_samples: int
+) -> tuple[np.ndarray, np.ndarray]:
+    # Frames sin solapamiento; la cola incompleta se rellena con ceros.
+    num_frames = -(-audio.shape[0] // frame_samples)
+    padded = np.zeros(num_frames * frame_samples, dtype=np.float32)
+    padded[: audio.shape[0]] = audio
+    frames = padded.reshape(num_frames, frame_samples)
+
+    energy_db = 10.0 * np.log10(np.mean(frames**2, axis=1) + 10 ** (MIN_DB / 10))
+
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame_samples), axis=1)) ** 2
+    power += 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy_db, flatness
+
+
+def _runs(mask: np.ndarray) -> list[tuple[int, int]]:
+    """(inicio, fin) de cada corrida de True; ``fin`` es exclusivo."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_speech(
+    audio: np.ndarray, sample_rate: int, config: VadConfig | None = None
+) -> list[tuple[int, int]]:
+    """Segmentos con voz de ``audio`` (mono), en muestras y en orden.
+
+    Los segmentos ya incluyen ``padding_ms`` a cada lado y no se solapan.
+    Devuelve una lista vacía si no hay voz.
+    """
+    config = config or VadConfig()
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    if audio.size == 0:
+        return []
+
+    frame_samples = max(1, round(config.frame_ms * sample_rate / 1000))
+    energy_db, flatness = _frame_features(audio, frame_samples)
+
+    noise_floor = float(np.percentile(energy_db, config.noise_percentile))
+    threshold = max(noise_floor + config.margin_db, config.min_level_db)
+    speech = (energy_db > threshold) & (flatness < config.max_flatness)
+
+    def to_frames(ms: float) -> int:
+        return round(ms / config.frame_ms)
+
+    runs = [
+        (start, end)
+        for start, end in _runs(speech)
+        if end - start >= to_frames(config.min_speech_ms)
+    ]
+
+    # Unir tramos separados por pausas cortas y después agregar el margen;
+    # dos márgenes que se tocan también se unen.
+    pad = to_frames(config.padding_ms)
+    min_gap = max(to_frames(config.min_silence_ms), 2 * pad)
+    merged: list[tuple[int, int]] = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    merged = [
+        (max(0, start - pad), min(len(speech), end + pad)) for start, end in merged
+    ]
+
+    return [
+        (int(start * frame_samples), int(min(end * frame_samples, audio.shape[0])))
+        for start, end in merged
+    ]
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import tkinter as tk
+from typing import TYPE_CHECKING, Callable
+
+# Sin numpy acá: los arrays de la pirámide llegan ya calculados y se dibujan
+# con sus propios métodos, así importar la vista no carga numpy.
+if TYPE_CHECKING:
+    from peaks import PeakPyramid
+
+# Zoom máximo: cuatro columnas por bloque del nivel más fino de la pirámide.
+MIN_SAMPLES_PER_PIXEL = 64.0
+
+# Cuánto cambia el zoom por cada paso de la rueda del mouse.
+ZOOM_STEP = 1.25
+
+# Columnas que se desplaza la vista por cada paso de la rueda con Shift.
+SCROLL_PIXELS = 60
+
+
+class WaveformView(tk.Frame):
+    """Forma de onda de un audio con un cursor de reproducción.
+
+    Dibuja un solo polígono (la envolvente de máximos y, de vuelta, la de
+    mínimos) con una columna por píxel, pedida a ``PeakPyramid.columns``:
+    hacer zoom o desplazarse solo lee el nivel de la pirámide que corresponde
+    al ancho visible, nunca las muestras.
+
+    La rueda del mouse hace zoom alrededor del puntero y con Shift (o la
+    barra) desplaza la vista. Un clic o un arrastre mueven el cursor y, al
+    soltar, llaman a ``on_seek`` con la posición en segundos.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        bg: str,
+        fg: str,
+        playhead: str,
+        height: int = 80,
+        on_seek: Callable[[float], None] | None = None,
+    ) -> None:
+        super().__init__(master, bg=bg)
+        self.on_seek = on_seek
+        self.pyramid: PeakPyramid | None = None
+        # Muestra en el borde izquierdo y muestras por columna.
+        self.start = 0.0
+        self.samples_per_pixel = 1.0
+        # Con la vista ajustada al audio entero, cambiar el ancho la reajusta.
+        self._fit = True
+        self._position = 0.0
+        self._scrubbing = False
+
+        self.canvas = tk.Canvas(
+            self, bg=bg, height=height, highlightthickness=0, cursor="hand2"
+        )
+        self.scrollbar = tk.Scrollbar(
+            self, orient=tk.HORIZONTAL, command=self._on_scrollbar
+        )
+        self.canvas.pack(fill=tk.X)
+        self.scrollbar.pack(fill=tk.X)
+
+        self._wave = self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill=fg, outline=fg)
+        self._cursor = self.canvas.create_line(0, 0, 0, height, fill=playhead, width=2)
+        self._message = self.canvas.create_text(
+            0, 0, text="", fill=fg, font=("Arial", 9)
+        )
+        self.set_peaks(None)
+
+        self.canvas.bind("<Configure>", lambda _event: self._on_resize())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self._zoom(event.x, 1))
+        self.canvas.bind("<Button-5>", lambda event: self._zoom(event.x, -1))
+        self.canvas.bind("<Shift-MouseWheel>", self._on_shift_wheel)
+        self.canvas.bind("<Shift-Button-4>", lambda _event: self._scroll_pixels(-1))
+        self.canvas.bind("<Shift-Button-5>", lambda _event: self._scroll_pixels(1))
+        self.canvas.bind("<Button-1>", self._on_drag)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+
+    def set_peaks(self, pyramid: PeakPyramid | None, message: str = "") -> None:
+        """Muestra ``pyramid`` entera; con None, la vista vacía y ``message``."""
+        self.pyramid = pyramid
+        self._fit = True
+        self._position = 0.0
+        self.canvas.itemconfigure(self._message, text="" if pyramid else message)
+        self.canvas.itemconfigure(
+            self._cursor, state=tk.NORMAL if pyramid else tk.HIDDEN
+        )
+        self._on_resize()
+
+    def set_position(self, seconds: float, follow: bool = False) -> None:
+        """Mueve el cursor; con ``follow`` la vista lo sigue si queda afuera."""
+        if self.pyramid is None or self._scrubbing:
+            return
+        self._position = seconds
+        x = self._x_for(seconds)
+        width = self._width()
+        if follow and not 0 <= x < width:
+            # Pasa de página dejando el cursor cerca del borde izquierdo.
+            sample = seconds * self.pyramid.sample_rate
+            self._set_view(sample - 0.05 * width * self.samples_per_pixel)
+            return
+        self._move_cursor(x)
+
+    def _width(self) -> int:
+        return max(1, self.canvas.winfo_width())
+
+    def _x_for(self, seconds: float) -> float:
+        assert self.pyramid is not None
+        sample = seconds * self.pyramid.sample_rate
+        return (sample - self.start) / self.samples_per_pixel
+
+    def _seconds_at(self, x: float) -> float:
+        assert self.pyramid is not None
+        sample = self.start + max(0.0, x) * self.samples_per_pixel
+        return min(sample, self.pyramid.frames) / self.pyramid.sample_rate
+
+    def _max_samples_per_pixel(self) -> float:
+        assert self.pyramid is not None
+        return max(MIN_SAMPLES_PER_PIXEL, self.pyramid.frames / self._width())
+
+    def _set_view(self, start: float, samples_per_pixel: float | None = None) -> None:
+        if self.pyramid is None:
+            return
+        if samples_per_pixel is not None:
+            self.samples_per_pixel = min(
+                max(samples_per_pixel, MIN_SAMPLES_PER_PIXEL),
+                self._max_samples_per_pixel(),
+            )
+        self._fit = self.samples_per_pixel >= self._max_samples_per_pixel()
+        visible = self._width() * self.samples_per_pixel
+        self.start = max(0.0, min(start, self.pyramid.frames - visible))
+        self._redraw()
+
+    def _on_resize(self) -> None:
+        width = self._width()
+        height = self.canvas.winfo_height()
+        self.canvas.coords(self._message, width / 2, height / 2)
+        if self.pyramid is None:
+            self.canvas.coords(self._wave, 0, 0, 0, 0, 0, 0)
+            self.scrollbar.set(0.0, 1.0)
+            return
+        if self._fit:
+            self._set_view(0.0, self._max_samples_per_pixel())
+        else:
+            self._set_view(self.start)
+
+    def _redraw(self) -> None:
+        assert self.pyramid is not None
+        width = self._width()
+        height = self.canvas.winfo_height()
+        mins, maxs = self.pyramid.columns(self.start, self.samples_per_pixel, width)
+        middle = height / 2
+        scale = max(1.0, middle - 2)
+        top = (middle - maxs * scale).tolist()
+        bottom = (middle - mins * scale).tolist()
+
+        coords: list[float] = []
+        for x, y in enumerate(top):
+            coords += (x, y)
+        for x in range(len(bottom) - 1, -1, -1):
+            coords += (x, bottom[x])
+        if len(coords) < 6:
+            coords = [0, middle, 0, middle, 0, middle]
+        self.canvas.coords(self._wave, *coords)
+
+        frames = self.pyramid.frames
+        visible = width * self.samples_per_pixel
+        self.scrollbar.set(
+            self.start / frames, min(1.0, (self.start + visible) / frames)
+        )
+        self._move_cursor(self._x_for(self._position))
+
+    def _move_cursor(self, x: float) -> None:
+        self.canvas.coords(self._cursor, x, 0, x, self.canvas.winfo_height())
+
+    def _zoom(self, x: int, steps: int) -> None:
+        # La muestra bajo el puntero queda en el mismo lugar.
+        if self.pyramid is None:
+            return
+        anchor = self.start + x * self.samples_per_pixel
+        samples_per_pixel = self.samples_per_pixel / ZOOM_STEP**steps
+        samples_per_pixel = min(
+            max(samples_per_pixel, MIN_SAMPLES_PER_PIXEL),
+            self._max_samples_per_pixel(),
+        )
+        self._set_view(anchor - x * samples_per_pixel, samples_per_pixel)
+
+    def _scroll_pixels(self, steps: int) -> None:
+        self._set_view(self.start + steps * SCROLL_PIXELS * self.samples_per_pixel)
+
+    def _on_wheel(self, event: tk.Event) -> None:
+        # Windows usa múltiplos de 120 por paso; macOS, pasos de a 1.
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        if steps:
+            self._zoom(event.x, steps)
+
+    def _on_shift_wheel(self, event: tk.Event) -> None:
+        self._scroll_pixels(-1 if event.delta > 0 else 1)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str = "") -> None:
+        if self.pyramid is None:
+            return
+        if action == "moveto":
+            self._set_view(float(amount) * self.pyramid.frames)
+        elif unit == "pages":
+            page = 0.9 * self._width() * self.samples_per_pixel
+            self._set_view(self.start + int(amount) * page)
+        else:
+            self._scroll_pixels(int(amount))
+
+    def _on_drag(self, event: tk.Event) -> None:
+        if self.pyramid is None:
+            return
+        self._scrubbing = True
+        self._position = self._seconds_at(event.x)
+        self._move_cursor(self._x_for(self._position))
+
+    def _on_release(self, event: tk.Event) -> None:
+        if self.pyramid is None or not self._scrubbing:
+            return
+        self._scrubbing = False
+        self._position = self._seconds_at(event.x)
+        self._move_cursor(self._x_for(self._position))
+        if self.on_seek is not None:
+            self.on_seek(self._position)